@@ -0,0 +1,56 @@
+"""Tabelle clients mit den Indizes für Keyset-Pagination
+
+Bestehende Datenbanken (Tabelle bereits vorhanden) werden übernommen: `transfer_rx`/`transfer_tx` werden
+auf BIGINT erweitert (Zähler über 2 GiB), fehlende Indizes werden ergänzt.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-17
+"""
+from alembic import context, op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# Von dieser Migration angelegte Indizes: Name -> Spalten
+INDEXES = {
+    "ix_clients_id": ["id"],
+    "ix_clients_created_at_id": ["created_at", "id"],
+    "ix_clients_name_id": ["name", "id"],
+}
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # Im Offline-Modus (--sql) wird eine leere Datenbank angenommen
+    if context.is_offline_mode() or not sa.inspect(op.get_bind()).has_table("clients"):
+        op.create_table(
+            "clients",
+            sa.Column("id", sa.Integer(), primary_key=True),
+            sa.Column("name", sa.String(64), nullable=False),
+            sa.Column("public_key", sa.String(44), nullable=False, unique=True),
+            sa.Column("allowed_ips", postgresql.ARRAY(sa.String()), nullable=False),
+            sa.Column("email", sa.String(255)),
+            sa.Column("description", sa.String(500)),
+            sa.Column("is_active", sa.Boolean()),
+            sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now()),
+            sa.Column("last_handshake", sa.DateTime(timezone=True)),
+            sa.Column("transfer_rx", sa.BigInteger()),
+            sa.Column("transfer_tx", sa.BigInteger())
+        )
+    else:
+        # Ältere, extern angelegte Tabellen haben INTEGER-Transferspalten
+        columns = {column["name"]: column["type"] for column in sa.inspect(op.get_bind()).get_columns("clients")}
+        for name in ("transfer_rx", "transfer_tx"):
+            if name in columns and not isinstance(columns[name], sa.BigInteger):
+                op.alter_column("clients", name, type_=sa.BigInteger(), existing_type=columns[name])
+    for name, columns in INDEXES.items():
+        op.create_index(name, "clients", columns, if_not_exists=True)
+
+def downgrade():
+    # Die Tabelle kann älter sein als diese Migration; nur die Indizes werden entfernt.
+    # Die Transferspalten bleiben BIGINT, da Zähler über 2 GiB nicht mehr in INTEGER passen.
+    for name in INDEXES:
+        op.drop_index(name, table_name="clients", if_exists=True)
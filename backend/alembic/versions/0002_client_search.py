@@ -0,0 +1,42 @@
+"""Indizes für die Client-Suche (Trigramme, Schlüsselpräfix, erlaubte IPs, letzter Handshake)
+
+Die Indizes werden mit CONCURRENTLY angelegt, damit die Tabelle währenddessen beschreibbar bleibt.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+# Name -> (Spalte, Zugriffsmethode, Operatorklasse)
+INDEXES = {
+    "ix_clients_name_trgm": ("name", "gin", "gin_trgm_ops"),
+    "ix_clients_email_trgm": ("email", "gin", "gin_trgm_ops"),
+    "ix_clients_public_key_prefix": ("public_key", "btree", "varchar_pattern_ops"),
+    "ix_clients_allowed_ips": ("allowed_ips", "gin", None),
+    "ix_clients_last_handshake": ("last_handshake", "btree", None),
+}
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+    with op.get_context().autocommit_block():
+        for name, (column, method, ops) in INDEXES.items():
+            op.create_index(
+                name,
+                "clients",
+                [column],
+                postgresql_using=method,
+                postgresql_ops={column: ops} if ops else {},
+                postgresql_concurrently=True,
+                if_not_exists=True
+            )
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.drop_index(name, table_name="clients", postgresql_concurrently=True, if_exists=True)
@@ -1,10 +1,33 @@
-from typing import Generator
+from typing import AsyncGenerator, Generator
 from sqlalchemy.orm import Session
-from app.db.session import SessionLocal
+from starlette.concurrency import run_in_threadpool
+from app.db.session import AsyncSessionLocal, SessionLocal
+from app.services.client import AsyncClientService, AsyncClientServiceBase, ThreadedClientService
 
 def get_db() -> Generator:
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+async def get_async_db() -> AsyncGenerator:
+    if AsyncSessionLocal is None:
+        raise RuntimeError("Asynchroner Datenbankzugriff ist nicht verfügbar (DATABASE_ASYNC_ENABLED/asyncpg)")
+    async with AsyncSessionLocal() as db:
+        yield db
+
+async def get_client_service() -> AsyncGenerator[AsyncClientServiceBase, None]:
+    """
+    ClientService für die Client-API: asynchron über asyncpg, falls verfügbar,
+    sonst über den synchronen Pfad im Threadpool (gleiche Router für beide Pfade).
+    """
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as db:
+            yield AsyncClientService(db)
+        return
+    db = SessionLocal()
+    try:
+        yield ThreadedClientService(db)
+    finally:
+        await run_in_threadpool(db.close)
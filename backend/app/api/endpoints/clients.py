@@ -1,31 +1,165 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from typing import List
-from sqlalchemy.orm import Session
+from datetime import datetime
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy.exc import IntegrityError
+from typing import List, Literal, Optional
 
-from app.api.deps import get_db
-from app.schemas.client import ClientCreate, ClientResponse, ClientList, SystemStatus
-from app.services.client import ClientService
+from app.api.deps import get_client_service
+from app.api.v1.endpoints.system_operations import system_ops
+from app.api.v1.endpoints.wireguard import list_peer_sessions, monitor_group
+from app.core.config import settings
+from app.schemas.client import ClientCreate, ClientImportResult, ClientResponse, ClientList, ClientSearchResult, SystemStatus
+from app.schemas.wireguard import PeerSessionList
+from app.services import client_bulk, client_search
+from app.services.client import AsyncClientServiceBase, InvalidCursorError, ensure_client_summary, stream_clients, system_status
 
 router = APIRouter()
 
 @router.get("/clients", response_model=ClientList)
-def get_clients(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db)
+async def get_clients(
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Cursor der vorherigen Antwort (next_cursor)"),
+    order: Literal["created", "name"] = Query("created", description="Sortierung: Erstellungszeit oder Name"),
+    skip: int = Query(0, ge=0, description="Veraltet: Offset-Pagination, nur ohne Cursor"),
+    service: AsyncClientServiceBase = Depends(get_client_service)
 ):
-    """Liste aller Clients mit Status"""
-    clients = ClientService(db).get_clients(skip=skip, limit=limit)
-    total = ClientService(db).get_total_clients()
-    return ClientList(clients=clients, total=total)
+    """
+    Liste aller Clients mit Status (Keyset-Pagination über `cursor`). Mit `skip` beginnt die
+    erste Seite an einem Offset derselben Sortierung; danach wird mit `next_cursor` weitergeblättert.
+    """
+    try:
+        clients, next_cursor = await service.get_clients_page(limit=limit, cursor=cursor, order=order, skip=skip)
+    except InvalidCursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    total = await service.get_cached_total_clients()
+    return ClientList(clients=clients, total=total, next_cursor=next_cursor)
+
+@router.get("/clients/search", response_model=ClientSearchResult)
+async def search_clients(
+    q: Optional[str] = Query(None, min_length=1, max_length=255, description="Teilstring von Name oder E-Mail"),
+    public_key: Optional[str] = Query(None, min_length=1, max_length=44, description="Präfix des öffentlichen Schlüssels"),
+    ip: Optional[str] = Query(None, description="IP oder CIDR, das eine erlaubte IP enthält oder in ihr enthalten ist"),
+    active: Optional[bool] = Query(None, description="Nur aktive bzw. deaktivierte Clients"),
+    online: Optional[bool] = Query(None, description="Nur Clients mit bzw. ohne Handshake in den letzten 180 Sekunden"),
+    limit: int = Query(100, ge=1, le=1000),
+    cursor: Optional[str] = Query(None, description="Cursor der vorherigen Antwort (next_cursor)"),
+    order: Literal["created", "name"] = Query("created", description="Sortierung: Erstellungszeit oder Name"),
+    service: AsyncClientServiceBase = Depends(get_client_service)
+):
+    """Clients suchen und filtern (alle Kriterien müssen zutreffen), mit Keyset-Pagination"""
+    try:
+        filters = client_search.search_filters(q=q, public_key=public_key, ip=ip, active=active, online=online)
+        clients, next_cursor = await service.get_clients_page(limit=limit, cursor=cursor, order=order, filters=filters)
+    except ValueError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+    return ClientSearchResult(clients=clients, next_cursor=next_cursor)
+
+@router.post("/clients/import", response_model=ClientImportResult)
+async def import_clients(
+    request: Request,
+    content_type: Optional[str] = Header(None),
+    skip_invalid: bool = Query(False, description="Gültige Zeilen auch dann anlegen, wenn andere fehlerhaft sind"),
+    apply: bool = Query(True, description="Neue Peers anschließend auf das Interface anwenden"),
+    interface: Optional[str] = Query(None, description="Ziel-Interface (Standard: erstes überwachtes Interface)"),
+    service: AsyncClientServiceBase = Depends(get_client_service)
+):
+    """
+    Massenimport von Clients als JSON-Array oder CSV (`Content-Type: text/csv`).
+    Alle Zeilen werden vorab geprüft; ohne `skip_invalid` wird bei Fehlern nichts angelegt (422).
+    Bodies über `CLIENT_IMPORT_MAX_BYTES` werden mit 413 abgelehnt, ohne sie vollständig zu lesen.
+    Als `interface` sind nur überwachte Interfaces erlaubt (sonst 400, bevor etwas angelegt wird).
+    """
+    if interface is not None and interface not in monitor_group.monitors:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Interface {interface} wird nicht überwacht"
+        )
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > settings.CLIENT_IMPORT_MAX_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Höchstens {settings.CLIENT_IMPORT_MAX_BYTES} Bytes pro Import"
+        )
+    try:
+        body = await client_bulk.read_limited(request.stream(), settings.CLIENT_IMPORT_MAX_BYTES)
+    except client_bulk.ImportTooLargeError as e:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE, detail=str(e))
+    try:
+        rows = client_bulk.parse_import(body, content_type)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Import nicht lesbar: {e}")
+    if len(rows) > settings.CLIENT_IMPORT_MAX_ROWS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Höchstens {settings.CLIENT_IMPORT_MAX_ROWS} Zeilen pro Import"
+        )
+
+    keys = [row["public_key"] for row in rows if isinstance(row, dict) and isinstance(row.get("public_key"), str)]
+    plan = client_bulk.validate_import(rows, await service.get_existing_public_keys(keys))
+    result = ClientImportResult(
+        received=len(rows),
+        created=0,
+        failed=len(plan.errors),
+        errors=[error._asdict() for error in plan.errors]
+    )
+    if plan.errors and not skip_invalid:
+        return JSONResponse(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, content=result.model_dump(mode="json"))
+
+    clients = [client for _, client in plan.clients]
+    if clients:
+        try:
+            result.created = await service.insert_clients(clients, settings.CLIENT_IMPORT_BATCH_SIZE)
+        except IntegrityError:
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Import abgebrochen: öffentlicher Schlüssel wurde zwischenzeitlich angelegt"
+            )
+
+    if apply and clients:
+        result.interface = interface or monitor_group.primary.interface
+        result.applied = await system_ops.add_peers(
+            result.interface,
+            [{"public_key": client.public_key, "allowed_ips": client.allowed_ips} for client in clients]
+        )
+    return result
+
+@router.get("/clients/export")
+async def export_clients(
+    format: Literal["ndjson", "csv"] = Query("ndjson", description="Exportformat")
+):
+    """Export aller Clients als NDJSON oder CSV, gestreamt über einen serverseitigen Cursor"""
+    batch_size = settings.CLIENT_EXPORT_BATCH_SIZE
+
+    async def ndjson():
+        async for clients in stream_clients(batch_size):
+            yield client_bulk.ndjson_chunk(clients)
+
+    async def csv():
+        yield client_bulk.csv_header()
+        async for clients in stream_clients(batch_size):
+            yield client_bulk.csv_chunk(clients)
+
+    if format == "csv":
+        return StreamingResponse(
+            csv(),
+            media_type=client_bulk.CSV_MEDIA_TYPE,
+            headers={"Content-Disposition": 'attachment; filename="clients.csv"'}
+        )
+    return StreamingResponse(ndjson(), media_type=client_bulk.NDJSON_MEDIA_TYPE)
 
 @router.get("/client/{client_id}", response_model=ClientResponse)
-def get_client(
+async def get_client(
     client_id: int,
-    db: Session = Depends(get_db)
+    service: AsyncClientServiceBase = Depends(get_client_service)
 ):
     """Detail-Informationen eines Clients"""
-    client = ClientService(db).get_client(client_id)
+    client = await service.get_client(client_id)
     if not client:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -33,31 +167,49 @@ def get_client(
         )
     return client
 
+@router.get("/client/{client_id}/sessions", response_model=PeerSessionList)
+async def get_client_sessions(
+    client_id: int,
+    start: Optional[datetime] = Query(None, description="Nur Sitzungen, die nach diesem Zeitpunkt enden"),
+    end: Optional[datetime] = Query(None, description="Nur Sitzungen, die vor diesem Zeitpunkt beginnen"),
+    limit: Optional[int] = Query(None, ge=1, description="Maximale Anzahl der neuesten Sitzungen"),
+    service: AsyncClientServiceBase = Depends(get_client_service)
+):
+    """Verbindungssitzungen eines Clients (auf dem Interface, auf dem der Peer konfiguriert ist)"""
+    client = await service.get_client(client_id)
+    if not client:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Client nicht gefunden"
+        )
+    monitor = next(
+        (monitor for monitor in monitor_group.monitors.values() if monitor.get_peer(client.public_key)),
+        monitor_group.primary
+    )
+    return await list_peer_sessions(monitor, client.public_key, start, end, limit)
+
 @router.post("/client", response_model=ClientResponse, status_code=status.HTTP_201_CREATED)
-def create_client(
+async def create_client(
     client: ClientCreate,
-    db: Session = Depends(get_db)
+    service: AsyncClientServiceBase = Depends(get_client_service)
 ):
     """Neue Client-Konfiguration erstellen"""
-    return ClientService(db).create_client(client)
+    return await service.create_client(client)
 
 @router.delete("/client/{client_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_client(
+async def delete_client(
     client_id: int,
-    db: Session = Depends(get_db)
+    service: AsyncClientServiceBase = Depends(get_client_service)
 ):
     """Client löschen"""
-    client = ClientService(db).get_client(client_id)
-    if not client:
+    if not await service.delete_client(client_id):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Client nicht gefunden"
         )
-    ClientService(db).delete_client(client_id)
 
 @router.get("/status", response_model=SystemStatus)
-def get_system_status(
-    db: Session = Depends(get_db)
-):
-    """System-Status und Statistiken abrufen"""
-    return ClientService(db).get_system_status() 
\ No newline at end of file
+async def get_system_status():
+    """System-Status und Statistiken abrufen (aus dem Speicher, ohne Datenbank-Session)"""
+    await ensure_client_summary()
+    return system_status()
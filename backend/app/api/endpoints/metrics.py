@@ -0,0 +1,14 @@
+from fastapi import APIRouter, Response
+
+from app.api.v1.endpoints.wireguard import monitor_group
+from app.services.metrics_exporter import CONTENT_TYPE, MetricsExporter
+
+router = APIRouter()
+
+# Der Exporter rendert die Peer-Metriken höchstens einmal pro Monitor-Durchlauf
+metrics_exporter = MetricsExporter(monitor_group)
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Metriken aller Interfaces im Prometheus-Textformat"""
+    return Response(content=await metrics_exporter.render(), media_type=CONTENT_TYPE)
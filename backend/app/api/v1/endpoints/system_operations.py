@@ -4,6 +4,7 @@ from pathlib import Path as PathLib
 import logging
 from datetime import datetime
 
+from app.core.config import settings
 from app.utils.system_operations import SecureSystemOperations
 from app.schemas.wireguard import (
     WireGuardKeyResponse,
@@ -21,7 +22,7 @@ logger = logging.getLogger(__name__)
 router = APIRouter()
 
 # Initialisiere die sicheren Systemoperationen
-system_ops = SecureSystemOperations()
+system_ops = SecureSystemOperations(helper_socket=settings.WIREGUARD_HELPER_SOCKET)
 
 @router.post("/keys/generate", response_model=WireGuardKeyResponse, status_code=201)
 async def generate_keys(
@@ -1,35 +1,286 @@
-from fastapi import APIRouter, HTTPException, status
+import asyncio
+import time
+from fastapi import APIRouter, Header, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from datetime import datetime
+from app.services.monitor_setup import create_monitor_group
+from app.services.peer_stream import PeerStreamHub
+from app.services.serialization import MSGPACK_MEDIA_TYPE, negotiate
 from app.services.wireguard_monitor import WireGuardMonitor
-from app.schemas.wireguard import WireGuardStatus
-from typing import Dict, Any
+from app.schemas.wireguard import WireGuardStatus, WireGuardOverview, TrafficRateSeries, PeerHistory, PeerUsageList, TopPeerList, PeerSessionList
+from typing import Dict, Any, Literal, Optional
 
 router = APIRouter()
 
-# Singleton-Instanz des WireGuard-Monitors
-wireguard_monitor = WireGuardMonitor(
-    interface="wg0",
-    status_dir="app/data/wireguard_status",
-    check_interval=15,
-    admin_subnet="10.10.10.0/24",
-    user_subnet="10.10.11.0/24"
-)
+# Singleton-Instanz der Monitore aller Interfaces
+monitor_group = create_monitor_group()
 
-@router.get("/status", response_model=WireGuardStatus)
-async def get_wireguard_status():
-    """
-    Gibt den aktuellen WireGuard-Status zurück.
-    Für alle Benutzer verfügbar.
-    """
+# Monitor des Standard-Interfaces
+wireguard_monitor = monitor_group.primary
+
+# Verteilt Live-Aktualisierungen an alle verbundenen Dashboards
+peer_streams: Dict[str, PeerStreamHub] = {
+    name: PeerStreamHub(monitor.snapshots, on_connect=monitor.wake)
+    for name, monitor in monitor_group.monitors.items()
+}
+for name, hub in peer_streams.items():
+    monitor_group.monitors[name].register_watcher(lambda hub=hub: hub.subscriber_count)
+
+def get_monitor(interface: Optional[str]) -> WireGuardMonitor:
+    """Gibt den Monitor eines Interfaces zurück oder löst 404 aus."""
+    monitor = monitor_group.get(interface)
+    if monitor is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Interface {interface} wird nicht überwacht"
+        )
+    return monitor
+
+async def _status_response(monitor: WireGuardMonitor, if_none_match: Optional[str], accept: Optional[str]) -> Response:
     try:
-        wg_status = await wireguard_monitor.get_current_status()
-        if not wg_status:
+        snapshot = await monitor.get_snapshot()
+        if snapshot is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Keine Statusdaten verfügbar"
             )
-        return wg_status
+        # JSON oder (bei passendem Accept-Header) MessagePack, beides einmal pro Stand serialisiert
+        media_type = negotiate(accept)
+        etag = snapshot.msgpack_etag if media_type == MSGPACK_MEDIA_TYPE else snapshot.etag
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept"}
+        if monitor.checked_at is not None:
+            # Letzte Abfrage; der Inhalt (und sein Zeitstempel) ändert sich nur bei neuen Daten
+            headers["X-Checked-At"] = datetime.fromtimestamp(monitor.checked_at).isoformat()
+        if snapshot.matches(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        body = snapshot.msgpack_body if media_type == MSGPACK_MEDIA_TYPE else snapshot.body
+        return Response(content=body, media_type=media_type, headers=headers)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Fehler beim Abrufen des WireGuard-Status: {str(e)}"
-        ) 
\ No newline at end of file
+        )
+
+@router.get("/status", response_model=WireGuardStatus)
+async def get_wireguard_status(if_none_match: Optional[str] = Header(None), accept: Optional[str] = Header(None)):
+    """
+    Gibt den aktuellen WireGuard-Status des Standard-Interfaces zurück.
+    Für alle Benutzer verfügbar.
+    Die Antwort wird nur bei geänderten Daten neu serialisiert; bei passendem
+    If-None-Match wird 304 Not Modified ohne Inhalt geliefert. Mit
+    `Accept: application/msgpack` wird MessagePack statt JSON geliefert.
+    """
+    return await _status_response(wireguard_monitor, if_none_match, accept)
+
+@router.get("/status/{interface}", response_model=WireGuardStatus)
+async def get_interface_status(
+    interface: str,
+    if_none_match: Optional[str] = Header(None),
+    accept: Optional[str] = Header(None)
+):
+    """Gibt den aktuellen WireGuard-Status eines bestimmten Interfaces zurück."""
+    return await _status_response(get_monitor(interface), if_none_match, accept)
+
+@router.get("/interfaces", response_model=WireGuardOverview)
+async def get_interfaces_overview():
+    """Aggregierte Übersicht über alle überwachten Interfaces mit Fehlerstatus und Peer-Anzahlen."""
+    return monitor_group.summary()
+
+@router.get("/traffic", response_model=TrafficRateSeries)
+async def get_traffic_rates(
+    public_key: Optional[str] = Query(None, description="Öffentlicher Schlüssel des Peers; ohne Angabe das gesamte Interface"),
+    limit: Optional[int] = Query(None, ge=1, description="Maximale Anzahl der neuesten Messpunkte"),
+    interface: Optional[str] = Query(None, description="Interface (Standard: erstes überwachtes Interface)")
+):
+    """
+    Gibt die Übertragungsraten (Bytes pro Sekunde) der letzten Durchläufe zurück,
+    entweder für einen Peer oder für das gesamte Interface.
+    """
+    monitor = get_monitor(interface)
+    if public_key is None:
+        samples = monitor.traffic.interface_series(limit)
+    else:
+        samples = monitor.traffic.peer_series(public_key, limit)
+        if samples is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Keine Ratendaten für diesen Peer verfügbar"
+            )
+    return {
+        "interface": monitor.interface,
+        "public_key": public_key,
+        "samples": [
+            {"timestamp": datetime.fromtimestamp(ts).isoformat(), "rx_rate": rx, "tx_rate": tx}
+            for ts, rx, tx in samples
+        ]
+    }
+
+@router.get("/history", response_model=PeerHistory)
+async def get_peer_history(
+    public_key: str = Query(..., description="Öffentlicher Schlüssel des Peers"),
+    start: Optional[datetime] = Query(None, description="Beginn des Zeitraums (Standard: vor 24 Stunden)"),
+    end: Optional[datetime] = Query(None, description="Ende des Zeitraums (Standard: jetzt)"),
+    interface: Optional[str] = Query(None, description="Interface (Standard: erstes überwachtes Interface)")
+):
+    """
+    Gibt den gespeicherten Verlauf eines Peers zurück.
+    Ältere Zeiträume werden in verdichteter Auflösung (5 Minuten, 1 Stunde) geliefert.
+    """
+    monitor = get_monitor(interface)
+    if monitor.history is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Der Verlaufsspeicher ist deaktiviert"
+        )
+    end_ts = end.timestamp() if end else time.time()
+    start_ts = start.timestamp() if start else end_ts - 86400
+    samples = await asyncio.to_thread(monitor.history.query, public_key, start_ts, end_ts)
+    return {
+        "interface": monitor.interface,
+        "public_key": public_key,
+        "samples": [
+            {
+                "timestamp": datetime.fromtimestamp(sample.timestamp).isoformat(),
+                "transfer_rx": sample.transfer_rx,
+                "transfer_tx": sample.transfer_tx,
+                "latest_handshake": sample.latest_handshake,
+                "endpoint": sample.endpoint
+            }
+            for sample in samples
+        ]
+    }
+
+@router.get("/usage", response_model=PeerUsageList)
+async def get_peer_usage(
+    public_key: Optional[str] = Query(None, description="Öffentlicher Schlüssel des Peers; ohne Angabe alle Peers"),
+    interface: Optional[str] = Query(None, description="Interface (Standard: erstes überwachtes Interface)")
+):
+    """
+    Gibt die monotonen Gesamtsummen (Bytes) pro Peer zurück.
+    Die Summen laufen über Neustarts des Interfaces und des Dienstes hinweg weiter.
+    """
+    monitor = get_monitor(interface)
+    if monitor.accounting is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Die Erfassung der Gesamtsummen ist deaktiviert"
+        )
+    if public_key is not None:
+        usage = monitor.accounting.usage(public_key)
+        if usage is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Peer nicht gefunden"
+            )
+        peers = [usage]
+    else:
+        peers = monitor.accounting.all_usage()
+    return {
+        "interface": monitor.interface,
+        "peers": [usage._asdict() for usage in peers]
+    }
+
+@router.get("/top", response_model=TopPeerList)
+async def get_top_peers(
+    by: Literal["rate", "rx_rate", "tx_rate", "total", "handshake_age"] = Query(
+        "rate", description="Kennzahl: aktuelle Rate (gesamt, rx, tx), kumulierter Verkehr oder Alter des Handshakes"
+    ),
+    limit: int = Query(20, ge=1, le=100, description="Anzahl der Peers"),
+    interface: Optional[str] = Query(None, description="Interface (Standard: erstes überwachtes Interface)")
+):
+    """
+    Gibt die Top-N-Peers nach aktueller Rate, kumuliertem Verkehr oder Alter des letzten
+    Handshakes zurück (z.B. die 20 stärksten Verbraucher oder die am längsten stillen Peers).
+    Die Ranglisten werden höchstens einmal pro Monitor-Durchlauf bestimmt.
+    """
+    monitor = get_monitor(interface)
+    rankings = monitor.rankings
+    return {
+        "interface": monitor.interface,
+        "by": by,
+        "timestamp": datetime.fromtimestamp(rankings.timestamp).isoformat() if rankings.timestamp else None,
+        "peers": [
+            {
+                "public_key": peer.public_key,
+                "value": value,
+                "endpoint": peer.endpoint,
+                "allowed_ips": list(peer.allowed_ips),
+                "latest_handshake": peer.latest_handshake,
+                "online": peer.online,
+                "type": peer.type
+            }
+            for value, peer in rankings.top(by, limit)
+        ]
+    }
+
+async def list_peer_sessions(
+    monitor: WireGuardMonitor,
+    public_key: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    limit: Optional[int] = None
+) -> Dict[str, Any]:
+    """Sitzungen eines Peers im Format von `PeerSessionList` (auch für die Client-API)."""
+    if monitor.sessions is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Die Erfassung der Sitzungen ist deaktiviert"
+        )
+    sessions = await asyncio.to_thread(
+        monitor.sessions.sessions,
+        public_key,
+        start.timestamp() if start else None,
+        end.timestamp() if end else None,
+        limit,
+        monitor.get_peer(public_key)
+    )
+    now = time.time()
+    return {
+        "interface": monitor.interface,
+        "public_key": public_key,
+        "sessions": [
+            {
+                "start": datetime.fromtimestamp(session.start).isoformat(),
+                "end": datetime.fromtimestamp(session.end).isoformat() if session.end is not None else None,
+                "duration": (session.end if session.end is not None else now) - session.start,
+                "endpoint": session.endpoint,
+                "transfer_rx": session.transfer_rx,
+                "transfer_tx": session.transfer_tx
+            }
+            for session in sessions
+        ]
+    }
+
+@router.get("/sessions", response_model=PeerSessionList)
+async def get_peer_sessions(
+    public_key: str = Query(..., description="Öffentlicher Schlüssel des Peers"),
+    start: Optional[datetime] = Query(None, description="Nur Sitzungen, die nach diesem Zeitpunkt enden"),
+    end: Optional[datetime] = Query(None, description="Nur Sitzungen, die vor diesem Zeitpunkt beginnen"),
+    limit: Optional[int] = Query(None, ge=1, description="Maximale Anzahl der neuesten Sitzungen"),
+    interface: Optional[str] = Query(None, description="Interface (Standard: erstes überwachtes Interface)")
+):
+    """
+    Gibt die Verbindungssitzungen eines Peers zurück (Beginn, Ende, Dauer, Endpunkt und
+    übertragene Bytes), einschließlich einer noch offenen Sitzung.
+    """
+    return await list_peer_sessions(get_monitor(interface), public_key, start, end, limit)
+
+@router.get("/stream")
+async def stream_peer_updates(
+    request: Request,
+    interface: Optional[str] = Query(None, description="Interface (Standard: erstes überwachtes Interface)")
+):
+    """
+    Server-Sent-Events-Stream mit Live-Aktualisierungen der Peers.
+    Liefert zuerst einen `snapshot` (vollständiger Status) und danach nach jedem
+    Monitor-Durchlauf ein `delta` mit den geänderten Peers. Langsame Clients
+    erhalten statt verworfener Deltas einen neuen `snapshot`.
+    """
+    hub = peer_streams[get_monitor(interface).interface]
+    return StreamingResponse(
+        hub.stream(request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
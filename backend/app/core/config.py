@@ -1,4 +1,4 @@
-from typing import List
+from typing import Dict, List, Optional
 from pydantic_settings import BaseSettings
 from pydantic import AnyHttpUrl
 
@@ -17,6 +17,65 @@ class Settings(BaseSettings):
     POSTGRES_PASSWORD: str = "postgres"
     POSTGRES_DB: str = "wireguard"
     SQLALCHEMY_DATABASE_URI: str = f"postgresql://{POSTGRES_USER}:{POSTGRES_PASSWORD}@{POSTGRES_SERVER}/{POSTGRES_DB}"
+    # Asynchroner Datenbankzugriff (asyncpg) für die Client-API; ohne asyncpg wird der synchrone Pfad verwendet
+    DATABASE_ASYNC_ENABLED: bool = True
+    # Leer = aus SQLALCHEMY_DATABASE_URI mit dem Treiber postgresql+asyncpg
+    SQLALCHEMY_ASYNC_DATABASE_URI: Optional[str] = None
+    # Verbindungspool (gilt je Engine, synchron und asynchron)
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800
+    # Maximales Alter der Client-Zusammenfassung (Gesamtzahl, aktive Clients, Transfer) in Sekunden;
+    # eigene Änderungen wirken sofort, Änderungen anderer Prozesse spätestens danach
+    CLIENT_SUMMARY_MAX_AGE: int = 30
+    # Massenimport/-export der Clients
+    CLIENT_IMPORT_MAX_ROWS: int = 10000
+    CLIENT_IMPORT_MAX_BYTES: int = 10 * 1024 * 1024
+    CLIENT_IMPORT_BATCH_SIZE: int = 500
+    CLIENT_EXPORT_BATCH_SIZE: int = 1000
+
+    # WireGuard-Monitor
+    # Zu überwachende Interfaces; leer = alle `<interface>.conf` in WIREGUARD_CONFIG_DIR
+    WIREGUARD_INTERFACES: List[str] = []
+    WIREGUARD_CONFIG_DIR: str = "/etc/wireguard"
+    WIREGUARD_CHECK_INTERVAL: int = 15
+    # Peer-Typ: Rolle -> IPv4-/IPv6-Präfixe (spezifischstes Präfix gewinnt), als JSON in der Umgebung
+    WIREGUARD_PEER_ROLES: Dict[str, List[str]] = {"admin": ["10.10.10.0/24"], "user": ["10.10.11.0/24"]}
+    # Adaptives Intervall: Minimum bei Aktivität/Live-Verbindungen (leer = WIREGUARD_CHECK_INTERVAL), Obergrenze im Leerlauf
+    WIREGUARD_ADAPTIVE_INTERVAL: bool = True
+    WIREGUARD_MIN_CHECK_INTERVAL: Optional[int] = None
+    WIREGUARD_MAX_CHECK_INTERVAL: int = 120
+    # Gesamtrate in Bytes/s, ab der ein Interface als aktiv gilt
+    WIREGUARD_ACTIVITY_THRESHOLD: float = 1024.0
+    # Live-Statistiken (Handshake, Transfer) in die Tabelle `clients` übernehmen
+    WIREGUARD_CLIENT_SYNC_ENABLED: bool = True
+    # Monotone Gesamtsummen pro Peer (über Zähler-Resets und Neustarts hinweg)
+    WIREGUARD_ACCOUNTING_ENABLED: bool = True
+    WIREGUARD_ACCOUNTING_DIR: str = "app/data/wireguard_accounting"
+    WIREGUARD_ACCOUNTING_FLUSH_INTERVAL: int = 60
+    # Verbindungssitzungen der Peers (Beginn, Ende, Endpunkt, Verkehr)
+    WIREGUARD_SESSIONS_ENABLED: bool = True
+    WIREGUARD_SESSIONS_DIR: str = "app/data/wireguard_sessions"
+    WIREGUARD_SESSIONS_CHECKPOINT_INTERVAL: int = 60
+    # Quelle der Peer-Statistiken: "auto" (Netlink, Rückfall auf `wg`), "netlink", "wg" oder "fake"
+    WIREGUARD_COLLECTOR: str = "auto"
+    WIREGUARD_WG_PATH: str = "wg"
+    # Unix-Socket des privilegierten Helpers (`python -m app.utils.privileged_helper`); leer = sudo pro Aufruf
+    WIREGUARD_HELPER_SOCKET: Optional[str] = None
+    # Simulierte Peers für WIREGUARD_COLLECTOR="sim" (Lasttests ohne WireGuard)
+    WIREGUARD_SIM_PEERS: int = 1000
+    WIREGUARD_SIM_SEED: int = 0
+    # Ratenpuffer: Anzahl der Durchläufe (240 x 15 s = 1 Stunde) und maximale Peer-Anzahl
+    WIREGUARD_TRAFFIC_WINDOW: int = 240
+    WIREGUARD_TRAFFIC_MAX_PEERS: int = 20000
+    # Dauerhafter Verlaufsspeicher (Aufbewahrung in Sekunden je Auflösung)
+    WIREGUARD_HISTORY_ENABLED: bool = True
+    WIREGUARD_HISTORY_DIR: str = "app/data/wireguard_history"
+    WIREGUARD_HISTORY_RAW_RETENTION: int = 2 * 86400
+    WIREGUARD_HISTORY_5M_RETENTION: int = 30 * 86400
+    WIREGUARD_HISTORY_1H_RETENTION: int = 365 * 86400
+    WIREGUARD_HISTORY_COMPACTION_INTERVAL: int = 300
 
     class Config:
         case_sensitive = True
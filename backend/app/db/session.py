@@ -1,6 +1,46 @@
+import logging
+from typing import Optional, Tuple
+
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker
 from app.core.config import settings
 
-engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, pool_pre_ping=True)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine) 
\ No newline at end of file
+# Logger konfigurieren
+logger = logging.getLogger(__name__)
+
+POOL_OPTIONS = {
+    "pool_pre_ping": True,
+    "pool_size": settings.DB_POOL_SIZE,
+    "max_overflow": settings.DB_MAX_OVERFLOW,
+    "pool_timeout": settings.DB_POOL_TIMEOUT,
+    "pool_recycle": settings.DB_POOL_RECYCLE
+}
+
+engine = create_engine(settings.SQLALCHEMY_DATABASE_URI, **POOL_OPTIONS)
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+def async_database_uri() -> str:
+    if settings.SQLALCHEMY_ASYNC_DATABASE_URI:
+        return settings.SQLALCHEMY_ASYNC_DATABASE_URI
+    return make_url(settings.SQLALCHEMY_DATABASE_URI).set(drivername="postgresql+asyncpg").render_as_string(hide_password=False)
+
+def create_async_session_factory() -> Tuple[Optional[AsyncEngine], Optional[async_sessionmaker]]:
+    """
+    Erzeugt Engine und Session-Factory für den asynchronen Zugriff.
+
+    Returns:
+        (Engine, Session-Factory) oder (None, None), wenn deaktiviert oder der Treiber fehlt
+    """
+    if not settings.DATABASE_ASYNC_ENABLED:
+        return None, None
+    try:
+        async_engine = create_async_engine(async_database_uri(), **POOL_OPTIONS)
+    except ImportError as e:
+        logger.warning(f"Asynchroner Datenbankzugriff nicht verfügbar, verwende synchronen Pfad: {e}")
+        return None, None
+    # Objekte bleiben nach dem Commit lesbar, ohne implizites Nachladen (in async nicht möglich)
+    return async_engine, async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+async_engine, AsyncSessionLocal = create_async_session_factory()
@@ -2,6 +2,7 @@ import asyncio
 import json
 import os
 from pathlib import Path
+from app.services.wireguard_collectors import FakeCollector
 from app.services.wireguard_monitor import WireGuardMonitor
 from app.core.logging import logger
 
@@ -11,26 +12,6 @@ PEER1PUBLICKEY0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789ABCDEFGHIJKLMN	(none
 PEER2PUBLICKEY0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789ABCDEFGHIJKLMN	(none)	192.168.1.101:51820	10.10.11.2/32	1647432100	2048	4096	25
 """
 
-class MockWireGuardMonitor(WireGuardMonitor):
-    """Eine Mock-Version des WireGuard-Monitors für Testzwecke."""
-    
-    async def _check_status(self):
-        """Überschreibt die Statusabfrage mit simulierten Daten."""
-        try:
-            # Verwende simulierte Daten
-            status_data = self._parse_wg_dump(SIMULATED_WG_DUMP)
-            
-            # Speichere die Statusdaten
-            await self._save_status(status_data)
-            
-            # Prüfe auf Änderungen
-            if self._has_status_changed(status_data):
-                logger.info(f"WireGuard-Status für {self.interface} hat sich geändert.")
-                self.last_status = status_data
-        
-        except Exception as e:
-            logger.error(f"Fehler bei der Statusabfrage: {e}")
-
 async def main():
     # Erstelle ein temporäres Verzeichnis für die Statusdaten
     temp_dir = Path("/tmp/wireguard-monitor-example")
@@ -38,15 +19,23 @@ async def main():
     
     logger.info(f"Verwende temporäres Verzeichnis: {temp_dir}")
     
-    # Erstelle eine Instanz des Mock-WireGuard-Monitors
-    monitor = MockWireGuardMonitor(
+    # Erstelle eine Instanz des WireGuard-Monitors mit simulierten Daten
+    monitor = WireGuardMonitor(
         interface="wg0",
         status_dir=str(temp_dir),
         check_interval=5,  # Kürzeres Intervall für das Beispiel
         admin_subnet="10.10.10.0/24",
-        user_subnet="10.10.11.0/24"
+        user_subnet="10.10.11.0/24",
+        collector=FakeCollector.from_dump_output("wg0", SIMULATED_WG_DUMP)
     )
     
+    # Gib die Peer-Ereignisse jedes Durchlaufs aus
+    def log_events(events):
+        for event in events:
+            logger.info(f"Peer-Ereignis {event.type.value}: {event.public_key}")
+    
+    monitor.subscribe(log_events)
+    
     # Starte den Monitor in einer Hintergrund-Task
     logger.info("Starte WireGuard-Monitor...")
     monitor_task = asyncio.create_task(monitor.start())
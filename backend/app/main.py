@@ -1,13 +1,15 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 import asyncio
 from app.core.config import settings
 from app.core.logging import logger
 from app.api.v1.api import router as api_v1_router
-from app.db.session import engine
+from app.db.session import engine, async_engine
 from app.db.session import SessionLocal
-from app.api.v1.endpoints.wireguard import wireguard_monitor
-from app.api.endpoints import clients
+from app.api.v1.endpoints.wireguard import monitor_group
+from app.api.endpoints import clients, metrics
+from app.services import serialization
 
 # Globale Variable für die Monitor-Task
 monitor_task = None
@@ -16,7 +18,9 @@ def create_application() -> FastAPI:
     app = FastAPI(
         title="WireGuard Dashboard API",
         description="REST API für das WireGuard Dashboard",
-        version="1.0.0"
+        version="1.0.0",
+        # Schneller JSON-Encoder für alle Antworten, falls orjson installiert ist
+        default_response_class=ORJSONResponse if serialization.orjson is not None else JSONResponse
     )
 
     # CORS-Middleware
@@ -31,6 +35,7 @@ def create_application() -> FastAPI:
     # Router einbinden
     app.include_router(api_v1_router, prefix=settings.API_V1_STR)
     app.include_router(clients.router, prefix="/api", tags=["clients"])
+    app.include_router(metrics.router, tags=["metrics"])
 
     @app.on_event("startup")
     async def startup_event():
@@ -40,7 +45,7 @@ def create_application() -> FastAPI:
             
         # Starte den WireGuard-Monitor in einer Hintergrund-Task
         logger.info("Starte WireGuard-Monitor...")
-        monitor_task = asyncio.create_task(wireguard_monitor.start())
+        monitor_task = asyncio.create_task(monitor_group.start())
 
     @app.on_event("shutdown")
     async def shutdown_event():
@@ -49,7 +54,7 @@ def create_application() -> FastAPI:
         logger.info(f"Shutting down {settings.PROJECT_NAME}")
         
         # Stoppe den WireGuard-Monitor
-        wireguard_monitor.stop()
+        monitor_group.stop()
         
         # Warte auf das Ende der Monitor-Task
         if monitor_task:
@@ -58,6 +63,10 @@ def create_application() -> FastAPI:
             except asyncio.TimeoutError:
                 logger.warning("Timeout beim Warten auf das Ende des WireGuard-Monitors")
 
+        # Verbindungen des asynchronen Pools schließen
+        if async_engine is not None:
+            await async_engine.dispose()
+
     return app
 
 app = create_application() 
\ No newline at end of file
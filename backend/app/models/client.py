@@ -1,9 +1,21 @@
-from sqlalchemy import Column, Integer, String, Boolean, DateTime, ARRAY
+from sqlalchemy import Column, Index, Integer, BigInteger, String, Boolean, DateTime, ARRAY
 from sqlalchemy.sql import func
 from app.db.base_class import Base
 
 class Client(Base):
     __tablename__ = "clients"
+    __table_args__ = (
+        # Stabile Sortierung und Keyset-Pagination für GET /api/clients
+        Index("ix_clients_created_at_id", "created_at", "id"),
+        Index("ix_clients_name_id", "name", "id"),
+        # Suche (GET /api/clients/search): Teilstrings über Trigramme (pg_trgm), Schlüsselpräfix,
+        # enthaltene Netze über das Array der erlaubten IPs und Online-Status über den letzten Handshake
+        Index("ix_clients_name_trgm", "name", postgresql_using="gin", postgresql_ops={"name": "gin_trgm_ops"}),
+        Index("ix_clients_email_trgm", "email", postgresql_using="gin", postgresql_ops={"email": "gin_trgm_ops"}),
+        Index("ix_clients_public_key_prefix", "public_key", postgresql_ops={"public_key": "varchar_pattern_ops"}),
+        Index("ix_clients_allowed_ips", "allowed_ips", postgresql_using="gin"),
+        Index("ix_clients_last_handshake", "last_handshake"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(64), nullable=False)
@@ -14,5 +26,6 @@ class Client(Base):
     is_active = Column(Boolean, default=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now())
     last_handshake = Column(DateTime(timezone=True))
-    transfer_rx = Column(Integer, default=0)
-    transfer_tx = Column(Integer, default=0) 
\ No newline at end of file
+    # Kumulative Zähler überschreiten schnell den Bereich von INTEGER
+    transfer_rx = Column(BigInteger, default=0)
+    transfer_tx = Column(BigInteger, default=0) 
\ No newline at end of file
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, IPvAnyAddress, constr
+from pydantic import BaseModel, Field, IPvAnyAddress, constr
 from typing import Optional, List
 from datetime import datetime
 
@@ -28,7 +28,14 @@ class ClientResponse(ClientBase):
 
 class ClientList(BaseModel):
     clients: List[ClientResponse]
+    # Zwischengespeicherte Gesamtzahl (siehe CLIENT_SUMMARY_MAX_AGE)
     total: int
+    # Cursor für die nächste Seite; None auf der letzten Seite
+    next_cursor: Optional[str] = None
+
+class ClientSearchResult(BaseModel):
+    clients: List[ClientResponse] = Field(..., description="Treffer der Seite")
+    next_cursor: Optional[str] = Field(None, description="Cursor für die nächste Seite; None auf der letzten Seite")
 
 class SystemStatus(BaseModel):
     total_clients: int
@@ -36,4 +43,17 @@ class SystemStatus(BaseModel):
     total_transfer_rx: int
     total_transfer_tx: int
     server_uptime: float
-    last_updated: datetime 
\ No newline at end of file
+    last_updated: datetime
+
+class ClientImportError(BaseModel):
+    row: int = Field(..., description="Zeile im Import (ab 1, ohne CSV-Kopfzeile)")
+    public_key: Optional[str] = Field(None, description="Öffentlicher Schlüssel der Zeile, falls lesbar")
+    errors: List[str] = Field(..., description="Fehlermeldungen der Zeile")
+
+class ClientImportResult(BaseModel):
+    received: int = Field(..., description="Anzahl der gelesenen Zeilen")
+    created: int = Field(..., description="Anzahl der angelegten Clients")
+    failed: int = Field(..., description="Anzahl der fehlerhaften Zeilen")
+    errors: List[ClientImportError] = Field(default_factory=list, description="Fehler pro Zeile")
+    interface: Optional[str] = Field(None, description="Interface, auf das die neuen Peers angewendet wurden")
+    applied: bool = Field(False, description="Ob die Konfiguration des Interfaces aktualisiert wurde")
@@ -62,7 +62,7 @@ class WireGuardPeerStatus(BaseModel):
     persistent_keepalive: Optional[str] = Field(None, description="Persistent Keepalive Intervall")
     online: bool = Field(False, description="Online-Status des Peers")
     last_activity: Optional[str] = Field(None, description="Zeitpunkt der letzten Aktivität")
-    type: str = Field("unknown", description="Typ des Peers (admin, user, unknown)")
+    type: str = Field("unknown", description="Typ des Peers (Rolle aus WIREGUARD_PEER_ROLES, z.B. admin oder user; sonst unknown)")
 
 class WireGuardStatus(BaseModel):
     """Schema für den WireGuard-Status."""
@@ -70,4 +70,111 @@ class WireGuardStatus(BaseModel):
     interface: str = Field(..., description="Name des WireGuard-Interfaces")
     public_key: Optional[str] = Field(None, description="Öffentlicher Schlüssel des Interfaces")
     listen_port: Optional[str] = Field(None, description="Port, auf dem das Interface lauscht")
-    peers: List[WireGuardPeerStatus] = Field([], description="Liste der Peers") 
\ No newline at end of file
+    peers: List[WireGuardPeerStatus] = Field([], description="Liste der Peers") 
+
+class PhaseTiming(BaseModel):
+    """Schema für die Dauer einer Phase des Monitor-Durchlaufs in Sekunden."""
+    last: float = Field(..., description="Dauer im letzten Durchlauf")
+    average: float = Field(..., description="Gleitender Mittelwert")
+    max: float = Field(..., description="Maximale Dauer seit dem Start")
+
+class SchedulerStats(BaseModel):
+    """Schema für den Zustand des Monitor-Schedulers."""
+    interval: float = Field(..., description="Aktuelles Intervall zwischen zwei Durchläufen in Sekunden")
+    ticks: int = Field(0, description="Anzahl der ausgeführten Durchläufe")
+    overruns: int = Field(0, description="Anzahl der Durchläufe, die länger als das Intervall dauerten")
+    skipped_ticks: int = Field(0, description="Wegen Überläufen übersprungene Durchläufe")
+    last_started: Optional[str] = Field(None, description="Startzeitpunkt des letzten Durchlaufs")
+    last_duration: float = Field(0.0, description="Dauer des letzten Durchlaufs in Sekunden")
+    average_duration: float = Field(0.0, description="Gleitender Mittelwert der Durchlaufdauer")
+    max_duration: float = Field(0.0, description="Maximale Durchlaufdauer")
+
+class WireGuardInterfaceSummary(BaseModel):
+    """Schema für die Kurzübersicht eines überwachten Interfaces."""
+    interface: str = Field(..., description="Name des WireGuard-Interfaces")
+    healthy: bool = Field(..., description="Ob der letzte Durchlauf erfolgreich war")
+    last_error: Optional[str] = Field(None, description="Fehlermeldung des letzten Durchlaufs")
+    timestamp: Optional[str] = Field(None, description="Zeitstempel der letzten erfolgreichen Statusabfrage")
+    changed_at: Optional[str] = Field(None, description="Zeitstempel der letzten Änderung des Status")
+    peers: int = Field(0, description="Anzahl der Peers")
+    online_peers: int = Field(0, description="Anzahl der Peers mit aktuellem Handshake")
+    next_interval: float = Field(..., description="Intervall bis zur nächsten Abfrage in Sekunden")
+    watchers: int = Field(0, description="Anzahl der Live-Verbindungen")
+    phases: Dict[str, PhaseTiming] = Field({}, description="Dauer der Phasen collect, parse, diff, persist und sync")
+
+class WireGuardOverview(BaseModel):
+    """Schema für die aggregierte Übersicht über alle Interfaces."""
+    scheduler: SchedulerStats = Field(..., description="Zustand des gemeinsamen Schedulers")
+    interfaces: List[WireGuardInterfaceSummary] = Field([], description="Übersicht pro Interface")
+    total_peers: int = Field(0, description="Anzahl der Peers aller Interfaces")
+    online_peers: int = Field(0, description="Anzahl der online befindlichen Peers aller Interfaces")
+
+class TrafficRateSample(BaseModel):
+    """Schema für einen Messpunkt der Übertragungsrate."""
+    timestamp: str = Field(..., description="Zeitpunkt des Durchlaufs")
+    rx_rate: float = Field(..., description="Empfangsrate in Bytes pro Sekunde")
+    tx_rate: float = Field(..., description="Senderate in Bytes pro Sekunde")
+
+class TrafficRateSeries(BaseModel):
+    """Schema für die Ratenreihe eines Peers oder des gesamten Interfaces."""
+    interface: str = Field(..., description="Name des WireGuard-Interfaces")
+    public_key: Optional[str] = Field(None, description="Öffentlicher Schlüssel des Peers (leer für das Interface)")
+    samples: List[TrafficRateSample] = Field([], description="Messpunkte, ältester zuerst")
+
+class PeerHistorySample(BaseModel):
+    """Schema für einen gespeicherten Messpunkt eines Peers."""
+    timestamp: str = Field(..., description="Zeitpunkt des Messpunkts")
+    transfer_rx: int = Field(..., description="Empfangene Bytes (kumulativ)")
+    transfer_tx: int = Field(..., description="Gesendete Bytes (kumulativ)")
+    latest_handshake: int = Field(0, description="Zeitstempel des letzten Handshakes")
+    endpoint: Optional[str] = Field(None, description="Endpunkt des Peers (IP:Port)")
+
+class PeerHistory(BaseModel):
+    """Schema für den Verlauf eines Peers."""
+    interface: str = Field(..., description="Name des WireGuard-Interfaces")
+    public_key: str = Field(..., description="Öffentlicher Schlüssel des Peers")
+    samples: List[PeerHistorySample] = Field([], description="Messpunkte, ältester zuerst")
+
+class PeerUsage(BaseModel):
+    """Schema für die monotonen Gesamtsummen eines Peers."""
+    public_key: str = Field(..., description="Öffentlicher Schlüssel des Peers")
+    total_rx: int = Field(..., description="Empfangene Bytes seit Beginn der Erfassung")
+    total_tx: int = Field(..., description="Gesendete Bytes seit Beginn der Erfassung")
+    resets: int = Field(0, description="Anzahl der erkannten Zähler-Resets")
+
+class PeerUsageList(BaseModel):
+    """Schema für die Gesamtsummen aller Peers eines Interfaces."""
+    interface: str = Field(..., description="Name des WireGuard-Interfaces")
+    peers: List[PeerUsage] = Field([], description="Gesamtsummen pro Peer")
+
+class TopPeer(BaseModel):
+    """Schema für einen Eintrag einer Top-N-Rangliste"""
+    public_key: str = Field(..., description="Öffentlicher Schlüssel des Peers")
+    value: float = Field(..., description="Wert der Kennzahl (Bytes/s, Bytes oder Sekunden)")
+    endpoint: Optional[str] = Field(None, description="Endpunkt des Peers (IP:Port)")
+    allowed_ips: List[str] = Field([], description="Erlaubte IP-Adressen")
+    latest_handshake: int = Field(0, description="Zeitstempel des letzten Handshakes")
+    online: bool = Field(False, description="Online-Status des Peers")
+    type: str = Field("unknown", description="Typ des Peers (Rolle aus WIREGUARD_PEER_ROLES, z.B. admin oder user; sonst unknown)")
+
+class TopPeerList(BaseModel):
+    """Schema für die Top-N-Peers eines Interfaces"""
+    interface: str = Field(..., description="Name des WireGuard-Interfaces")
+    by: str = Field(..., description="Kennzahl: rate, rx_rate, tx_rate, total oder handshake_age")
+    timestamp: Optional[str] = Field(None, description="Zeitpunkt des zugrunde liegenden Durchlaufs")
+    peers: List[TopPeer] = Field([], description="Peers absteigend nach der Kennzahl")
+
+class PeerSession(BaseModel):
+    """Schema für eine Verbindungssitzung eines Peers"""
+    start: str = Field(..., description="Beginn der Sitzung (Handshake, der den Peer online brachte)")
+    end: Optional[str] = Field(None, description="Ende der Sitzung (leer, solange sie andauert)")
+    duration: float = Field(..., description="Dauer in Sekunden (bei offenen Sitzungen bis jetzt)")
+    endpoint: Optional[str] = Field(None, description="Endpunkt des Peers während der Sitzung (IP:Port)")
+    transfer_rx: int = Field(0, description="In der Sitzung empfangene Bytes")
+    transfer_tx: int = Field(0, description="In der Sitzung gesendete Bytes")
+
+class PeerSessionList(BaseModel):
+    """Schema für die Sitzungen eines Peers"""
+    interface: str = Field(..., description="Name des WireGuard-Interfaces")
+    public_key: str = Field(..., description="Öffentlicher Schlüssel des Peers")
+    sessions: List[PeerSession] = Field([], description="Sitzungen, älteste zuerst")
@@ -1,5 +1,72 @@
+from .wireguard_collectors import (
+    CollectorError,
+    PeerCollector,
+    WgCommandCollector,
+    NetlinkCollector,
+    FakeCollector,
+    SimulatorCollector,
+    FallbackCollector,
+    create_collector
+)
+from .client_sync import ClientStatsSync
+from .client_summary import ClientSummary, ClientSummaryCache
+from .peer_accounting import PeerAccounting, PeerUsage
+from .peer_rankings import PeerRankings
+from .peer_sessions import PeerSession, PeerSessionLog
+from .peer_roles import PrefixTable, RoleClassifier
+from .peer_records import PeerRecord, build_status, peer_to_dict, status_to_dict
+from .peer_events import PeerEvent, PeerEventType, PeerEventBus, diff_peers
+from .status_snapshot import StatusSnapshot, SnapshotStore
+from .status_file import StatusFile
+from .peer_stream import PeerStreamHub
+from .tick_scheduler import AdaptiveInterval, PhaseTimer, TickScheduler
+from .traffic_buffer import TrafficRingBuffer
+from .traffic_history import HistoryLevel, TrafficHistoryStore
+from .monitor_phases import MonitorPhases
 from .wireguard_monitor import WireGuardMonitor
+from .monitor_group import WireGuardMonitorGroup, discover_interfaces
+from .metrics_exporter import MetricsExporter
 
 __all__ = [
-    'WireGuardMonitor'
+    'CollectorError',
+    'PeerCollector',
+    'WgCommandCollector',
+    'NetlinkCollector',
+    'FakeCollector',
+    'SimulatorCollector',
+    'FallbackCollector',
+    'create_collector',
+    'ClientStatsSync',
+    'ClientSummary',
+    'ClientSummaryCache',
+    'PeerAccounting',
+    'PeerUsage',
+    'PeerRankings',
+    'PeerRecord',
+    'PeerSession',
+    'PeerSessionLog',
+    'PrefixTable',
+    'RoleClassifier',
+    'build_status',
+    'peer_to_dict',
+    'status_to_dict',
+    'PeerEvent',
+    'PeerEventType',
+    'PeerEventBus',
+    'diff_peers',
+    'StatusSnapshot',
+    'SnapshotStore',
+    'StatusFile',
+    'PeerStreamHub',
+    'AdaptiveInterval',
+    'PhaseTimer',
+    'TickScheduler',
+    'TrafficRingBuffer',
+    'HistoryLevel',
+    'TrafficHistoryStore',
+    'MonitorPhases',
+    'WireGuardMonitor',
+    'WireGuardMonitorGroup',
+    'discover_interfaces',
+    'MetricsExporter'
 ] 
\ No newline at end of file
@@ -1,60 +1,319 @@
+from abc import ABC, abstractmethod
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from sqlalchemy.sql import func
+from sqlalchemy import Select, insert, select
+from sqlalchemy.sql.elements import ColumnElement
+from starlette.concurrency import iterate_in_threadpool, run_in_threadpool
 from datetime import datetime
-import psutil
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Set, Tuple
 
+from app.core.config import settings
+from app.db.session import AsyncSessionLocal, SessionLocal
 from app.models.client import Client
 from app.schemas.client import ClientCreate, SystemStatus
+from app.services.client_pagination import InvalidCursorError, clients_page_statement, clients_statement, split_page
+from app.services.client_summary import ClientSummaryCache
+
+# Zusammenfassung der Clients für alle Anfragen des Prozesses
+client_summary = ClientSummaryCache(SessionLocal, settings.CLIENT_SUMMARY_MAX_AGE)
+
+def new_client(client: ClientCreate) -> Client:
+    return Client(
+        name=client.name,
+        public_key=client.public_key,
+        allowed_ips=client.allowed_ips,
+        email=client.email,
+        description=client.description,
+        is_active=True,
+        created_at=datetime.utcnow()
+    )
+
+def client_rows(clients: List[ClientCreate]) -> List[Dict[str, Any]]:
+    """Zeilen für ein Mehrfach-INSERT (gleiche Werte wie bei `create_client`)."""
+    now = datetime.utcnow()
+    return [
+        {
+            "name": client.name,
+            "public_key": client.public_key,
+            "allowed_ips": client.allowed_ips,
+            "email": client.email,
+            "description": client.description,
+            "is_active": True,
+            "created_at": now,
+            "transfer_rx": 0,
+            "transfer_tx": 0
+        }
+        for client in clients
+    ]
+
+def chunks(items: List[Any], size: int) -> Iterator[List[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def existing_keys_statement(public_keys: List[str]) -> Select:
+    return select(Client.public_key).where(Client.public_key.in_(public_keys))
+
+def export_statement(batch_size: int) -> Select:
+    # yield_per liest über einen serverseitigen Cursor in Blöcken
+    return select(Client).order_by(Client.id).execution_options(yield_per=batch_size)
+
+def system_status() -> SystemStatus:
+    """Status aus der Zusammenfassung im Speicher; ohne Datenbankzugriff, sobald sie geladen ist."""
+    summary = client_summary.get()
+    return SystemStatus(
+        total_clients=summary.total_clients,
+        active_clients=summary.active_clients,
+        total_transfer_rx=summary.total_transfer_rx,
+        total_transfer_tx=summary.total_transfer_tx,
+        server_uptime=client_summary.boot_time,
+        last_updated=summary.updated_at
+    )
 
 class ClientService:
     def __init__(self, db: Session):
         self.db = db
 
-    def get_clients(self, skip: int = 0, limit: int = 100):
-        return self.db.query(Client).offset(skip).limit(limit).all()
+    def get_clients(self, skip: int = 0, limit: int = 100, order: str = "created") -> List[Client]:
+        return list(self.db.scalars(clients_statement(skip, limit, order)))
+
+    def get_clients_page(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        order: str = "created",
+        filters: Sequence[ColumnElement] = (),
+        skip: int = 0
+    ) -> Tuple[List[Client], Optional[str]]:
+        """
+        Liefert eine Seite der Clients per Keyset-Pagination über (Sortierspalte, id),
+        optional eingeschränkt auf Bedingungen (z.B. aus `client_search.search_filters`).
+        Jede Seite kostet einen Indexzugriff, unabhängig davon, wie weit geblättert wurde.
+
+        Returns:
+            (Clients der Seite, Cursor der nächsten Seite oder None am Ende)
+        """
+        clients = list(self.db.scalars(clients_page_statement(limit, cursor, order, filters, skip)))
+        return split_page(clients, limit, order)
 
     def get_total_clients(self) -> int:
         return self.db.query(Client).count()
 
-    def get_client(self, client_id: int):
-        return self.db.query(Client).filter(Client.id == client_id).first()
-
-    def create_client(self, client: ClientCreate):
-        db_client = Client(
-            name=client.name,
-            public_key=client.public_key,
-            allowed_ips=client.allowed_ips,
-            email=client.email,
-            description=client.description,
-            is_active=True,
-            created_at=datetime.utcnow()
-        )
+    def get_cached_total_clients(self) -> int:
+        """Gesamtzahl aus der Zusammenfassung im Speicher (siehe CLIENT_SUMMARY_MAX_AGE)."""
+        return client_summary.get().total_clients
+
+    def get_client(self, client_id: int) -> Optional[Client]:
+        return self.db.get(Client, client_id)
+
+    def create_client(self, client: ClientCreate) -> Client:
+        db_client = new_client(client)
         self.db.add(db_client)
         self.db.commit()
         self.db.refresh(db_client)
+        client_summary.client_added(db_client)
         return db_client
 
-    def delete_client(self, client_id: int):
+    def delete_client(self, client_id: int) -> Optional[Client]:
+        """Löscht einen Client; liefert None, wenn er nicht existiert."""
         client = self.get_client(client_id)
         if client:
             self.db.delete(client)
             self.db.commit()
+            client_summary.client_removed(client)
+        return client
+
+    def get_existing_public_keys(self, public_keys: List[str]) -> Set[str]:
+        found: Set[str] = set()
+        for chunk in chunks(public_keys, 1000):
+            found.update(self.db.scalars(existing_keys_statement(chunk)))
+        return found
+
+    def insert_clients(self, clients: List[ClientCreate], batch_size: int = 500) -> int:
+        """
+        Legt viele Clients in einer Transaktion an (Mehrfach-INSERT in Blöcken);
+        schlägt ein Block fehl, wird nichts übernommen.
+        """
+        try:
+            for chunk in chunks(client_rows(clients), batch_size):
+                self.db.execute(insert(Client), chunk)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        client_summary.clients_added(len(clients))
+        return len(clients)
 
     def get_system_status(self) -> SystemStatus:
-        total_clients = self.get_total_clients()
-        active_clients = self.db.query(Client).filter(Client.is_active == True).count()
-        
-        # Aggregierte Transferstatistiken
-        transfer_stats = self.db.query(
-            func.coalesce(func.sum(Client.transfer_rx), 0).label('total_rx'),
-            func.coalesce(func.sum(Client.transfer_tx), 0).label('total_tx')
-        ).first()
-
-        return SystemStatus(
-            total_clients=total_clients,
-            active_clients=active_clients,
-            total_transfer_rx=transfer_stats.total_rx,
-            total_transfer_tx=transfer_stats.total_tx,
-            server_uptime=psutil.boot_time(),
-            last_updated=datetime.utcnow()
-        ) 
\ No newline at end of file
+        return system_status()
+
+class AsyncClientServiceBase(ABC):
+    """
+    Asynchrone Schnittstelle der Client-API; AsyncClientService und ThreadedClientService
+    unterscheiden sich nur im Datenbankzugriff.
+    """
+
+    @abstractmethod
+    async def get_clients(self, skip: int = 0, limit: int = 100, order: str = "created") -> List[Client]:
+        """Clients per Offset in derselben Reihenfolge wie `get_clients_page`."""
+
+    @abstractmethod
+    async def get_clients_page(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        order: str = "created",
+        filters: Sequence[ColumnElement] = (),
+        skip: int = 0
+    ) -> Tuple[List[Client], Optional[str]]:
+        """Siehe `ClientService.get_clients_page`."""
+
+    @abstractmethod
+    async def get_client(self, client_id: int) -> Optional[Client]:
+        """Ein Client oder None."""
+
+    @abstractmethod
+    async def create_client(self, client: ClientCreate) -> Client:
+        """Legt einen Client an."""
+
+    @abstractmethod
+    async def delete_client(self, client_id: int) -> Optional[Client]:
+        """Löscht einen Client; liefert None, wenn er nicht existiert."""
+
+    @abstractmethod
+    async def get_existing_public_keys(self, public_keys: List[str]) -> Set[str]:
+        """Die bereits vergebenen unter den angegebenen Schlüsseln."""
+
+    @abstractmethod
+    async def insert_clients(self, clients: List[ClientCreate], batch_size: int = 500) -> int:
+        """Legt viele Clients in einer Transaktion an."""
+
+    async def get_cached_total_clients(self) -> int:
+        await ensure_client_summary()
+        return client_summary.get().total_clients
+
+    async def get_system_status(self) -> SystemStatus:
+        await ensure_client_summary()
+        return system_status()
+
+class AsyncClientService(AsyncClientServiceBase):
+    """
+    Asynchrone Variante von ClientService über eine AsyncSession; Anfragen belegen
+    keinen Thread, solange sie auf die Datenbank warten.
+    """
+
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_clients(self, skip: int = 0, limit: int = 100, order: str = "created") -> List[Client]:
+        return list(await self.db.scalars(clients_statement(skip, limit, order)))
+
+    async def get_clients_page(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        order: str = "created",
+        filters: Sequence[ColumnElement] = (),
+        skip: int = 0
+    ) -> Tuple[List[Client], Optional[str]]:
+        clients = list(await self.db.scalars(clients_page_statement(limit, cursor, order, filters, skip)))
+        return split_page(clients, limit, order)
+
+    async def get_client(self, client_id: int) -> Optional[Client]:
+        return await self.db.get(Client, client_id)
+
+    async def create_client(self, client: ClientCreate) -> Client:
+        db_client = new_client(client)
+        self.db.add(db_client)
+        await self.db.commit()
+        await self.db.refresh(db_client)
+        client_summary.client_added(db_client)
+        return db_client
+
+    async def delete_client(self, client_id: int) -> Optional[Client]:
+        client = await self.get_client(client_id)
+        if client:
+            await self.db.delete(client)
+            await self.db.commit()
+            client_summary.client_removed(client)
+        return client
+
+    async def get_existing_public_keys(self, public_keys: List[str]) -> Set[str]:
+        found: Set[str] = set()
+        for chunk in chunks(public_keys, 1000):
+            found.update(await self.db.scalars(existing_keys_statement(chunk)))
+        return found
+
+    async def insert_clients(self, clients: List[ClientCreate], batch_size: int = 500) -> int:
+        try:
+            for chunk in chunks(client_rows(clients), batch_size):
+                await self.db.execute(insert(Client), chunk)
+            await self.db.commit()
+        except Exception:
+            await self.db.rollback()
+            raise
+        client_summary.clients_added(len(clients))
+        return len(clients)
+
+class ThreadedClientService(AsyncClientServiceBase):
+    """
+    Dieselbe Schnittstelle wie AsyncClientService über den synchronen ClientService (Komposition);
+    jeder Datenbankzugriff läuft im Threadpool (ohne asynchronen Treiber).
+    """
+
+    def __init__(self, db: Session):
+        self.service = ClientService(db)
+
+    async def get_clients(self, skip: int = 0, limit: int = 100, order: str = "created") -> List[Client]:
+        return await run_in_threadpool(self.service.get_clients, skip, limit, order)
+
+    async def get_clients_page(
+        self,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        order: str = "created",
+        filters: Sequence[ColumnElement] = (),
+        skip: int = 0
+    ) -> Tuple[List[Client], Optional[str]]:
+        return await run_in_threadpool(self.service.get_clients_page, limit, cursor, order, filters, skip)
+
+    async def get_client(self, client_id: int) -> Optional[Client]:
+        return await run_in_threadpool(self.service.get_client, client_id)
+
+    async def create_client(self, client: ClientCreate) -> Client:
+        return await run_in_threadpool(self.service.create_client, client)
+
+    async def delete_client(self, client_id: int) -> Optional[Client]:
+        return await run_in_threadpool(self.service.delete_client, client_id)
+
+    async def get_existing_public_keys(self, public_keys: List[str]) -> Set[str]:
+        return await run_in_threadpool(self.service.get_existing_public_keys, public_keys)
+
+    async def insert_clients(self, clients: List[ClientCreate], batch_size: int = 500) -> int:
+        return await run_in_threadpool(self.service.insert_clients, clients, batch_size)
+
+async def ensure_client_summary():
+    """Lädt die Zusammenfassung beim ersten Abruf im Threadpool statt in der Event-Loop."""
+    if not client_summary.loaded:
+        await run_in_threadpool(client_summary.get)
+
+async def stream_clients(batch_size: int = 1000) -> AsyncIterator[List[Client]]:
+    """
+    Liefert alle Clients in Blöcken, ohne die Tabelle in den Speicher zu laden.
+    Öffnet eine eigene Session, da die Antwort erst nach dem Ende des Endpunkts gestreamt wird.
+    """
+    statement = export_statement(batch_size)
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as db:
+            result = await db.stream_scalars(statement)
+            async for partition in result.partitions():
+                yield partition
+        return
+    async for partition in iterate_in_threadpool(_iter_clients(statement)):
+        yield partition
+
+def _iter_clients(statement: Select) -> Iterator[List[Client]]:
+    db = SessionLocal()
+    try:
+        yield from db.scalars(statement).partitions()
+    finally:
+        db.close()
@@ -0,0 +1,163 @@
+import base64
+import binascii
+import csv
+import io
+import ipaddress
+import logging
+import re
+from datetime import datetime
+from typing import Any, AsyncIterable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from pydantic import ValidationError
+
+from app.models.client import Client
+from app.schemas.client import ClientCreate
+from app.services.serialization import dumps_json, loads_json
+
+# Logger konfigurieren
+logger = logging.getLogger(__name__)
+
+# Spalten für CSV-Import und -Export (beim Import sind nur name, public_key und allowed_ips Pflicht)
+IMPORT_FIELDS = ("name", "public_key", "allowed_ips", "email", "description")
+EXPORT_FIELDS = (
+    "id", "name", "public_key", "allowed_ips", "email", "description", "is_active",
+    "created_at", "last_handshake", "transfer_rx", "transfer_tx"
+)
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+CSV_MEDIA_TYPE = "text/csv"
+
+class ImportTooLargeError(ValueError):
+    """Der Import überschreitet die zulässige Größe."""
+
+class ImportRowError(NamedTuple):
+    """Fehler einer Zeile des Imports (Zeilen ab 1, ohne CSV-Kopfzeile)."""
+    row: int
+    public_key: Optional[str]
+    errors: List[str]
+
+class ImportPlan(NamedTuple):
+    """Ergebnis der Prüfung: gültige Clients (mit Zeilennummer) und fehlerhafte Zeilen."""
+    clients: List[Tuple[int, ClientCreate]]
+    errors: List[ImportRowError]
+
+async def read_limited(chunks: AsyncIterable[bytes], max_bytes: int) -> bytes:
+    """
+    Liest einen Request-Body höchstens bis `max_bytes`; ein größerer Body wird nicht weiter gelesen.
+
+    Raises:
+        ImportTooLargeError: Wenn der Body größer als `max_bytes` ist
+    """
+    body = bytearray()
+    async for chunk in chunks:
+        body += chunk
+        if len(body) > max_bytes:
+            raise ImportTooLargeError(f"Höchstens {max_bytes} Bytes pro Import")
+    return bytes(body)
+
+def parse_import(body: bytes, content_type: Optional[str]) -> List[Dict[str, Any]]:
+    """
+    Liest die Zeilen eines Imports als JSON-Array oder CSV (mit Kopfzeile).
+    In CSV stehen mehrere erlaubte IPs durch Komma oder Leerzeichen getrennt in einer Spalte.
+
+    Raises:
+        ValueError: Wenn das Format nicht gelesen werden kann
+    """
+    media_type = (content_type or "").split(";")[0].strip().lower()
+    if media_type in (CSV_MEDIA_TYPE, "application/csv"):
+        reader = csv.DictReader(io.StringIO(body.decode("utf-8-sig")))
+        missing = [field for field in IMPORT_FIELDS[:3] if field not in (reader.fieldnames or [])]
+        if missing:
+            raise ValueError(f"Fehlende CSV-Spalten: {', '.join(missing)}")
+        rows = []
+        for row in reader:
+            row = {key: value for key, value in row.items() if key in IMPORT_FIELDS and value != ""}
+            if "allowed_ips" in row:
+                row["allowed_ips"] = [ip for ip in re.split(r"[,\s]+", row["allowed_ips"]) if ip]
+            rows.append(row)
+        return rows
+
+    data = loads_json(body)
+    if not isinstance(data, list):
+        raise ValueError("Erwartet wird ein JSON-Array von Clients")
+    return data
+
+def _validate_public_key(public_key: str) -> Optional[str]:
+    try:
+        if len(base64.b64decode(public_key, validate=True)) == 32:
+            return None
+    except (binascii.Error, ValueError):
+        pass
+    return "public_key ist kein gültiger WireGuard-Schlüssel (32 Byte, Base64)"
+
+def _normalize_allowed_ips(allowed_ips: Iterable[str]) -> Tuple[List[str], List[str]]:
+    networks, errors = [], []
+    for allowed_ip in allowed_ips:
+        try:
+            networks.append(str(ipaddress.ip_network(allowed_ip.strip(), strict=False)))
+        except ValueError:
+            errors.append(f"Ungültige erlaubte IP: {allowed_ip!r}")
+    if not networks and not errors:
+        errors.append("allowed_ips darf nicht leer sein")
+    return networks, errors
+
+def validate_import(rows: List[Any], existing_keys: Set[str] = frozenset()) -> ImportPlan:
+    """
+    Prüft alle Zeilen, bevor etwas geschrieben wird: Schema, Schlüssel, erlaubte IPs,
+    doppelte Schlüssel innerhalb des Imports und bereits vorhandene Schlüssel.
+    """
+    plan = ImportPlan([], [])
+    seen: Dict[str, int] = {}
+    for row_number, row in enumerate(rows, start=1):
+        raw_key = row.get("public_key") if isinstance(row, dict) else None
+        public_key = raw_key if isinstance(raw_key, str) else None
+        try:
+            client = ClientCreate.model_validate(row)
+        except ValidationError as e:
+            errors = [f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}" for error in e.errors()]
+            plan.errors.append(ImportRowError(row_number, public_key, errors))
+            continue
+
+        errors = []
+        key_error = _validate_public_key(client.public_key)
+        if key_error:
+            errors.append(key_error)
+        networks, ip_errors = _normalize_allowed_ips(client.allowed_ips)
+        errors.extend(ip_errors)
+        if client.public_key in seen:
+            errors.append(f"public_key bereits in Zeile {seen[client.public_key]} enthalten")
+        elif client.public_key in existing_keys:
+            errors.append("public_key existiert bereits")
+        seen.setdefault(client.public_key, row_number)
+
+        if errors:
+            plan.errors.append(ImportRowError(row_number, client.public_key, errors))
+        else:
+            plan.clients.append((row_number, client.model_copy(update={"allowed_ips": networks})))
+    return plan
+
+def client_to_row(client: Client) -> Dict[str, Any]:
+    row = {field: getattr(client, field) for field in EXPORT_FIELDS}
+    for field in ("created_at", "last_handshake"):
+        if isinstance(row[field], datetime):
+            row[field] = row[field].isoformat()
+    return row
+
+def ndjson_chunk(clients: Iterable[Client]) -> bytes:
+    """Serialisiert Clients als NDJSON (ein JSON-Objekt pro Zeile)."""
+    return b"".join(dumps_json(client_to_row(client)) + b"\n" for client in clients)
+
+def csv_header() -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(EXPORT_FIELDS)
+    return buffer.getvalue()
+
+def csv_chunk(clients: Iterable[Client]) -> str:
+    """Serialisiert Clients als CSV-Zeilen (erlaubte IPs durch Komma getrennt in einer Spalte)."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for client in clients:
+        row = client_to_row(client)
+        row["allowed_ips"] = ", ".join(row["allowed_ips"] or [])
+        writer.writerow(row[field] for field in EXPORT_FIELDS)
+    return buffer.getvalue()
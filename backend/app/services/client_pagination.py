@@ -0,0 +1,72 @@
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+import base64
+import json
+
+from sqlalchemy import Select, select, tuple_
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.models.client import Client
+
+# Sortierungen der Client-Liste: Name -> Sortierspalte (jeweils mit id als eindeutigem Abschluss)
+CLIENT_ORDERINGS = {
+    "created": Client.created_at,
+    "name": Client.name
+}
+
+class InvalidCursorError(ValueError):
+    """Der übergebene Cursor ist ungültig oder gehört zu einer anderen Sortierung."""
+
+def encode_cursor(order: str, client: Client) -> str:
+    """Erzeugt einen undurchsichtigen Cursor hinter dem angegebenen Client."""
+    value = getattr(client, CLIENT_ORDERINGS[order].key)
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    raw = json.dumps([order, value, client.id], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(order: str, cursor: str) -> Tuple[object, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        cursor_order, value, client_id = json.loads(raw)
+        if cursor_order != order or not isinstance(client_id, int):
+            raise ValueError("Sortierung passt nicht")
+        if order == "created":
+            value = datetime.fromisoformat(value)
+        elif not isinstance(value, str):
+            raise ValueError("Ungültiger Wert")
+    except (ValueError, TypeError) as e:
+        raise InvalidCursorError(f"Ungültiger Cursor: {e}") from e
+    return value, client_id
+
+def ordered(statement: Select, order: str) -> Select:
+    """Einheitliche Reihenfolge aller Listenabfragen: (Sortierspalte, id)."""
+    return statement.order_by(CLIENT_ORDERINGS[order], Client.id)
+
+def clients_statement(skip: int = 0, limit: int = 100, order: str = "created") -> Select:
+    return ordered(select(Client), order).offset(skip).limit(limit)
+
+def clients_page_statement(
+    limit: int,
+    cursor: Optional[str],
+    order: str,
+    filters: Sequence[ColumnElement] = (),
+    skip: int = 0
+) -> Select:
+    """
+    Keyset-Abfrage über (Sortierspalte, id); ein Datensatz mehr, um das Ende ohne zusätzliche Abfrage zu erkennen.
+    `skip` (Offset, veraltet) gilt nur für die erste Seite ohne Cursor.
+    """
+    statement = select(Client).where(*filters)
+    if cursor is not None:
+        value, client_id = decode_cursor(order, cursor)
+        statement = statement.where(tuple_(CLIENT_ORDERINGS[order], Client.id) > tuple_(value, client_id))
+    elif skip:
+        statement = statement.offset(skip)
+    return ordered(statement, order).limit(limit + 1)
+
+def split_page(clients: List[Client], limit: int, order: str) -> Tuple[List[Client], Optional[str]]:
+    if len(clients) <= limit:
+        return clients, None
+    clients = clients[:limit]
+    return clients, encode_cursor(order, clients[-1])
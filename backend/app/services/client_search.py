@@ -0,0 +1,95 @@
+import ipaddress
+import time
+from datetime import datetime, timezone
+from typing import List, Optional
+
+from sqlalchemy import case, cast, exists, false, func, literal, or_, select
+from sqlalchemy.dialects.postgresql import INET
+from sqlalchemy.sql.elements import ColumnElement
+
+from app.models.client import Client
+from app.services.peer_sessions import SESSION_TIMEOUT
+
+def escape_like(value: str) -> str:
+    """Maskiert Platzhalter, damit die Eingabe wörtlich gesucht wird."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+def containing_networks(value: str) -> List[str]:
+    """
+    Alle Netze, die die IP bzw. das CIDR enthalten (bis /0), in der Schreibweise der erlaubten IPs.
+    Ein Vergleich dieser höchstens 129 Werte mit dem Array nutzt den GIN-Index auf `allowed_ips`.
+
+    Raises:
+        ValueError: Wenn der Wert keine IP und kein CIDR ist
+    """
+    try:
+        network = ipaddress.ip_network(value.strip(), strict=False)
+    except ValueError:
+        raise ValueError(f"Ungültige IP oder ungültiges CIDR: {value!r}")
+    candidates = [str(network.supernet(new_prefix=length)) for length in range(network.prefixlen, -1, -1)]
+    if network.prefixlen == network.max_prefixlen:
+        # Einzelne Adressen werden auch ohne Präfixlänge angegeben
+        candidates.append(str(network.network_address))
+    return candidates
+
+# Nur Einträge in IP-Schreibweise werden als inet gelesen; andere würden die Abfrage abbrechen
+IP_PATTERN = r"^[0-9A-Fa-f:.]+(/[0-9]{1,3})?$"
+
+def ip_filter(value: str) -> ColumnElement:
+    """
+    Clients, deren erlaubte IPs das Netz überlappen: ein Eintrag enthält es (über den GIN-Index)
+    oder liegt innerhalb eines gesuchten Netzes (z.B. Hosts in einem /24; ohne Index).
+
+    Raises:
+        ValueError: Wenn der Wert keine IP und kein CIDR ist
+    """
+    # && (Überlappung zweier Arrays) mit den Kandidaten als ein einziger Array-Parameter
+    candidates = containing_networks(value)
+    condition = Client.allowed_ips.bool_op("&&")(literal(candidates, Client.allowed_ips.type))
+    network = ipaddress.ip_network(candidates[0])
+    if network.prefixlen == network.max_prefixlen:
+        return condition
+    entries = func.unnest(Client.allowed_ips).table_valued("allowed_ip").render_derived(name="entries")
+    entry = entries.c.allowed_ip
+    inside = case((entry.regexp_match(IP_PATTERN), cast(entry, INET).op("<<=")(cast(literal(str(network)), INET))), else_=false())
+    return or_(condition, exists(select(1).select_from(entries).where(inside)))
+
+def search_filters(
+    q: Optional[str] = None,
+    public_key: Optional[str] = None,
+    ip: Optional[str] = None,
+    active: Optional[bool] = None,
+    online: Optional[bool] = None,
+    now: Optional[float] = None
+) -> List[ColumnElement]:
+    """
+    Baut die Bedingungen der Client-Suche; alle angegebenen Kriterien müssen zutreffen.
+
+    Args:
+        q: Teilstring von Name oder E-Mail (ohne Beachtung der Groß-/Kleinschreibung)
+        public_key: Präfix des öffentlichen Schlüssels
+        ip: IP oder CIDR, das eine erlaubte IP des Clients enthält oder in ihr enthalten ist
+        active: Nur aktive bzw. deaktivierte Clients
+        online: Nur Clients mit (bzw. ohne) Handshake in den letzten 180 Sekunden
+        now: Aktuelle Zeit (Unix-Zeitstempel)
+
+    Raises:
+        ValueError: Bei ungültiger IP oder ungültigem CIDR
+    """
+    filters: List[ColumnElement] = []
+    if q:
+        pattern = f"%{escape_like(q)}%"
+        filters.append(or_(Client.name.ilike(pattern, escape="\\"), Client.email.ilike(pattern, escape="\\")))
+    if public_key:
+        filters.append(Client.public_key.like(f"{escape_like(public_key)}%", escape="\\"))
+    if ip:
+        filters.append(ip_filter(ip))
+    if active is not None:
+        filters.append(Client.is_active.is_(active))
+    if online is not None:
+        since = datetime.fromtimestamp((now or time.time()) - SESSION_TIMEOUT, tz=timezone.utc)
+        if online:
+            filters.append(Client.last_handshake >= since)
+        else:
+            filters.append(or_(Client.last_handshake.is_(None), Client.last_handshake < since))
+    return filters
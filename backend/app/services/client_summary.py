@@ -0,0 +1,142 @@
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Callable, NamedTuple, Optional
+
+import psutil
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from app.models.client import Client
+
+# Logger konfigurieren
+logger = logging.getLogger(__name__)
+
+class ClientSummary(NamedTuple):
+    """Aggregierte Kennzahlen der Tabelle `clients`."""
+    total_clients: int
+    active_clients: int
+    total_transfer_rx: int
+    total_transfer_tx: int
+    updated_at: datetime
+
+# Alle Kennzahlen in einem Statement (ein Durchlauf über die Tabelle)
+SUMMARY_STATEMENT = select(
+    func.count(Client.id),
+    func.count(Client.id).filter(Client.is_active.is_(True)),
+    func.coalesce(func.sum(Client.transfer_rx), 0),
+    func.coalesce(func.sum(Client.transfer_tx), 0)
+)
+
+def query_client_summary(db: Session) -> ClientSummary:
+    total, active, rx, tx = db.execute(SUMMARY_STATEMENT).one()
+    return ClientSummary(total, active, int(rx), int(tx), datetime.utcnow())
+
+class ClientSummaryCache:
+    """
+    Im Speicher gehaltene Zusammenfassung der Clients für `/api/status` und die Client-Liste.
+
+    - Anlegen und Löschen über die API sowie die Änderungen der Transferzähler aus dem
+      Datenbankabgleich des Monitors passen die Werte sofort an (ohne Datenbankzugriff)
+    - Spätestens nach `max_age` Sekunden wird die Zusammenfassung im Hintergrund mit einem
+      einzigen Statement neu geladen (z.B. für Änderungen außerhalb der API); bis dahin wird der
+      bisherige Stand geliefert. Nur der allererste Abruf wartet auf die Datenbank
+    - Änderungen während eines Neuladens lösen ein weiteres Neuladen aus, damit keine Anpassung verloren geht
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], max_age: float = 30.0):
+        """
+        Args:
+            session_factory: Erzeugt eine Datenbank-Session (z.B. SessionLocal)
+            max_age: Maximales Alter der Zusammenfassung in Sekunden
+        """
+        self.session_factory = session_factory
+        self.max_age = max_age
+        self._lock = threading.Lock()
+        self._summary: Optional[ClientSummary] = None
+        self._loaded_at = 0.0
+        self._stale = False
+        self._generation = 0
+        self._refreshing = False
+        self.refreshes = 0
+        # Der Startzeitpunkt des Systems ändert sich nicht
+        self.boot_time = psutil.boot_time()
+
+    def get(self) -> ClientSummary:
+        """Liefert die Zusammenfassung aus dem Speicher und stößt bei Bedarf ein Neuladen an."""
+        with self._lock:
+            summary = self._summary
+            expired = self._stale or time.monotonic() - self._loaded_at >= self.max_age
+        if summary is None:
+            return self.refresh()
+        if expired:
+            self._refresh_in_background()
+        return summary
+
+    def refresh(self) -> ClientSummary:
+        """Lädt die Zusammenfassung neu (blockierend)."""
+        with self._lock:
+            generation = self._generation
+            self._stale = False
+        db = self.session_factory()
+        try:
+            summary = query_client_summary(db)
+        finally:
+            db.close()
+        with self._lock:
+            self._summary = summary
+            self._loaded_at = time.monotonic()
+            self.refreshes += 1
+            if generation != self._generation:
+                self._stale = True
+        return summary
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def run():
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error(f"Fehler beim Aktualisieren der Client-Zusammenfassung: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing = False
+
+        threading.Thread(target=run, name="client-summary", daemon=True).start()
+
+    def _adjust(self, clients: int, active: int, rx: int, tx: int):
+        with self._lock:
+            self._generation += 1
+            if self._summary is None:
+                return
+            current = self._summary
+            self._summary = ClientSummary(
+                max(current.total_clients + clients, 0),
+                max(current.active_clients + active, 0),
+                max(current.total_transfer_rx + rx, 0),
+                max(current.total_transfer_tx + tx, 0),
+                datetime.utcnow()
+            )
+
+    def client_added(self, client: Client):
+        self._adjust(1, 1 if client.is_active else 0, client.transfer_rx or 0, client.transfer_tx or 0)
+
+    def clients_added(self, count: int):
+        """Neue Clients aus einem Import (aktiv, ohne Transfer)."""
+        self._adjust(count, count, 0, 0)
+
+    def client_removed(self, client: Client):
+        self._adjust(-1, -1 if client.is_active else 0, -(client.transfer_rx or 0), -(client.transfer_tx or 0))
+
+    @property
+    def loaded(self) -> bool:
+        return self._summary is not None
+
+    def transfer_changed(self, rx: int, tx: int):
+        """Änderung der Transfersummen aus einer Übernahme der Peer-Statistiken (siehe ClientStatsSync)."""
+        self._adjust(0, 0, rx, tx)
@@ -0,0 +1,148 @@
+import logging
+from datetime import datetime, timezone
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import BigInteger, DateTime, String, cast, column, func, inspect, or_, update, values
+from sqlalchemy.orm import Session
+
+from app.models.client import Client
+
+# Logger konfigurieren
+logger = logging.getLogger(__name__)
+
+# (öffentlicher Schlüssel, latest_handshake, transfer_rx, transfer_tx)
+PeerStats = Tuple[str, int, int, int]
+
+TRANSFER_COLUMNS = ("transfer_rx", "transfer_tx")
+
+def transfer_column_error(db: Session) -> Optional[str]:
+    """
+    Prüft, ob die Transferspalten der Tabelle `clients` 64 Bit breit sind. Ältere Installationen
+    haben INTEGER-Spalten, in die Zähler ab 2 GiB nicht mehr passen ("integer out of range").
+
+    Returns:
+        Fehlermeldung mit Anleitung oder None, wenn die Spalten passen
+    """
+    types = {info["name"]: info["type"] for info in inspect(db.get_bind()).get_columns(Client.__tablename__)}
+    narrow = [name for name in TRANSFER_COLUMNS if name in types and not isinstance(types[name], BigInteger)]
+    if not narrow:
+        return None
+    return (
+        f"Die Spalten {', '.join(narrow)} der Tabelle clients haben den Typ {types[narrow[0]]} statt BIGINT. "
+        "Der Datenbankabgleich der Peer-Statistiken ist deaktiviert. Bitte einmalig "
+        "`alembic upgrade head` (im Verzeichnis backend) oder "
+        "`ALTER TABLE clients ALTER COLUMN transfer_rx TYPE BIGINT, ALTER COLUMN transfer_tx TYPE BIGINT;` "
+        "ausführen und den Dienst neu starten."
+    )
+
+class ClientStatsSync:
+    """
+    Überträgt die Live-Statistiken der Peers (letzter Handshake, Transferzähler)
+    in die Tabelle `clients`.
+
+    - Pro Durchlauf genau ein UPDATE ... FROM (VALUES ...) für alle geänderten Peers
+    - Peers, deren Werte seit dem letzten erfolgreichen Schreiben unverändert sind,
+      werden gar nicht erst gesendet; Zeilen mit identischen Werten werden in der
+      Datenbank nicht angefasst
+    - Blockierend; wird vom Monitor in einem Thread außerhalb der Event-Loop ausgeführt
+    - Vor dem ersten Schreiben wird der Typ der Transferspalten geprüft; sind sie noch
+      INTEGER, bleibt der Abgleich mit einer Fehlermeldung im Log deaktiviert
+    - Das UPDATE liefert per RETURNING die Änderung der Transferzähler gegenüber den
+      bisherigen Werten; `on_change` erhält deren Summe (z.B. für die Client-Zusammenfassung)
+    """
+
+    def __init__(self, session_factory: Callable[[], Session], on_change: Optional[Callable[[int, int], None]] = None):
+        """
+        Args:
+            session_factory: Erzeugt eine Datenbank-Session (z.B. SessionLocal)
+            on_change: Wird nach aktualisierten Zeilen mit der Änderung der Summen von rx und tx aufgerufen
+        """
+        self.session_factory = session_factory
+        self.on_change = on_change
+        self._written: Dict[str, Tuple[int, int, int]] = {}
+        self._schema_checked = False
+        self.schema_error: Optional[str] = None
+        # Anzahl der zuletzt gesendeten Peers und Gesamtzahl der aktualisierten Zeilen
+        self.last_batch = 0
+        self.rows_updated = 0
+
+    def changed(self, peers: Iterable[PeerStats]) -> List[PeerStats]:
+        """Filtert die Peers, deren Werte sich seit dem letzten Schreiben geändert haben."""
+        written = self._written
+        return [peer for peer in peers if written.get(peer[0]) != peer[1:]]
+
+    def sync(self, peers: Iterable[PeerStats]) -> int:
+        """
+        Schreibt die geänderten Peers in einem einzigen Statement.
+
+        Returns:
+            Anzahl der aktualisierten Zeilen
+        """
+        if self.schema_error is not None:
+            return 0
+        batch = self.changed(peers)
+        self.last_batch = len(batch)
+        if not batch:
+            return 0
+
+        rows = values(
+            column("public_key", String),
+            column("last_handshake", DateTime(timezone=True)),
+            column("transfer_rx", BigInteger),
+            column("transfer_tx", BigInteger),
+            name="peer_stats"
+        ).data([
+            (public_key, _handshake_time(handshake), rx, tx)
+            for public_key, handshake, rx, tx in batch
+        ])
+        # Explizit typisieren, da eine Spalte aus lauter NULL-Werten sonst als Text gilt
+        handshake = cast(rows.c.last_handshake, DateTime(timezone=True))
+        # Die Zeile vor der Änderung (Selbstverknüpfung), um die Differenz zurückzugeben;
+        # Core-UPDATE, damit RETURNING genau diese Ausdrücke liefert
+        old = Client.__table__.alias("old")
+        statement = (
+            update(Client.__table__)
+            .where(Client.public_key == rows.c.public_key)
+            .where(old.c.id == Client.id)
+            .where(or_(
+                Client.last_handshake.is_distinct_from(handshake),
+                Client.transfer_rx.is_distinct_from(rows.c.transfer_rx),
+                Client.transfer_tx.is_distinct_from(rows.c.transfer_tx)
+            ))
+            .values(
+                last_handshake=handshake,
+                transfer_rx=rows.c.transfer_rx,
+                transfer_tx=rows.c.transfer_tx
+            )
+            .returning(
+                rows.c.transfer_rx - func.coalesce(old.c.transfer_rx, 0),
+                rows.c.transfer_tx - func.coalesce(old.c.transfer_tx, 0)
+            )
+        )
+
+        db = self.session_factory()
+        try:
+            if not self._schema_checked:
+                self.schema_error = transfer_column_error(db)
+                self._schema_checked = True
+                if self.schema_error is not None:
+                    logger.error(self.schema_error)
+                    return 0
+            deltas = db.execute(statement).all()
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        # Erst nach erfolgreichem Commit als geschrieben merken, sonst beim nächsten Mal erneut senden
+        for public_key, handshake, rx, tx in batch:
+            self._written[public_key] = (handshake, rx, tx)
+        self.rows_updated += len(deltas)
+        if deltas and self.on_change is not None:
+            self.on_change(sum(rx for rx, _ in deltas), sum(tx for _, tx in deltas))
+        return len(deltas)
+
+def _handshake_time(handshake: int) -> Optional[datetime]:
+    return datetime.fromtimestamp(handshake, tz=timezone.utc) if handshake > 0 else None
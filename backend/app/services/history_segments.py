@@ -0,0 +1,121 @@
+import os
+import socket
+import struct
+from array import array
+from bisect import bisect_left
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+# Datensatz: peer_id, timestamp, rx, tx, latest_handshake, endpoint (IPv6/IPv4-mapped), port
+RECORD = struct.Struct("<IdQQq16sH")
+
+class HistorySample(NamedTuple):
+    """Ein gespeicherter Messpunkt eines Peers."""
+    peer_id: int
+    timestamp: float
+    transfer_rx: int
+    transfer_tx: int
+    latest_handshake: int
+    endpoint: Optional[str]
+
+_EMPTY_ADDRESS = bytes(16)
+_V4_PREFIX = bytes(10) + b"\xff\xff"
+
+def encode_endpoint(endpoint: Optional[str]) -> Tuple[bytes, int]:
+    """Wandelt "ip:port" bzw. "[ipv6]:port" in eine feste Binärdarstellung um."""
+    if not endpoint:
+        return _EMPTY_ADDRESS, 0
+    host, _, port = endpoint.rpartition(':')
+    try:
+        if host.startswith('['):
+            return socket.inet_pton(socket.AF_INET6, host[1:-1]), int(port)
+        return _V4_PREFIX + socket.inet_pton(socket.AF_INET, host), int(port)
+    except (OSError, ValueError):
+        return _EMPTY_ADDRESS, 0
+
+def decode_endpoint(address: bytes, port: int) -> Optional[str]:
+    if address == _EMPTY_ADDRESS:
+        return None
+    if address.startswith(_V4_PREFIX):
+        return f"{socket.inet_ntop(socket.AF_INET, address[12:])}:{port}"
+    return f"[{socket.inet_ntop(socket.AF_INET6, address)}]:{port}"
+
+def pack_sample(sample: HistorySample) -> bytes:
+    address, port = encode_endpoint(sample.endpoint)
+    return RECORD.pack(sample.peer_id, sample.timestamp, sample.transfer_rx, sample.transfer_tx,
+                       sample.latest_handshake, address, port)
+
+def unpack_samples(data: bytes) -> List[HistorySample]:
+    return [
+        HistorySample(peer_id, timestamp, rx, tx, handshake, decode_endpoint(address, port))
+        for peer_id, timestamp, rx, tx, handshake, address, port in RECORD.iter_unpack(data)
+    ]
+
+def read_log(path: Path) -> List[HistorySample]:
+    """Liest ein offenes (unsortiertes) Segment vollständig; unvollständige Endstücke werden ignoriert."""
+    with open(path, 'rb') as f:
+        data = f.read()
+    usable = len(data) - len(data) % RECORD.size
+    return unpack_samples(data[:usable])
+
+def write_sealed(path: Path, samples: Iterable[HistorySample]):
+    """
+    Schreibt ein versiegeltes Segment: Datensätze sortiert nach (Peer, Zeit) in `<name>.seg`
+    und ein Index `<name>.idx` mit Peer-IDs und Datensatz-Offsets.
+    Doppelte Messpunkte (gleicher Peer und Zeitpunkt) werden entfernt.
+    """
+    ordered = sorted({(s.peer_id, s.timestamp): s for s in samples}.values())
+    peer_ids = array('I')
+    offsets = array('Q')
+    for position, sample in enumerate(ordered):
+        if not peer_ids or peer_ids[-1] != sample.peer_id:
+            peer_ids.append(sample.peer_id)
+            offsets.append(position)
+    offsets.append(len(ordered))
+
+    seg_path, idx_path = path.with_suffix('.seg'), path.with_suffix('.idx')
+    _atomic_write(seg_path, b"".join(pack_sample(s) for s in ordered))
+    _atomic_write(idx_path, struct.pack("<I", len(peer_ids)) + peer_ids.tobytes() + offsets.tobytes())
+
+def _atomic_write(path: Path, data: bytes):
+    temp_file = path.with_suffix(path.suffix + '.tmp')
+    with open(temp_file, 'wb') as f:
+        f.write(data)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temp_file, path)
+
+@lru_cache(maxsize=128)
+def _load_index(idx_path: Path, mtime_ns: int) -> Tuple[array, array]:
+    with open(idx_path, 'rb') as f:
+        data = f.read()
+    count = struct.unpack_from("<I", data)[0]
+    peer_ids = array('I')
+    peer_ids.frombytes(data[4:4 + 4 * count])
+    offsets = array('Q')
+    offsets.frombytes(data[4 + 4 * count:4 + 4 * count + 8 * (count + 1)])
+    return peer_ids, offsets
+
+def read_sealed_peer(path: Path, peer_id: int) -> List[HistorySample]:
+    """Liest nur die Datensätze eines Peers aus einem versiegelten Segment."""
+    idx_path = path.with_suffix('.idx')
+    try:
+        peer_ids, offsets = _load_index(idx_path, idx_path.stat().st_mtime_ns)
+    except FileNotFoundError:
+        return []
+    position = bisect_left(peer_ids, peer_id)
+    if position == len(peer_ids) or peer_ids[position] != peer_id:
+        return []
+    first, last = offsets[position], offsets[position + 1]
+    with open(path.with_suffix('.seg'), 'rb') as f:
+        return unpack_samples(os.pread(f.fileno(), (last - first) * RECORD.size, first * RECORD.size))
+
+def read_sealed(path: Path) -> List[HistorySample]:
+    """Liest alle Datensätze eines versiegelten Segments."""
+    with open(path.with_suffix('.seg'), 'rb') as f:
+        return unpack_samples(f.read())
+
+def remove_segment(path: Path):
+    for suffix in ('.seg', '.idx', '.log'):
+        path.with_suffix(suffix).unlink(missing_ok=True)
@@ -0,0 +1,129 @@
+import asyncio
+import time
+from typing import Dict, List, Tuple
+
+from app.services.monitor_group import WireGuardMonitorGroup
+from app.services.wireguard_monitor import WireGuardMonitor
+
+# Content-Type des Prometheus-Textformats
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_PEER_METRICS = (
+    ("wireguard_peer_receive_bytes_total", "counter", "Vom Peer empfangene Bytes (Kernel-Zähler)"),
+    ("wireguard_peer_transmit_bytes_total", "counter", "An den Peer gesendete Bytes (Kernel-Zähler)"),
+    ("wireguard_peer_latest_handshake_seconds", "gauge", "Zeitpunkt des letzten Handshakes (Unix-Zeit, 0 = nie)"),
+    ("wireguard_peer_online", "gauge", "1, wenn der letzte Handshake weniger als 180 Sekunden zurückliegt"),
+    ("wireguard_peer_info", "gauge", "Typ und erlaubte IPs des Peers")
+)
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def render_peers(monitors: List[WireGuardMonitor]) -> bytes:
+    """Rendert die Peer-Metriken aller Interfaces im Prometheus-Textformat."""
+    series: Dict[str, List[str]] = {name: [] for name, _, _ in _PEER_METRICS}
+    rx, tx, handshake, online, info = (series[name] for name, _, _ in _PEER_METRICS)
+    for monitor in monitors:
+        snapshot = monitor.snapshots.current
+        if snapshot is None:
+            continue
+        interface = _escape(monitor.interface)
+        for peer in snapshot.status.get("peers", []):
+            if isinstance(peer, dict):
+                # Aus der Statusdatei geladener Stand vor dem ersten Durchlauf
+                continue
+            labels = f'interface="{interface}",public_key="{_escape(peer.public_key)}"'
+            rx.append(f"wireguard_peer_receive_bytes_total{{{labels}}} {peer.transfer_rx}")
+            tx.append(f"wireguard_peer_transmit_bytes_total{{{labels}}} {peer.transfer_tx}")
+            handshake.append(f"wireguard_peer_latest_handshake_seconds{{{labels}}} {peer.latest_handshake}")
+            online.append(f"wireguard_peer_online{{{labels}}} {1 if peer.online else 0}")
+            info.append(
+                f'wireguard_peer_info{{{labels},type="{_escape(peer.type)}",'
+                f'allowed_ips="{_escape(",".join(peer.allowed_ips))}"}} 1'
+            )
+
+    lines: List[str] = []
+    for name, metric_type, help_text in _PEER_METRICS:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        lines.extend(series[name])
+    return ("\n".join(lines) + "\n").encode()
+
+def render_monitor(group: WireGuardMonitorGroup, now: float) -> bytes:
+    """Rendert die Metriken des Monitors selbst (wenige Zeilen pro Interface, bei jedem Abruf aktuell)."""
+    scheduler = group.scheduler.stats()
+    lines = [
+        "# HELP wireguard_monitor_tick_duration_seconds Dauer des letzten Monitor-Durchlaufs",
+        "# TYPE wireguard_monitor_tick_duration_seconds gauge",
+        f"wireguard_monitor_tick_duration_seconds {scheduler['last_duration']}",
+        "# HELP wireguard_monitor_tick_interval_seconds Aktuelles Intervall zwischen zwei Durchläufen",
+        "# TYPE wireguard_monitor_tick_interval_seconds gauge",
+        f"wireguard_monitor_tick_interval_seconds {scheduler['interval']}",
+        "# HELP wireguard_monitor_ticks_total Anzahl der Monitor-Durchläufe",
+        "# TYPE wireguard_monitor_ticks_total counter",
+        f"wireguard_monitor_ticks_total {scheduler['ticks']}",
+        "# HELP wireguard_monitor_tick_overruns_total Durchläufe, die länger als das Intervall dauerten",
+        "# TYPE wireguard_monitor_tick_overruns_total counter",
+        f"wireguard_monitor_tick_overruns_total {scheduler['overruns']}"
+    ]
+
+    up, errors, peers, online, age, phases = [], [], [], [], [], []
+    for monitor in group.monitors.values():
+        interface = f'interface="{_escape(monitor.interface)}"'
+        snapshot = monitor.snapshots.current
+        up.append(f"wireguard_up{{{interface}}} {1 if monitor.last_error is None and snapshot is not None else 0}")
+        errors.append(f"wireguard_collector_errors_total{{{interface}}} {monitor.collector_errors}")
+        if snapshot is not None:
+            peers.append(f"wireguard_peers{{{interface}}} {len(snapshot.status.get('peers', []))}")
+            online.append(f"wireguard_peers_online{{{interface}}} {monitor.online_count}")
+        if monitor.checked_at is not None:
+            # Seit dem letzten erfolgreichen Durchlauf; ein unveränderter Snapshot ist nicht veraltet
+            age.append(f"wireguard_snapshot_age_seconds{{{interface}}} {max(now - monitor.checked_at, 0.0):.3f}")
+        for phase, timing in monitor.timer.stats().items():
+            phases.append(f'wireguard_monitor_phase_duration_seconds{{{interface},phase="{phase}"}} {timing["last"]}')
+
+    for name, metric_type, help_text, values in (
+        ("wireguard_up", "gauge", "1, wenn der letzte Durchlauf des Interfaces erfolgreich war", up),
+        ("wireguard_collector_errors_total", "counter", "Fehlgeschlagene Abfragen des Collectors", errors),
+        ("wireguard_peers", "gauge", "Anzahl der Peers", peers),
+        ("wireguard_peers_online", "gauge", "Anzahl der Peers mit aktuellem Handshake", online),
+        ("wireguard_snapshot_age_seconds", "gauge", "Sekunden seit dem letzten erfolgreichen Durchlauf", age),
+        ("wireguard_monitor_phase_duration_seconds", "gauge", "Dauer der Phasen des letzten Durchlaufs", phases)
+    ):
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        lines.extend(values)
+    return ("\n".join(lines) + "\n").encode()
+
+class MetricsExporter:
+    """
+    Stellt die Metriken aller überwachten Interfaces im Prometheus-Textformat bereit.
+
+    Der umfangreiche Peer-Teil wird höchstens einmal pro Monitor-Durchlauf (Snapshot-Version)
+    außerhalb der Event-Loop gerendert und zwischengespeichert; Abrufe dazwischen kosten nur
+    das Zusammensetzen mit den wenigen Monitor-Metriken und lösen nie eine Abfrage von `wg` aus.
+    """
+
+    def __init__(self, group: WireGuardMonitorGroup):
+        self.group = group
+        self._versions: Tuple[int, ...] = ()
+        self._peers_body = b""
+        self._lock = asyncio.Lock()
+        self.renders = 0
+
+    def _current_versions(self) -> Tuple[int, ...]:
+        return tuple(
+            monitor.snapshots.current.version if monitor.snapshots.current else 0
+            for monitor in self.group.monitors.values()
+        )
+
+    async def render(self) -> bytes:
+        versions = self._current_versions()
+        if versions != self._versions:
+            async with self._lock:
+                versions = self._current_versions()
+                if versions != self._versions:
+                    self._peers_body = await asyncio.to_thread(render_peers, list(self.group.monitors.values()))
+                    self._versions = versions
+                    self.renders += 1
+        return render_monitor(self.group, time.time()) + self._peers_body
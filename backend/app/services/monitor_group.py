@@ -0,0 +1,121 @@
+import asyncio
+import logging
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from app.services.tick_scheduler import TickScheduler
+from app.services.wireguard_monitor import WireGuardMonitor
+
+# Logger konfigurieren
+logger = logging.getLogger(__name__)
+
+def discover_interfaces(config_dir: str = "/etc/wireguard") -> List[str]:
+    """
+    Ermittelt die WireGuard-Interfaces anhand der Konfigurationsdateien (`<interface>.conf`).
+
+    Returns:
+        Sortierte Liste der Interface-Namen (leer, wenn das Verzeichnis nicht lesbar ist)
+    """
+    try:
+        return sorted(path.stem for path in Path(config_dir).glob("*.conf"))
+    except OSError as e:
+        logger.error(f"Fehler beim Durchsuchen von {config_dir}: {e}")
+        return []
+
+class WireGuardMonitorGroup:
+    """
+    Überwacht mehrere WireGuard-Interfaces gleichzeitig in einer Event-Loop.
+    Pro Interface läuft ein eigener WireGuardMonitor mit eigenem Collector und Status;
+    alle Interfaces werden pro Durchlauf parallel abgefragt, sodass zusätzliche
+    Interfaces die Dauer eines Durchlaufs nicht vervielfachen. Fehler eines Interfaces
+    betreffen die anderen nicht.
+    """
+
+    def __init__(
+        self,
+        interfaces: List[str],
+        monitor_factory: Callable[[str], WireGuardMonitor],
+        check_interval: int = 15,
+        compaction_interval: int = 300
+    ):
+        """
+        Args:
+            interfaces: Namen der zu überwachenden Interfaces (das erste ist das Standard-Interface)
+            monitor_factory: Erzeugt den Monitor für ein Interface
+            check_interval: Intervall für die Statusabfrage in Sekunden
+            compaction_interval: Intervall für die Verdichtung der Verlaufsspeicher in Sekunden
+        """
+        if not interfaces:
+            raise ValueError("Mindestens ein Interface erforderlich")
+        self.monitors: Dict[str, WireGuardMonitor] = {name: monitor_factory(name) for name in interfaces}
+        self.check_interval = check_interval
+        self.scheduler = TickScheduler(check_interval)
+        # Alle Monitore laufen im gemeinsamen Scheduler
+        for monitor in self.monitors.values():
+            monitor.scheduler = self.scheduler
+        self.compaction_interval = compaction_interval
+        self.running = False
+        self._history_tasks: List[asyncio.Task] = []
+
+    @property
+    def primary(self) -> WireGuardMonitor:
+        """Monitor des Standard-Interfaces."""
+        return next(iter(self.monitors.values()))
+
+    def get(self, interface: Optional[str] = None) -> Optional[WireGuardMonitor]:
+        """Gibt den Monitor eines Interfaces zurück (ohne Angabe das Standard-Interface)."""
+        if interface is None:
+            return self.primary
+        return self.monitors.get(interface)
+
+    async def check_all(self):
+        """Fragt alle Interfaces parallel ab."""
+        results = await asyncio.gather(
+            *(monitor._check_status() for monitor in self.monitors.values()),
+            return_exceptions=True
+        )
+        for monitor, result in zip(self.monitors.values(), results):
+            if isinstance(result, Exception):
+                monitor.last_error = str(result)
+                logger.error(f"Fehler bei der Statusabfrage für {monitor.interface}: {result}")
+        # Das aktivste Interface bestimmt das gemeinsame Intervall
+        self.scheduler.interval = min(monitor.next_interval for monitor in self.monitors.values())
+
+    async def start(self):
+        """Startet die Überwachung aller Interfaces."""
+        if self.running:
+            logger.warning("WireGuard-Monitor läuft bereits.")
+            return
+
+        self.running = True
+        logger.info(f"WireGuard-Monitor für Interfaces {', '.join(self.monitors)} gestartet.")
+
+        for monitor in self.monitors.values():
+            if monitor.history is not None:
+                self._history_tasks.append(asyncio.create_task(monitor.history.start(self.compaction_interval)))
+
+        try:
+            await self.scheduler.run(self.check_all)
+        except asyncio.CancelledError:
+            logger.info("WireGuard-Monitor wurde beendet.")
+        self.running = False
+
+    def stop(self):
+        """Stoppt die Überwachung aller Interfaces."""
+        self.running = False
+        self.scheduler.stop()
+        for task in self._history_tasks:
+            task.cancel()
+        self._history_tasks = []
+        for monitor in self.monitors.values():
+            monitor.stop()
+
+    def summary(self) -> Dict[str, Any]:
+        """Aggregierte Übersicht über alle Interfaces."""
+        interfaces = [monitor.summary() for monitor in self.monitors.values()]
+        return {
+            "scheduler": self.scheduler.stats(),
+            "interfaces": interfaces,
+            "total_peers": sum(item["peers"] for item in interfaces),
+            "online_peers": sum(item["online_peers"] for item in interfaces)
+        }
@@ -0,0 +1,122 @@
+import asyncio
+import logging
+from typing import Iterable, List, Optional
+
+from app.services.client_sync import ClientStatsSync
+from app.services.peer_accounting import PeerAccounting
+from app.services.peer_events import PeerEvent
+from app.services.peer_rankings import PeerRankings
+from app.services.peer_records import PeerRecord
+from app.services.peer_sessions import PeerSessionLog
+from app.services.tick_scheduler import PhaseTimer
+from app.services.traffic_buffer import TrafficRingBuffer
+from app.services.traffic_history import TrafficHistoryStore
+
+# Logger konfigurieren
+logger = logging.getLogger(__name__)
+
+class MonitorPhases:
+    """
+    Verarbeitung eines Monitor-Durchlaufs nach dem Einlesen der Peers.
+
+    - diff: Sitzungen aus den Peer-Ereignissen fortschreiben
+    - persist: Ratenpuffer, Ranglisten, Gesamtsummen, Sitzungen und Verlaufsspeicher sichern
+    - sync: Übernahme in die Tabelle `clients` im Hintergrund
+
+    Optionale Bestandteile (Verlauf, Gesamtsummen, Sitzungen, Datenbankabgleich) sind None,
+    wenn sie in den Einstellungen deaktiviert sind.
+    """
+
+    def __init__(
+        self,
+        interface: str,
+        timer: PhaseTimer,
+        traffic: TrafficRingBuffer,
+        rankings: PeerRankings,
+        history: Optional[TrafficHistoryStore] = None,
+        accounting: Optional[PeerAccounting] = None,
+        sessions: Optional[PeerSessionLog] = None,
+        client_sync: Optional[ClientStatsSync] = None
+    ):
+        self.interface = interface
+        self.timer = timer
+        self.traffic = traffic
+        self.rankings = rankings
+        self.history = history
+        self.accounting = accounting
+        self.sessions = sessions
+        # Übernahme in die Datenbank läuft im Hintergrund, höchstens einmal gleichzeitig
+        self.client_sync = client_sync
+        self._sync_task: Optional[asyncio.Task] = None
+
+    def record_sessions(self, now: float, events: List[PeerEvent]):
+        """Schreibt die Sitzungen anhand der Ereignisse des Durchlaufs fort (nur im Speicher)."""
+        if self.sessions is not None:
+            self.sessions.record(now, events)
+
+    async def persist(self, now: float, peers: List[PeerRecord]):
+        """Übernimmt die Zählerstände eines Durchlaufs in Puffer, Ranglisten, Gesamtsummen und Verlauf und sichert die Sitzungen."""
+        # Übernehme die Zählerstände in den Ratenpuffer
+        self.traffic.record(now, ((peer.public_key, peer.transfer_rx, peer.transfer_tx) for peer in peers))
+
+        # Ranglisten werden erst bei Abruf und höchstens einmal pro Durchlauf bestimmt
+        self.rankings.update(
+            now, peers, self.traffic.current_rates,
+            self.accounting.usage if self.accounting is not None else None
+        )
+
+        # Führe die Gesamtsummen fort und sichere geänderte Peers
+        if self.accounting is not None:
+            self.accounting.update((peer.public_key, peer.transfer_rx, peer.transfer_tx) for peer in peers)
+            await asyncio.to_thread(self.accounting.flush)
+
+        # Abgeschlossene Sitzungen anhängen, offene regelmäßig sichern
+        if self.sessions is not None:
+            await asyncio.to_thread(self.sessions.flush)
+
+        # Schreibe geänderte Messpunkte in den Verlaufsspeicher
+        if self.history is not None:
+            await asyncio.to_thread(self.history.append, now, [
+                (peer.public_key, peer.transfer_rx, peer.transfer_tx, peer.latest_handshake, peer.endpoint)
+                for peer in peers
+            ])
+
+    def start_client_sync(self, peers: Iterable[PeerRecord]):
+        """
+        Startet die Übernahme der Peer-Statistiken in die Datenbank in einem Thread.
+        Läuft die vorherige Übernahme noch, wird dieser Durchlauf ausgelassen; die
+        Änderungen werden beim nächsten Mal mitgeschrieben.
+        """
+        if self.client_sync is None:
+            return
+        if self._sync_task is not None and not self._sync_task.done():
+            logger.debug(f"Datenbankabgleich für {self.interface} läuft noch, Durchlauf ausgelassen.")
+            return
+        # Mit Gesamtsummen sinken die Werte in der Datenbank auch nach einem Zähler-Reset nicht
+        usage = self.accounting.usage if self.accounting is not None else None
+        values = []
+        for peer in peers:
+            total = usage(peer.public_key) if usage else None
+            if total is not None:
+                values.append((peer.public_key, peer.latest_handshake, total.total_rx, total.total_tx))
+            else:
+                values.append((peer.public_key, peer.latest_handshake, peer.transfer_rx, peer.transfer_tx))
+        self._sync_task = asyncio.create_task(self._run_client_sync(values))
+
+    async def _run_client_sync(self, peers: List[tuple]):
+        try:
+            with self.timer.phase("sync"):
+                await asyncio.to_thread(self.client_sync.sync, peers)
+        except Exception as e:
+            logger.error(f"Fehler beim Datenbankabgleich für {self.interface}: {e}")
+
+    def stop(self):
+        """Bricht einen laufenden Abgleich ab und sichert Verlauf, Gesamtsummen und Sitzungen."""
+        if self._sync_task is not None:
+            self._sync_task.cancel()
+        if self.history is not None:
+            self.history.stop()
+        if self.accounting is not None:
+            self.accounting.flush(force=True)
+        if self.sessions is not None:
+            self.sessions.close()
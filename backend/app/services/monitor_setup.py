@@ -0,0 +1,69 @@
+from pathlib import Path
+
+from app.core.config import settings
+from app.db.session import SessionLocal
+from app.services.client import client_summary
+from app.services.client_sync import ClientStatsSync
+from app.services.monitor_group import WireGuardMonitorGroup, discover_interfaces
+from app.services.peer_accounting import PeerAccounting
+from app.services.peer_sessions import PeerSessionLog
+from app.services.tick_scheduler import AdaptiveInterval
+from app.services.traffic_history import TrafficHistoryStore
+from app.services.wireguard_collectors import create_collector
+from app.services.wireguard_monitor import WireGuardMonitor
+
+def create_monitor(interface: str) -> WireGuardMonitor:
+    """Erstellt den Monitor für ein Interface anhand der Einstellungen."""
+    # Dauerhafter Verlaufsspeicher für Peer-Messpunkte
+    history = TrafficHistoryStore(
+        root_dir=str(Path(settings.WIREGUARD_HISTORY_DIR) / interface),
+        raw_retention=settings.WIREGUARD_HISTORY_RAW_RETENTION,
+        medium_retention=settings.WIREGUARD_HISTORY_5M_RETENTION,
+        coarse_retention=settings.WIREGUARD_HISTORY_1H_RETENTION
+    ) if settings.WIREGUARD_HISTORY_ENABLED else None
+
+    # Adaptives Abfrageintervall zwischen Minimum und Obergrenze
+    adaptive = AdaptiveInterval(
+        initial=settings.WIREGUARD_CHECK_INTERVAL,
+        minimum=settings.WIREGUARD_MIN_CHECK_INTERVAL or settings.WIREGUARD_CHECK_INTERVAL,
+        maximum=settings.WIREGUARD_MAX_CHECK_INTERVAL
+    ) if settings.WIREGUARD_ADAPTIVE_INTERVAL else None
+
+    # Monotone Gesamtsummen pro Peer
+    accounting = PeerAccounting(
+        str(Path(settings.WIREGUARD_ACCOUNTING_DIR) / f"{interface}.acct"),
+        flush_interval=settings.WIREGUARD_ACCOUNTING_FLUSH_INTERVAL
+    ) if settings.WIREGUARD_ACCOUNTING_ENABLED else None
+
+    return WireGuardMonitor(
+        interface=interface,
+        status_dir="app/data/wireguard_status",
+        check_interval=settings.WIREGUARD_CHECK_INTERVAL,
+        roles=settings.WIREGUARD_PEER_ROLES,
+        collector=create_collector(
+            settings.WIREGUARD_COLLECTOR,
+            settings.WIREGUARD_WG_PATH,
+            sim_peers=settings.WIREGUARD_SIM_PEERS,
+            sim_seed=settings.WIREGUARD_SIM_SEED
+        ),
+        traffic_window=settings.WIREGUARD_TRAFFIC_WINDOW,
+        max_peers=settings.WIREGUARD_TRAFFIC_MAX_PEERS,
+        history=history,
+        adaptive=adaptive,
+        activity_threshold=settings.WIREGUARD_ACTIVITY_THRESHOLD,
+        client_sync=ClientStatsSync(SessionLocal, on_change=client_summary.transfer_changed) if settings.WIREGUARD_CLIENT_SYNC_ENABLED else None,
+        accounting=accounting,
+        sessions=PeerSessionLog(
+            settings.WIREGUARD_SESSIONS_DIR, interface,
+            checkpoint_interval=settings.WIREGUARD_SESSIONS_CHECKPOINT_INTERVAL
+        ) if settings.WIREGUARD_SESSIONS_ENABLED else None
+    )
+
+def create_monitor_group() -> WireGuardMonitorGroup:
+    """Monitore aller Interfaces (konfiguriert oder aus /etc/wireguard ermittelt)."""
+    return WireGuardMonitorGroup(
+        interfaces=settings.WIREGUARD_INTERFACES or discover_interfaces(settings.WIREGUARD_CONFIG_DIR) or ["wg0"],
+        monitor_factory=create_monitor,
+        check_interval=settings.WIREGUARD_CHECK_INTERVAL,
+        compaction_interval=settings.WIREGUARD_HISTORY_COMPACTION_INTERVAL
+    )
@@ -0,0 +1,153 @@
+import logging
+import os
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+# Logger konfigurieren
+logger = logging.getLogger(__name__)
+
+# Datensatz: öffentlicher Schlüssel, Basis rx/tx, letzter Zählerstand rx/tx, Anzahl der Resets
+ACCOUNT_RECORD = struct.Struct("<44sQQQQI")
+
+class PeerUsage(NamedTuple):
+    """Monotone Gesamtsumme eines Peers über alle Interface- und Prozess-Neustarts."""
+    public_key: str
+    total_rx: int
+    total_tx: int
+    resets: int
+
+class PeerAccounting:
+    """
+    Führt monotone Gesamtsummen der Transferzähler pro Peer.
+
+    Die Kernel-Zähler beginnen nach `wg-quick down`/`up` wieder bei 0. Sinkt ein Zähler
+    gegenüber dem letzten Stand, wird der letzte Stand zur Basis addiert; die Gesamtsumme
+    ist Basis + aktueller Zähler und sinkt damit nie.
+
+    Der Zustand wird kompakt in einem Journal fester Datensätze gespeichert: Pro Sicherung
+    werden nur die seit der letzten Sicherung geänderten Peers angehängt, beim Laden gilt
+    der letzte Datensatz eines Peers. Ein Neustart des Interfaces, während der Prozess nicht
+    läuft, wird beim ersten Durchlauf am gesunkenen Zähler erkannt.
+    """
+
+    def __init__(self, path: str, flush_interval: float = 60.0):
+        """
+        Args:
+            path: Journal-Datei (`<interface>.acct`)
+            flush_interval: Mindestabstand zwischen zwei Sicherungen in Sekunden
+        """
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._io_lock = threading.Lock()
+        # öffentlicher Schlüssel -> [base_rx, base_tx, last_rx, last_tx, resets]
+        self._accounts: Dict[str, List[int]] = {}
+        self._dirty: Set[str] = set()
+        self._journal_records = 0
+        self._last_flush = time.monotonic()
+        os.makedirs(self.path.parent, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return
+        usable = len(data) - len(data) % ACCOUNT_RECORD.size
+        for key, base_rx, base_tx, last_rx, last_tx, resets in ACCOUNT_RECORD.iter_unpack(data[:usable]):
+            self._accounts[key.rstrip(b"\0").decode()] = [base_rx, base_tx, last_rx, last_tx, resets]
+            self._journal_records += 1
+        logger.info(f"{len(self._accounts)} Peer-Summen aus {self.path} geladen.")
+
+    def update(self, peers: Iterable[Tuple[str, int, int]]) -> int:
+        """
+        Übernimmt die Zählerstände eines Durchlaufs; nur Peers mit geänderten Zählern
+        werden angefasst und zur Sicherung vorgemerkt.
+
+        Args:
+            peers: (öffentlicher Schlüssel, transfer_rx, transfer_tx) aller Peers
+
+        Returns:
+            Anzahl der erkannten Zähler-Resets
+        """
+        resets = 0
+        with self._lock:
+            accounts, dirty = self._accounts, self._dirty
+            for public_key, rx, tx in peers:
+                account = accounts.get(public_key)
+                if account is None:
+                    accounts[public_key] = [0, 0, rx, tx, 0]
+                    dirty.add(public_key)
+                    continue
+                last_rx, last_tx = account[2], account[3]
+                if rx == last_rx and tx == last_tx:
+                    continue
+                if rx < last_rx or tx < last_tx:
+                    # Zähler wurde zurückgesetzt (Interface-Neustart): bisherigen Stand übernehmen
+                    account[0] += last_rx
+                    account[1] += last_tx
+                    account[4] += 1
+                    resets += 1
+                account[2], account[3] = rx, tx
+                dirty.add(public_key)
+        if resets:
+            logger.info(f"{resets} Zähler-Resets erkannt, Gesamtsummen fortgeführt.")
+        return resets
+
+    def usage(self, public_key: str) -> Optional[PeerUsage]:
+        account = self._accounts.get(public_key)
+        if account is None:
+            return None
+        return PeerUsage(public_key, account[0] + account[2], account[1] + account[3], account[4])
+
+    def all_usage(self) -> List[PeerUsage]:
+        """Gesamtsummen aller Peers."""
+        return [
+            PeerUsage(key, a[0] + a[2], a[1] + a[3], a[4])
+            for key, a in list(self._accounts.items())
+        ]
+
+    def flush(self, force: bool = False) -> int:
+        """
+        Hängt die geänderten Peers an das Journal an (höchstens alle `flush_interval` Sekunden).
+        Wird das Journal deutlich größer als der Bestand, wird es neu geschrieben.
+
+        Returns:
+            Anzahl der geschriebenen Datensätze
+        """
+        now = time.monotonic()
+        # Sicherungen nacheinander; der Zähler-Lock wird nur für das Packen gehalten
+        with self._io_lock:
+            with self._lock:
+                if not self._dirty or (not force and now - self._last_flush < self.flush_interval):
+                    return 0
+                count = len(self._dirty)
+                self._last_flush = now
+                rewrite = self._journal_records + count > 4 * len(self._accounts) + 1024
+                keys = self._accounts if rewrite else self._dirty
+                records = b"".join(self._pack(key) for key in keys)
+                count = len(keys)
+                self._dirty = set()
+
+            if rewrite:
+                temp_file = self.path.with_suffix('.tmp')
+                with open(temp_file, 'wb') as f:
+                    f.write(records)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(temp_file, self.path)
+                self._journal_records = count
+            else:
+                with open(self.path, 'ab') as f:
+                    f.write(records)
+                    f.flush()
+                    os.fsync(f.fileno())
+                self._journal_records += count
+        return count
+
+    def _pack(self, public_key: str) -> bytes:
+        return ACCOUNT_RECORD.pack(public_key.encode(), *self._accounts[public_key])
@@ -0,0 +1,114 @@
+import inspect
+import logging
+from dataclasses import dataclass
+from enum import Enum
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from app.services.peer_records import PeerRecord
+
+# Logger konfigurieren
+logger = logging.getLogger(__name__)
+
+class PeerEventType(str, Enum):
+    """Arten von Änderungen an einem Peer zwischen zwei Monitor-Durchläufen."""
+    PEER_ADDED = "peer_added"
+    PEER_REMOVED = "peer_removed"
+    CAME_ONLINE = "came_online"
+    WENT_OFFLINE = "went_offline"
+    ENDPOINT_CHANGED = "endpoint_changed"
+    HANDSHAKE_ADVANCED = "handshake_advanced"
+
+@dataclass(frozen=True)
+class PeerEvent:
+    """Eine einzelne Änderung an einem Peer."""
+    type: PeerEventType
+    interface: str
+    public_key: str
+    peer: Optional[PeerRecord]
+    previous: Optional[PeerRecord] = None
+
+PeerIndex = Dict[str, PeerRecord]
+EventHandler = Callable[[List[PeerEvent]], Union[None, Awaitable[None]]]
+
+def diff_peers(interface: str, old_index: PeerIndex, new_peers: Iterable[PeerRecord]) -> Tuple[List[PeerEvent], PeerIndex]:
+    """
+    Vergleicht die Peers zweier Durchläufe in einem linearen Durchgang.
+
+    Args:
+        interface: Name des Interfaces
+        old_index: Peers des letzten Durchlaufs, indiziert nach öffentlichem Schlüssel
+        new_peers: Peers des aktuellen Durchlaufs
+
+    Returns:
+        Liste der Ereignisse und der neue Index
+    """
+    events: List[PeerEvent] = []
+    new_index: PeerIndex = {}
+    added = 0
+
+    for peer in new_peers:
+        key = peer.public_key
+        new_index[key] = peer
+        old = old_index.get(key)
+
+        if old is None:
+            events.append(PeerEvent(PeerEventType.PEER_ADDED, interface, key, peer))
+            added += 1
+            continue
+
+        if peer.online != old.online:
+            event_type = PeerEventType.CAME_ONLINE if peer.online else PeerEventType.WENT_OFFLINE
+            events.append(PeerEvent(event_type, interface, key, peer, old))
+        if peer.endpoint != old.endpoint:
+            events.append(PeerEvent(PeerEventType.ENDPOINT_CHANGED, interface, key, peer, old))
+        if peer.latest_handshake > old.latest_handshake:
+            events.append(PeerEvent(PeerEventType.HANDSHAKE_ADVANCED, interface, key, peer, old))
+
+    # Nur nach entfernten Peers suchen, wenn nicht alle alten Peers wiedergefunden wurden
+    if len(new_index) - added < len(old_index):
+        for key, old in old_index.items():
+            if key not in new_index:
+                events.append(PeerEvent(PeerEventType.PEER_REMOVED, interface, key, None, old))
+
+    return events, new_index
+
+class PeerEventBus:
+    """
+    Verteilt die Ereignisse eines Durchlaufs an registrierte Abonnenten.
+    Abonnenten erhalten pro Durchlauf eine Liste von Ereignissen und können
+    synchron oder asynchron sein. Fehler eines Abonnenten betreffen keine anderen.
+    """
+
+    def __init__(self):
+        self._handlers: List[EventHandler] = []
+
+    def subscribe(self, handler: EventHandler) -> Callable[[], None]:
+        """
+        Registriert einen Abonnenten.
+
+        Returns:
+            Funktion zum Abmelden des Abonnenten
+        """
+        self._handlers.append(handler)
+
+        def unsubscribe():
+            if handler in self._handlers:
+                self._handlers.remove(handler)
+
+        return unsubscribe
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._handlers)
+
+    async def publish(self, events: List[PeerEvent]):
+        """Übergibt die Ereignisse an alle Abonnenten."""
+        if not events:
+            return
+        for handler in list(self._handlers):
+            try:
+                result = handler(events)
+                if inspect.isawaitable(result):
+                    await result
+            except Exception as e:
+                logger.error(f"Fehler in Peer-Ereignis-Abonnent {handler!r}: {e}")
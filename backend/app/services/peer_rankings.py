@@ -0,0 +1,96 @@
+import heapq
+from typing import Callable, Dict, List, Optional, Tuple
+
+from app.services.peer_accounting import PeerUsage
+from app.services.peer_records import PeerRecord
+
+# Ranglisten: aktuelle Rate (gesamt, rx, tx), kumulierter Verkehr und Alter des letzten Handshakes
+RANKING_METRICS = ("rate", "rx_rate", "tx_rate", "total", "handshake_age")
+
+# (Wert, Peer)
+RankedPeer = Tuple[float, PeerRecord]
+
+class PeerRankings:
+    """
+    Top-N-Ranglisten der Peers eines Interfaces.
+
+    Der Monitor übergibt nach jedem Durchlauf den neuen Stand. Je Kennzahl wird die Rangliste
+    höchstens einmal pro Durchlauf mit einem Heap der Größe `capacity` bestimmt
+    (O(n log capacity), erst beim ersten Abruf) und bis zum nächsten Durchlauf wiederverwendet;
+    Anfragen schneiden nur noch die ersten `limit` Einträge ab.
+    """
+
+    def __init__(self, capacity: int = 100):
+        """
+        Args:
+            capacity: Maximale Länge einer Rangliste
+        """
+        self.capacity = capacity
+        self.timestamp: Optional[float] = None
+        self.version = 0
+        self._peers: List[PeerRecord] = []
+        self._rates: Callable[[], Dict[str, Tuple[float, float]]] = dict
+        self._usage: Optional[Callable[[str], Optional[PeerUsage]]] = None
+        self._cache: Dict[str, List[RankedPeer]] = {}
+
+    def update(
+        self,
+        now: float,
+        peers: List[PeerRecord],
+        rates: Callable[[], Dict[str, Tuple[float, float]]],
+        usage: Optional[Callable[[str], Optional[PeerUsage]]] = None
+    ):
+        """
+        Übernimmt den Stand eines Durchlaufs; die Ranglisten werden bei Bedarf neu bestimmt.
+
+        Args:
+            now: Zeitpunkt des Durchlaufs
+            peers: Peers des Durchlaufs
+            rates: Liefert die Raten (rx, tx in Bytes/s) aller Peers aus dem letzten Durchlauf
+            usage: Optionale monotone Gesamtsummen pro Peer (sonst die Kernel-Zähler)
+        """
+        self.timestamp = now
+        self.version += 1
+        self._peers = peers
+        self._rates = rates
+        self._usage = usage
+        self._cache = {}
+
+    def top(self, metric: str, limit: int = 20) -> List[RankedPeer]:
+        """
+        Liefert die `limit` Peers mit dem höchsten Wert der Kennzahl (absteigend).
+        Bei `handshake_age` sind das die Peers mit dem ältesten Handshake; Peers ohne
+        Handshake werden nicht berücksichtigt.
+        """
+        if metric not in RANKING_METRICS:
+            raise ValueError(f"Unbekannte Kennzahl: {metric}")
+        ranking = self._cache.get(metric)
+        if ranking is None:
+            ranking = self._cache[metric] = self._rank(metric)
+        return ranking[:limit]
+
+    def _rank(self, metric: str) -> List[RankedPeer]:
+        peers = self._peers
+        if metric == "handshake_age":
+            now = self.timestamp or 0.0
+            values = ((now - peer.latest_handshake, index) for index, peer in enumerate(peers) if peer.latest_handshake > 0)
+        elif metric == "total":
+            usage = self._usage
+            values = (
+                (_total(peer, usage(peer.public_key) if usage else None), index)
+                for index, peer in enumerate(peers)
+            )
+        else:
+            rates = self._rates()
+            pick = {"rate": lambda r: r[0] + r[1], "rx_rate": lambda r: r[0], "tx_rate": lambda r: r[1]}[metric]
+            values = (
+                (pick(rates[peer.public_key]), index)
+                for index, peer in enumerate(peers)
+                if peer.public_key in rates
+            )
+        return [(value, peers[index]) for value, index in heapq.nlargest(self.capacity, values)]
+
+def _total(peer: PeerRecord, usage: Optional[PeerUsage]) -> int:
+    if usage is not None:
+        return usage.total_rx + usage.total_tx
+    return peer.transfer_rx + peer.transfer_tx
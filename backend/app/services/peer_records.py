@@ -0,0 +1,83 @@
+from datetime import datetime
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+
+from app.services.peer_roles import RoleClassifier
+from app.wireguard.dump import InterfaceDump
+
+# Online gilt ein Peer mit einem Handshake in den letzten 180 Sekunden
+ONLINE_TIMEOUT = 180
+
+class PeerRecord(NamedTuple):
+    """
+    Kompakter Zustand eines Peers nach einem Monitor-Durchlauf.
+    Die ersten Felder entsprechen `PeerDump`; erst an der API-Grenze wird
+    daraus mit `to_dict()` ein JSON-fähiges Dict.
+    """
+    public_key: str
+    endpoint: Optional[str]
+    allowed_ips: Tuple[str, ...]
+    latest_handshake: int
+    transfer_rx: int
+    transfer_tx: int
+    persistent_keepalive: Optional[str]
+    online: bool
+    type: str
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "public_key": self.public_key,
+            "endpoint": self.endpoint,
+            "allowed_ips": list(self.allowed_ips),
+            "latest_handshake": self.latest_handshake,
+            "transfer_rx": self.transfer_rx,
+            "transfer_tx": self.transfer_tx,
+            "persistent_keepalive": self.persistent_keepalive,
+            "online": self.online,
+            "last_activity": datetime.fromtimestamp(self.latest_handshake).isoformat() if self.latest_handshake > 0 else None,
+            "type": self.type
+        }
+
+def peer_to_dict(peer: Any) -> Optional[Dict[str, Any]]:
+    """Wandelt einen Peer in ein JSON-fähiges Dict um (Dicts, z.B. aus der Statusdatei, bleiben unverändert)."""
+    if peer is None or isinstance(peer, dict):
+        return peer
+    return peer.to_dict()
+
+def status_to_dict(status: Dict[str, Any]) -> Dict[str, Any]:
+    """Wandelt die Statusdaten eines Durchlaufs in ein JSON-fähiges Dict um."""
+    result = dict(status)
+    result["peers"] = [peer_to_dict(peer) for peer in status.get("peers", [])]
+    return result
+
+def build_status(interface: str, dump: InterfaceDump, roles: RoleClassifier, now: float) -> Dict[str, Any]:
+    """
+    Erzeugt die Statusdaten eines Durchlaufs aus den Rohdaten eines Collectors.
+    Die Peers werden als kompakte `PeerRecord`s abgelegt; JSON-fähige Dicts
+    entstehen erst an der API-Grenze (siehe `status_to_dict`).
+    """
+    status = {
+        "timestamp": datetime.fromtimestamp(now).isoformat(),
+        "interface": interface,
+        "peers": []
+    }
+
+    if dump.public_key is not None:
+        status["public_key"] = dump.public_key
+        status["listen_port"] = dump.listen_port
+
+    online_since = now - ONLINE_TIMEOUT
+    classify = roles.classify
+    peers = status["peers"] = [
+        PeerRecord(
+            *peer,
+            peer.latest_handshake > 0 and peer.latest_handshake > online_since,
+            classify(peer.public_key, peer.allowed_ips)
+        )
+        for peer in dump.peers
+    ]
+
+    # Zuordnungen entfernter Peers verwerfen, sobald sich genug angesammelt haben
+    if roles.cached_peers > 2 * len(peers) + 1024:
+        roles.prune(peer.public_key for peer in peers)
+
+    return status
@@ -0,0 +1,107 @@
+import ipaddress
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Logger konfigurieren
+logger = logging.getLogger(__name__)
+
+# Rolle, wenn keine erlaubte IP in einem konfigurierten Präfix liegt
+DEFAULT_ROLE = "unknown"
+
+class PrefixTable:
+    """
+    Longest-Prefix-Match über IPv4- und IPv6-Präfixe.
+
+    Pro Adressfamilie und Präfixlänge liegt eine Hashtabelle (Netzadresse -> Wert); eine
+    Abfrage prüft die vorhandenen Präfixlängen absteigend, also höchstens so viele
+    Hash-Zugriffe, wie es verschiedene Präfixlängen gibt.
+    """
+
+    def __init__(self):
+        # Version -> Präfixlänge -> Netzadresse -> Wert
+        self._tables: Dict[int, Dict[int, Dict[int, str]]] = {4: {}, 6: {}}
+        # Version -> [(Präfixlänge, Maske)] absteigend
+        self._lengths: Dict[int, List[Tuple[int, int]]] = {4: [], 6: []}
+
+    def add(self, prefix: str, value: str):
+        network = ipaddress.ip_network(prefix, strict=False)
+        version, length = network.version, network.prefixlen
+        self._tables[version].setdefault(length, {})[int(network.network_address)] = value
+        bits = network.max_prefixlen
+        self._lengths[version] = sorted(
+            ((n, ((1 << n) - 1) << (bits - n)) for n in self._tables[version]),
+            reverse=True
+        )
+
+    def lookup(self, address: int, version: int, max_length: Optional[int] = None) -> Optional[Tuple[int, str]]:
+        """
+        Liefert (Präfixlänge, Wert) des spezifischsten Präfixes, das die Adresse enthält.
+        Mit `max_length` werden nur Präfixe berücksichtigt, die ein Netz dieser Länge vollständig enthalten.
+        """
+        tables = self._tables[version]
+        for length, mask in self._lengths[version]:
+            if max_length is not None and length > max_length:
+                continue
+            value = tables[length].get(address & mask)
+            if value is not None:
+                return length, value
+        return None
+
+class RoleClassifier:
+    """
+    Ordnet Peers anhand ihrer erlaubten IPs einer Rolle zu (z.B. admin, user, site).
+
+    - Beliebig viele benannte IPv4-/IPv6-Präfixe pro Rolle, einmalig in einer `PrefixTable` abgelegt
+    - Hat ein Peer mehrere erlaubte IPs, gilt das spezifischste passende Präfix; ein erlaubtes Netz
+      zählt nur, wenn es vollständig im Präfix der Rolle liegt
+    - Die Zuordnung wird pro Peer zwischengespeichert, bis sich seine erlaubten IPs ändern
+    """
+
+    def __init__(self, roles: Dict[str, List[str]], default: str = DEFAULT_ROLE):
+        """
+        Args:
+            roles: Rolle -> Liste von Präfixen (z.B. {"admin": ["10.10.10.0/24", "fd00:10::/64"]})
+            default: Rolle für Peers ohne passendes Präfix
+        """
+        self.default = default
+        self.table = PrefixTable()
+        for role, prefixes in roles.items():
+            for prefix in prefixes:
+                try:
+                    self.table.add(prefix, role)
+                except ValueError as e:
+                    logger.error(f"Ungültiges Präfix {prefix!r} für Rolle {role}: {e}")
+        # öffentlicher Schlüssel -> (erlaubte IPs, Rolle)
+        self._cache: Dict[str, Tuple[Tuple[str, ...], str]] = {}
+
+    def classify_ips(self, allowed_ips: Iterable[str]) -> str:
+        """Bestimmt die Rolle für eine Liste erlaubter IPs (ohne Zwischenspeicher)."""
+        best: Optional[Tuple[int, str]] = None
+        for allowed_ip in allowed_ips:
+            try:
+                network = ipaddress.ip_network(allowed_ip.strip(), strict=False)
+            except ValueError:
+                continue
+            match = self.table.lookup(int(network.network_address), network.version, network.prefixlen)
+            if match is not None and (best is None or match[0] > best[0]):
+                best = match
+        return best[1] if best is not None else self.default
+
+    def classify(self, public_key: str, allowed_ips: Tuple[str, ...]) -> str:
+        """Bestimmt die Rolle eines Peers; unveränderte Peers kosten nur einen Dict-Zugriff."""
+        cached = self._cache.get(public_key)
+        if cached is not None and cached[0] == allowed_ips:
+            return cached[1]
+        role = self.classify_ips(allowed_ips)
+        self._cache[public_key] = (allowed_ips, role)
+        return role
+
+    def prune(self, public_keys: Iterable[str]):
+        """Entfernt zwischengespeicherte Zuordnungen von Peers, die nicht mehr existieren."""
+        keep = set(public_keys)
+        for public_key in [key for key in self._cache if key not in keep]:
+            del self._cache[public_key]
+
+    @property
+    def cached_peers(self) -> int:
+        return len(self._cache)
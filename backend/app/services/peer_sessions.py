@@ -0,0 +1,249 @@
+import json
+import logging
+import os
+import struct
+import threading
+import time
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from app.services.peer_events import PeerEvent, PeerEventType
+from app.services.peer_records import PeerRecord
+
+# Logger konfigurieren
+logger = logging.getLogger(__name__)
+
+# Datensatz: öffentlicher Schlüssel, Beginn, Ende, rx-/tx-Bytes der Sitzung, Endpunkt
+SESSION_RECORD = struct.Struct("<44sddQQ64p")
+
+# Eine WireGuard-Sitzung gilt bis 180 Sekunden nach dem letzten Handshake
+SESSION_TIMEOUT = 180
+
+class PeerSession(NamedTuple):
+    """Zusammenhängende Online-Phase eines Peers von einem Endpunkt aus."""
+    public_key: str
+    start: float
+    end: Optional[float]
+    endpoint: Optional[str]
+    transfer_rx: int
+    transfer_tx: int
+
+class PeerSessionLog:
+    """
+    Leitet Verbindungssitzungen der Peers aus den Ereignissen aufeinanderfolgender Durchläufe ab.
+
+    - Eine Sitzung beginnt mit `came_online` (bzw. einem neuen, bereits aktiven Peer) beim
+      Handshake, der den Peer online gebracht hat, und endet mit `went_offline`/`peer_removed`
+      180 Sekunden nach dem letzten Handshake. Ein Endpunktwechsel beendet die Sitzung und
+      beginnt eine neue
+    - Pro Durchlauf werden nur die Ereignisse verarbeitet, also O(geänderte Peers)
+    - Abgeschlossene Sitzungen werden als Datensätze fester Größe an `<interface>.sessions`
+      angehängt; ein Index pro Peer (sortiert nach Zeit) wird beim Start aus dem Log aufgebaut
+    - `record` arbeitet nur im Speicher; `flush` (im Thread) hängt abgeschlossene Sitzungen an
+      und sichert offene Sitzungen höchstens alle `checkpoint_interval` Sekunden in
+      `<interface>.open.json`, damit sie auch nach einem Absturz fortgeführt werden
+    """
+
+    def __init__(self, root_dir: str, interface: str, checkpoint_interval: float = 60.0):
+        """
+        Args:
+            root_dir: Verzeichnis für Log und offene Sitzungen
+            interface: Name des Interfaces (Dateiname)
+            checkpoint_interval: Mindestabstand zwischen zwei Sicherungen der offenen Sitzungen in Sekunden
+        """
+        self.root_dir = Path(root_dir)
+        self.log_file = self.root_dir / f"{interface}.sessions"
+        self.open_file = self.root_dir / f"{interface}.open.json"
+        os.makedirs(self.root_dir, exist_ok=True)
+        self._lock = threading.Lock()
+        # öffentlicher Schlüssel -> (Enden, Anfänge, Positionen im Log)
+        self._index: Dict[str, Tuple[array, array, array]] = {}
+        # öffentlicher Schlüssel -> [Beginn, Endpunkt, rx-Basis, tx-Basis]
+        self._open: Dict[str, list] = {}
+        self._size = 0
+        self.checkpoint_interval = checkpoint_interval
+        # Abgeschlossene, noch nicht geschriebene Sitzungen
+        self._pending: List[Tuple[str, float, float, int, int, Optional[str]]] = []
+        self._open_changed = False
+        self._last_checkpoint = time.monotonic()
+        self._io_lock = threading.Lock()
+        self._load()
+        self._log = open(self.log_file, 'ab')
+
+    def _load(self):
+        try:
+            with open(self.log_file, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            data = b""
+        usable = len(data) - len(data) % SESSION_RECORD.size
+        if usable != len(data):
+            # Unvollständigen letzten Datensatz (Absturz beim Schreiben) abschneiden
+            os.truncate(self.log_file, usable)
+        for offset in range(0, usable, SESSION_RECORD.size):
+            key, start, end, _, _, _ = SESSION_RECORD.unpack_from(data, offset)
+            self._add_to_index(key.rstrip(b"\0").decode(), start, end, offset)
+        self._size = usable
+        try:
+            with open(self.open_file, 'r') as f:
+                self._open = json.load(f)
+        except (FileNotFoundError, ValueError):
+            self._open = {}
+        # Nach einem Absturz können Sitzungen der letzten Sicherung bereits im Log stehen
+        for key in [key for key, session in self._open.items() if key in self._index and self._index[key][1][-1] >= session[0]]:
+            del self._open[key]
+        logger.info(f"{usable // SESSION_RECORD.size} Sitzungen und {len(self._open)} offene Sitzungen aus {self.root_dir} geladen.")
+
+    def _add_to_index(self, public_key: str, start: float, end: float, offset: int):
+        entry = self._index.get(public_key)
+        if entry is None:
+            entry = self._index[public_key] = (array('d'), array('d'), array('Q'))
+        entry[0].append(end)
+        entry[1].append(start)
+        entry[2].append(offset)
+
+    def record(self, now: float, events: List[PeerEvent]) -> int:
+        """
+        Verarbeitet die Ereignisse eines Durchlaufs.
+
+        Returns:
+            Anzahl der abgeschlossenen Sitzungen
+        """
+        closed: List[Tuple[str, float, float, int, int, Optional[str]]] = []
+        for event in events:
+            kind, key = event.type, event.public_key
+            if kind == PeerEventType.PEER_ADDED:
+                if event.peer.online:
+                    if key not in self._open:
+                        self._begin(event.peer, event.peer)
+                elif key in self._open:
+                    # Offene Sitzung aus der Zeit vor dem Neustart
+                    closed.append(self._finish(key, event.peer, now))
+            elif kind == PeerEventType.CAME_ONLINE:
+                self._begin(event.peer, event.previous)
+            elif kind in (PeerEventType.WENT_OFFLINE, PeerEventType.PEER_REMOVED):
+                if key in self._open:
+                    closed.append(self._finish(key, event.peer or event.previous, now))
+            elif (kind == PeerEventType.ENDPOINT_CHANGED and event.peer.online
+                  and key in self._open and self._open[key][1] != event.peer.endpoint):
+                closed.append(self._finish(key, event.previous, now, end=now))
+                self._begin(event.peer, event.previous, start=now)
+            else:
+                continue
+            self._open_changed = True
+
+        if closed:
+            with self._lock:
+                self._pending.extend(closed)
+        return len(closed)
+
+    def _begin(self, peer: PeerRecord, base: PeerRecord, start: Optional[float] = None):
+        # Verkehr vor dem Online-Wechsel gehört nicht zur Sitzung
+        self._open[peer.public_key] = [
+            start if start is not None else float(peer.latest_handshake),
+            peer.endpoint,
+            base.transfer_rx,
+            base.transfer_tx
+        ]
+
+    def _finish(self, public_key: str, peer: PeerRecord, now: float, end: Optional[float] = None):
+        start, endpoint, base_rx, base_tx = self._open.pop(public_key)
+        if end is None:
+            end = min(now, peer.latest_handshake + SESSION_TIMEOUT) if peer.latest_handshake else now
+        # Nach einem Zähler-Reset zählt nur der Stand seit dem Reset
+        rx = peer.transfer_rx - base_rx if peer.transfer_rx >= base_rx else peer.transfer_rx
+        tx = peer.transfer_tx - base_tx if peer.transfer_tx >= base_tx else peer.transfer_tx
+        return public_key, start, max(end, start), rx, tx, endpoint
+
+    def flush(self, force: bool = False) -> int:
+        """
+        Hängt die abgeschlossenen Sitzungen an das Log an und sichert die offenen Sitzungen,
+        wenn sie sich geändert haben (höchstens alle `checkpoint_interval` Sekunden).
+
+        Returns:
+            Anzahl der geschriebenen Sitzungen
+        """
+        now = time.monotonic()
+        with self._io_lock:
+            with self._lock:
+                closed, self._pending = self._pending, []
+                checkpoint = self._open_changed and (force or now - self._last_checkpoint >= self.checkpoint_interval)
+                if checkpoint:
+                    open_sessions = json.dumps(self._open)
+                    self._open_changed = False
+                    self._last_checkpoint = now
+            if closed:
+                self._append(closed)
+            if checkpoint:
+                temp_file = self.open_file.with_suffix('.tmp')
+                with open(temp_file, 'w') as f:
+                    f.write(open_sessions)
+                os.replace(temp_file, self.open_file)
+        return len(closed)
+
+    def _append(self, closed: List[Tuple[str, float, float, int, int, Optional[str]]]):
+        records = b"".join(
+            SESSION_RECORD.pack(key.encode(), start, end, rx, tx, (endpoint or "").encode())
+            for key, start, end, rx, tx, endpoint in closed
+        )
+        self._log.write(records)
+        self._log.flush()
+        with self._lock:
+            offset = self._size
+            for key, start, end, _, _, _ in closed:
+                self._add_to_index(key, start, end, offset)
+                offset += SESSION_RECORD.size
+            self._size = offset
+
+    def sessions(
+        self,
+        public_key: str,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        limit: Optional[int] = None,
+        current: Optional[PeerRecord] = None
+    ) -> List[PeerSession]:
+        """
+        Liefert die Sitzungen eines Peers, die den Zeitraum [start, end] berühren
+        (älteste zuerst, bei `limit` die neuesten), einschließlich einer offenen Sitzung.
+
+        Args:
+            current: Aktueller Stand des Peers, um den bisherigen Verkehr der offenen Sitzung zu berechnen
+        """
+        result: List[PeerSession] = []
+        with self._lock:
+            entry = self._index.get(public_key)
+            positions: List[int] = []
+            if entry is not None:
+                ends, starts, offsets = entry
+                first = bisect_left(ends, start) if start is not None else 0
+                for i in range(first, len(ends)):
+                    if end is not None and starts[i] > end:
+                        break
+                    positions.append(offsets[i])
+        if limit is not None:
+            positions = positions[-limit:]
+        if positions:
+            with open(self.log_file, 'rb') as f:
+                for offset in positions:
+                    key, s, e, rx, tx, endpoint = SESSION_RECORD.unpack(os.pread(f.fileno(), SESSION_RECORD.size, offset))
+                    result.append(PeerSession(public_key, s, e, endpoint.decode() or None, rx, tx))
+
+        session = self._open.get(public_key)
+        if session is not None and (end is None or session[0] <= end):
+            rx = tx = 0
+            if current is not None:
+                rx = max(current.transfer_rx - session[2], 0)
+                tx = max(current.transfer_tx - session[3], 0)
+            result.append(PeerSession(public_key, session[0], None, session[1], rx, tx))
+            if limit is not None:
+                result = result[-limit:]
+        return result
+
+    def close(self):
+        """Schreibt ausstehende Sitzungen, sichert die offenen Sitzungen und schließt das Log."""
+        self._open_changed = True
+        self.flush(force=True)
+        self._log.close()
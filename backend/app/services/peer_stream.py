@@ -0,0 +1,157 @@
+import asyncio
+import logging
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Dict, Optional, Set
+
+from app.services.peer_records import peer_to_dict
+from app.services.serialization import dumps_json
+from app.services.status_snapshot import SnapshotStore, StatusSnapshot
+
+# Logger konfigurieren
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class StreamMessage:
+    """Eine einmal serialisierte Nachricht, die unverändert an alle Abonnenten geht."""
+    version: int
+    sse: bytes
+
+def _sse_frame(event: str, version: int, data: bytes) -> bytes:
+    return b"event: " + event.encode() + b"\nid: " + str(version).encode() + b"\ndata: " + data + b"\n\n"
+
+def _peer_key(peer: Any) -> str:
+    return peer["public_key"] if isinstance(peer, dict) else peer.public_key
+
+def _peer_index(snapshot: Optional[StatusSnapshot]) -> Dict[str, Any]:
+    if snapshot is None:
+        return {}
+    return {_peer_key(peer): peer for peer in snapshot.status.get("peers", [])}
+
+# Markiert eine Verbindung, die neu synchronisiert werden muss
+_RESYNC = object()
+
+class _Subscriber:
+    def __init__(self, queue_size: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+class PeerStreamHub:
+    """
+    Verteilt Live-Aktualisierungen der Peers als Server-Sent Events.
+
+    - Neue Verbindungen erhalten zuerst den vollständigen Snapshot
+    - Danach folgen pro neuem Snapshot nur die geänderten Peers (auch reine
+      Änderungen der Transferzähler) und die Schlüssel entfernter Peers
+    - Jede Nachricht wird einmal serialisiert und von allen Verbindungen geteilt
+    - Jede Verbindung hat eine begrenzte Warteschlange; läuft sie über, werden die
+      ausstehenden Deltas verworfen und die Verbindung erhält einen neuen Snapshot
+    """
+
+    def __init__(
+        self,
+        snapshots: SnapshotStore,
+        queue_size: int = 32,
+        keepalive: float = 15.0,
+        on_connect: Optional[Callable[[], None]] = None
+    ):
+        """
+        Args:
+            snapshots: Quelle der Status-Snapshots
+            queue_size: Maximale Anzahl ausstehender Nachrichten pro Verbindung
+            keepalive: Sekunden ohne Nachricht, nach denen ein Keepalive gesendet wird
+            on_connect: Wird bei jeder neuen Verbindung aufgerufen (z.B. um schneller abzufragen)
+        """
+        self.snapshots = snapshots
+        self.queue_size = queue_size
+        self.keepalive = keepalive
+        self.on_connect = on_connect
+        self._subscribers: Set[_Subscriber] = set()
+        self._snapshot_message: Optional[StreamMessage] = None
+        # Peers des zuletzt verteilten Snapshots (nur solange Verbindungen bestehen)
+        self._index: Optional[Dict[str, Any]] = None
+        self._index_version = 0
+        # Anzahl der Neusynchronisierungen wegen übergelaufener Warteschlangen
+        self.resyncs = 0
+        snapshots.subscribe(self.publish)
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def _snapshot(self) -> Optional[StreamMessage]:
+        """Liefert den aktuellen Snapshot als Nachricht (einmal pro Version erzeugt)."""
+        snapshot = self.snapshots.current
+        if snapshot is None:
+            return None
+        if self._snapshot_message is None or self._snapshot_message.version != snapshot.version:
+            self._snapshot_message = StreamMessage(snapshot.version, _sse_frame("snapshot", snapshot.version, snapshot.body))
+        return self._snapshot_message
+
+    def publish(self, previous: Optional[StatusSnapshot], snapshot: StatusSnapshot):
+        """
+        Bestimmt die Änderungen gegenüber dem vorherigen Snapshot, serialisiert sie einmal
+        und verteilt sie an alle Verbindungen.
+        """
+        if not self._subscribers:
+            self._index = None
+            return
+        if self._index is not None and previous is not None and self._index_version == previous.version:
+            old_index = self._index
+        else:
+            old_index = _peer_index(previous)
+        index = _peer_index(snapshot)
+        self._index, self._index_version = index, snapshot.version
+
+        changed = [peer_to_dict(peer) for key, peer in index.items() if old_index.get(key) != peer]
+        removed = [key for key in old_index if key not in index]
+        if not changed and not removed:
+            return
+        version = snapshot.version
+        data = dumps_json({"version": version, "peers": changed, "removed": removed})
+        message = StreamMessage(version, _sse_frame("delta", version, data))
+
+        for subscriber in self._subscribers:
+            try:
+                subscriber.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                # Langsamer Client: Deltas verwerfen und neu synchronisieren
+                while not subscriber.queue.empty():
+                    subscriber.queue.get_nowait()
+                subscriber.queue.put_nowait(_RESYNC)
+                self.resyncs += 1
+
+    async def stream(self, is_disconnected: Callable) -> AsyncIterator[bytes]:
+        """
+        Erzeugt den Event-Stream einer Verbindung.
+
+        Args:
+            is_disconnected: Coroutine-Funktion, die meldet, ob der Client getrennt wurde
+        """
+        subscriber = _Subscriber(self.queue_size)
+        self._subscribers.add(subscriber)
+        logger.info(f"Live-Stream verbunden ({len(self._subscribers)} aktive Verbindungen).")
+        if self.on_connect is not None:
+            self.on_connect()
+        try:
+            snapshot = self._snapshot()
+            snapshot_version = snapshot.version if snapshot else 0
+            if snapshot is not None:
+                yield snapshot.sse
+
+            while not await is_disconnected():
+                try:
+                    message = await asyncio.wait_for(subscriber.queue.get(), timeout=self.keepalive)
+                except asyncio.TimeoutError:
+                    yield b": keepalive\n\n"
+                    continue
+
+                if message is _RESYNC:
+                    snapshot = self._snapshot()
+                    if snapshot is not None:
+                        snapshot_version = snapshot.version
+                        yield snapshot.sse
+                elif message.version > snapshot_version:
+                    # Deltas, die bereits im Snapshot enthalten sind, überspringen
+                    yield message.sse
+        finally:
+            self._subscribers.discard(subscriber)
+            logger.info(f"Live-Stream getrennt ({len(self._subscribers)} aktive Verbindungen).")
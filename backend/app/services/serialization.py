@@ -0,0 +1,84 @@
+import gzip
+import json
+import logging
+from typing import Any, Optional, Tuple
+
+# Logger konfigurieren
+logger = logging.getLogger(__name__)
+
+# Schnelle Encoder sind optional; ohne sie wird die Standardbibliothek verwendet
+try:
+    import orjson
+except ImportError:
+    orjson = None
+    logger.info("orjson ist nicht installiert; JSON wird mit der Standardbibliothek serialisiert.")
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+    logger.info("msgpack ist nicht installiert; Antworten werden nur als JSON geliefert.")
+
+JSON_MEDIA_TYPE = "application/json"
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+_MSGPACK_ALIASES = (MSGPACK_MEDIA_TYPE, "application/x-msgpack", "application/vnd.msgpack")
+
+# Statusdateien ab dieser Größe werden komprimiert gespeichert
+COMPRESS_THRESHOLD = 64 * 1024
+
+def dumps_json(data: Any) -> bytes:
+    """Serialisiert nach kompaktem JSON (orjson, falls installiert)."""
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, separators=(',', ':')).encode()
+
+def loads_json(data: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def msgpack_available() -> bool:
+    return msgpack is not None
+
+def dumps_msgpack(data: Any) -> bytes:
+    """Serialisiert nach MessagePack; setzt das Paket `msgpack` voraus."""
+    if msgpack is None:
+        raise RuntimeError("MessagePack ist nicht verfügbar (Paket msgpack fehlt)")
+    return msgpack.packb(data, use_bin_type=True)
+
+def negotiate(accept: Optional[str]) -> str:
+    """
+    Wählt das Antwortformat anhand des Accept-Headers.
+    MessagePack nur, wenn es ausdrücklich angefordert wird und verfügbar ist; sonst JSON.
+    """
+    if not accept or msgpack is None:
+        return JSON_MEDIA_TYPE
+    for part in accept.split(','):
+        media_type, *params = (item.strip() for item in part.split(';'))
+        if media_type.lower() not in _MSGPACK_ALIASES:
+            continue
+        quality = next((param[2:] for param in params if param.lower().startswith('q=')), '1')
+        try:
+            if float(quality) > 0:
+                return MSGPACK_MEDIA_TYPE
+        except ValueError:
+            return MSGPACK_MEDIA_TYPE
+    return JSON_MEDIA_TYPE
+
+def encode_for_storage(body: bytes, threshold: int = COMPRESS_THRESHOLD) -> Tuple[bytes, bool]:
+    """
+    Bereitet serialisierte Daten zum Speichern vor; große Daten werden mit gzip
+    (schnellste Stufe) komprimiert.
+
+    Returns:
+        (zu schreibende Bytes, komprimiert)
+    """
+    if len(body) < threshold:
+        return body, False
+    return gzip.compress(body, compresslevel=1, mtime=0), True
+
+def decode_from_storage(data: bytes) -> Any:
+    """Liest gespeicherte Daten (gzip-komprimiert oder unkomprimiert)."""
+    if data[:2] == b"\x1f\x8b":
+        data = gzip.decompress(data)
+    return loads_json(data)
@@ -0,0 +1,51 @@
+import asyncio
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from app.services.serialization import decode_from_storage, encode_for_storage
+
+# Logger konfigurieren
+logger = logging.getLogger(__name__)
+
+class StatusFile:
+    """
+    Statusdatei eines Interfaces. Große Stände werden komprimiert als
+    `<interface>_status.json.gz` abgelegt, kleine unverändert als JSON.
+    """
+
+    def __init__(self, status_dir: Path, interface: str):
+        self.path = status_dir / f"{interface}_status.json"
+        self.compressed_path = status_dir / f"{interface}_status.json.gz"
+
+    async def save(self, body: bytes):
+        """Speichert die serialisierten Statusdaten in einem Thread; Fehler werden nur protokolliert."""
+        try:
+            await asyncio.to_thread(self.write, body)
+        except Exception as e:
+            logger.error(f"Fehler beim Speichern der Statusdaten: {e}")
+
+    def write(self, body: bytes):
+        """Schreibt die serialisierten Statusdaten (blockierend)."""
+        data, compressed = encode_for_storage(body)
+        target, stale = (self.compressed_path, self.path) if compressed else (self.path, self.compressed_path)
+
+        # Schreibe die Daten in eine temporäre Datei und benenne sie dann um,
+        # um atomare Schreibvorgänge zu gewährleisten
+        temp_file = self.path.with_suffix('.tmp')
+        with open(temp_file, 'wb') as f:
+            f.write(data)
+
+        # Atomares Umbenennen; die jeweils andere Variante entfernen
+        os.replace(temp_file, target)
+        if stale.exists():
+            stale.unlink()
+
+    def read(self) -> Optional[Dict[str, Any]]:
+        """Liest die zuletzt gespeicherten Statusdaten oder None, wenn keine Datei existiert."""
+        for path in (self.compressed_path, self.path):
+            if path.exists():
+                with open(path, 'rb') as f:
+                    return decode_from_storage(f.read())
+        return None
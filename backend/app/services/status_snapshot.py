@@ -0,0 +1,105 @@
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from app.services.peer_records import status_to_dict
+from app.services.serialization import dumps_json, dumps_msgpack
+
+# Logger konfigurieren
+logger = logging.getLogger(__name__)
+
+@dataclass(frozen=True)
+class StatusSnapshot:
+    """
+    Unveränderlicher Stand der Statusdaten nach einem Monitor-Durchlauf.
+    Die Antwort wird einmalig serialisiert und von allen Anfragen geteilt.
+    """
+    version: int
+    status: Dict[str, Any]
+    body: bytes
+    etag: str
+    created_at: float = field(default_factory=time.time)
+
+    @cached_property
+    def msgpack_body(self) -> bytes:
+        """MessagePack-Darstellung, erst beim ersten Abruf erzeugt und dann geteilt."""
+        return dumps_msgpack(status_to_dict(self.status))
+
+    @property
+    def msgpack_etag(self) -> str:
+        return f'{self.etag[:-1]}-mp"'
+
+    def matches(self, if_none_match: Optional[str], etag: Optional[str] = None) -> bool:
+        """Prüft, ob ein If-None-Match-Header auf diesen Stand (bzw. das angegebene ETag) passt."""
+        if not if_none_match:
+            return False
+        etag = etag or self.etag
+        tags: Iterable[str] = (tag.strip() for tag in if_none_match.split(','))
+        for tag in tags:
+            if tag == "*" or tag.removeprefix("W/") == etag:
+                return True
+        return False
+
+class SnapshotStore:
+    """
+    Hält den jeweils neuesten StatusSnapshot im Speicher.
+    Die Version steigt monoton; das ETag enthält zusätzlich eine Kennung
+    des Prozesses, damit nach einem Neustart keine alten ETags passen.
+    Abonnenten werden nach jeder Veröffentlichung mit dem alten und neuen Stand aufgerufen.
+    """
+
+    def __init__(self):
+        self._epoch = os.urandom(4).hex()
+        self._version = 0
+        self._current: Optional[StatusSnapshot] = None
+        self._listeners: List[Callable[[Optional[StatusSnapshot], StatusSnapshot], None]] = []
+
+    @property
+    def current(self) -> Optional[StatusSnapshot]:
+        return self._current
+
+    def publish(self, status: Dict[str, Any]) -> StatusSnapshot:
+        """Serialisiert die Statusdaten und veröffentlicht sie als neue Version."""
+        self._version += 1
+        snapshot = StatusSnapshot(
+            version=self._version,
+            status=status,
+            body=dumps_json(status_to_dict(status)),
+            etag=f'"{self._epoch}-{self._version}"'
+        )
+        previous, self._current = self._current, snapshot
+        for listener in list(self._listeners):
+            try:
+                listener(previous, snapshot)
+            except Exception as e:
+                logger.error(f"Fehler in Snapshot-Abonnent {listener!r}: {e}")
+        return snapshot
+
+    def is_current(self, status: Dict[str, Any]) -> bool:
+        """Prüft, ob Interface und Peers dem veröffentlichten Snapshot entsprechen."""
+        if self._current is None:
+            return False
+        previous = self._current.status
+        return (
+            previous.get("public_key") == status.get("public_key")
+            and previous.get("listen_port") == status.get("listen_port")
+            and previous.get("peers") == status["peers"]
+        )
+
+    def subscribe(self, listener: Callable[[Optional[StatusSnapshot], StatusSnapshot], None]) -> Callable[[], None]:
+        """
+        Registriert einen Abonnenten für neue Snapshots.
+
+        Returns:
+            Funktion zum Abmelden des Abonnenten
+        """
+        self._listeners.append(listener)
+
+        def unsubscribe():
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+        return unsubscribe
@@ -0,0 +1,164 @@
+import asyncio
+import logging
+import math
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional
+
+# Logger konfigurieren
+logger = logging.getLogger(__name__)
+
+class PhaseTimer:
+    """
+    Misst die Dauer der einzelnen Phasen eines Durchlaufs
+    (letzter Wert, gleitender Mittelwert und Maximum in Sekunden).
+    """
+
+    def __init__(self, smoothing: float = 0.2):
+        self.smoothing = smoothing
+        self.last: Dict[str, float] = {}
+        self.average: Dict[str, float] = {}
+        self.maximum: Dict[str, float] = {}
+
+    def record(self, name: str, duration: float):
+        self.last[name] = duration
+        previous = self.average.get(name)
+        self.average[name] = duration if previous is None else previous + self.smoothing * (duration - previous)
+        self.maximum[name] = max(self.maximum.get(name, 0.0), duration)
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """Kontextmanager, der die Dauer des umschlossenen Blocks als Phase erfasst."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - started)
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        return {
+            name: {"last": self.last[name], "average": self.average[name], "max": self.maximum[name]}
+            for name in self.last
+        }
+
+class AdaptiveInterval:
+    """
+    Passt das Abfrageintervall an die Aktivität an: Bei Aktivität wird sofort auf das
+    Minimum gewechselt, im Leerlauf wächst das Intervall exponentiell bis zur Obergrenze.
+    """
+
+    def __init__(self, initial: float, minimum: float, maximum: float, factor: float = 2.0):
+        if not 0 < minimum <= maximum:
+            raise ValueError("Ungültige Intervallgrenzen")
+        self.minimum = minimum
+        self.maximum = maximum
+        self.factor = factor
+        self.current = min(max(initial, minimum), maximum)
+
+    def update(self, active: bool) -> float:
+        """Berechnet das nächste Intervall nach einem Durchlauf."""
+        if active:
+            self.current = self.minimum
+        else:
+            self.current = min(self.current * self.factor, self.maximum)
+        return self.current
+
+    def reset(self) -> float:
+        """Wechselt sofort auf das Minimum (z.B. bei einer neuen Live-Verbindung)."""
+        self.current = self.minimum
+        return self.current
+
+class TickScheduler:
+    """
+    Führt einen Durchlauf in festen, an der Uhrzeit ausgerichteten Abständen aus.
+
+    - Die Startzeitpunkte liegen auf einem Raster (Vielfache des Intervalls), sodass die
+      Dauer eines Durchlaufs die Periode nicht verlängert
+    - Durchläufe überlappen nie; überschreitet ein Durchlauf das Intervall, werden die
+      verpassten Rasterpunkte übersprungen statt nachgeholt und als Überlauf gezählt
+    - Das Intervall darf zwischen zwei Durchläufen geändert werden; `wake()` lässt ein
+      verkürztes Intervall sofort wirksam werden
+    """
+
+    def __init__(self, interval: float):
+        if interval <= 0:
+            raise ValueError("Das Intervall muss größer als 0 sein")
+        self.interval = interval
+        self.running = False
+        self.timer = PhaseTimer()
+        self.ticks = 0
+        self.overruns = 0
+        self.skipped_ticks = 0
+        self.last_started: Optional[float] = None
+        self._wake_event = asyncio.Event()
+
+    def next_deadline(self, now: float) -> float:
+        """Nächster Rasterpunkt nach `now`."""
+        return (math.floor(now / self.interval) + 1) * self.interval
+
+    async def run(self, tick: Callable[[], Awaitable[Any]]):
+        """Führt `tick` bis zum Aufruf von `stop()` periodisch aus (der erste Durchlauf sofort)."""
+        self.running = True
+        self._wake_event.clear()
+        deadline = time.time()
+
+        while self.running:
+            delay = deadline - time.time()
+            if delay > 0:
+                try:
+                    await asyncio.wait_for(self._wake_event.wait(), timeout=delay)
+                    # Gestoppt oder Intervall verkürzt: Rasterpunkt neu bestimmen
+                    self._wake_event.clear()
+                    deadline = min(deadline, self.next_deadline(time.time()))
+                    continue
+                except asyncio.TimeoutError:
+                    pass
+
+            started = time.time()
+            self.last_started = started
+            interval = self.interval
+            try:
+                await tick()
+            except Exception as e:
+                logger.error(f"Fehler im Monitor-Durchlauf: {e}")
+            finished = time.time()
+
+            self.ticks += 1
+            self.timer.record("tick", finished - started)
+
+            # Der erste Durchlauf startet sofort und liegt daher nicht auf dem Raster
+            expected = started + interval if self.ticks == 1 else (math.floor(started / interval) + 1) * interval
+            if finished > expected:
+                skipped = math.floor((finished - expected) / interval) + 1
+                self.overruns += 1
+                self.skipped_ticks += skipped
+                logger.warning(
+                    f"Monitor-Durchlauf dauerte {finished - started:.2f}s "
+                    f"(Intervall {interval}s), {skipped} Durchläufe übersprungen."
+                )
+            deadline = self.next_deadline(finished)
+
+        self.running = False
+
+    def wake(self):
+        """Bestimmt den nächsten Rasterpunkt mit dem aktuellen Intervall neu."""
+        self._wake_event.set()
+
+    def stop(self):
+        """Beendet die Ausführung nach dem laufenden Durchlauf."""
+        self.running = False
+        self._wake_event.set()
+
+    def stats(self) -> Dict[str, Any]:
+        tick_stats = self.timer.stats().get("tick", {})
+        return {
+            "interval": self.interval,
+            "ticks": self.ticks,
+            "overruns": self.overruns,
+            "skipped_ticks": self.skipped_ticks,
+            "last_started": datetime.fromtimestamp(self.last_started).isoformat() if self.last_started else None,
+            "last_duration": tick_stats.get("last", 0.0),
+            "average_duration": tick_stats.get("average", 0.0),
+            "max_duration": tick_stats.get("max", 0.0)
+        }
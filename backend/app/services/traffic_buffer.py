@@ -0,0 +1,185 @@
+import logging
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Logger konfigurieren
+logger = logging.getLogger(__name__)
+
+# (Zeitstempel, rx-Bytes/s, tx-Bytes/s)
+RateSample = Tuple[float, float, float]
+
+class TrafficRingBuffer:
+    """
+    Ringpuffer für die Übertragungsraten aller Peers eines Interfaces.
+
+    Pro Durchlauf wird für jeden Peer die Differenz der Zähler gespeichert.
+    Alle Werte liegen in vorab angelegten `array`-Blöcken (Peer-Slot x Fenster),
+    ein Peer belegt also konstant `(2 * window + 4) * 8` Bytes. Die Kapazität wächst
+    blockweise bis `max_peers`; Slots entfernter Peers werden wiederverwendet.
+    """
+
+    def __init__(self, window: int = 240, max_peers: int = 20000, block_size: int = 1024):
+        """
+        Args:
+            window: Anzahl der gespeicherten Durchläufe (z.B. 240 x 15 s = 1 Stunde)
+            max_peers: Maximale Anzahl gleichzeitig erfasster Peers
+            block_size: Anzahl der Peer-Slots, um die der Puffer bei Bedarf wächst
+        """
+        if window < 2:
+            raise ValueError("Das Fenster muss mindestens zwei Durchläufe umfassen")
+        self.window = window
+        self.max_peers = max_peers
+        self.block_size = block_size
+
+        self._tick = 0
+        self._times = array('d', bytes(8 * window))
+        self._total_rx = array('Q', bytes(8 * window))
+        self._total_tx = array('Q', bytes(8 * window))
+
+        self._capacity = 0
+        self._rx = array('Q')
+        self._tx = array('Q')
+        self._last_rx = array('Q')
+        self._last_tx = array('Q')
+        self._since = array('Q')
+        self._seen = array('Q')
+
+        self._slots: Dict[str, int] = {}
+        self._free: List[int] = []
+        self._overflow_logged = False
+
+    @property
+    def memory_bytes(self) -> int:
+        """Belegter Speicher der Zahlenblöcke in Bytes."""
+        per_slot = 8 * (2 * self.window + 4)
+        return self._capacity * per_slot + 8 * 3 * self.window
+
+    def _grow(self) -> bool:
+        new_capacity = min(self._capacity + self.block_size, self.max_peers)
+        added = new_capacity - self._capacity
+        if added <= 0:
+            return False
+        self._rx.frombytes(bytes(8 * added * self.window))
+        self._tx.frombytes(bytes(8 * added * self.window))
+        for column in (self._last_rx, self._last_tx, self._since, self._seen):
+            column.frombytes(bytes(8 * added))
+        self._free.extend(range(new_capacity - 1, self._capacity - 1, -1))
+        self._capacity = new_capacity
+        return True
+
+    def _allocate(self, public_key: str) -> Optional[int]:
+        if not self._free and not self._grow():
+            if not self._overflow_logged:
+                logger.warning(f"Traffic-Puffer voll ({self.max_peers} Peers), weitere Peers werden nicht erfasst.")
+                self._overflow_logged = True
+            return None
+        slot = self._free.pop()
+        self._slots[public_key] = slot
+        return slot
+
+    def record(self, timestamp: float, peers: Iterable[Tuple[str, int, int]]):
+        """
+        Übernimmt die Zählerstände eines Durchlaufs.
+
+        Args:
+            timestamp: Zeitpunkt des Durchlaufs (Unix-Zeit)
+            peers: (öffentlicher Schlüssel, transfer_rx, transfer_tx) aller Peers
+        """
+        self._tick += 1
+        tick = self._tick
+        pos = tick % self.window
+        window = self.window
+        self._times[pos] = timestamp
+
+        rx_col, tx_col, last_rx, last_tx, seen = self._rx, self._tx, self._last_rx, self._last_tx, self._seen
+        total_rx = total_tx = 0
+        recorded = 0
+
+        for public_key, rx, tx in peers:
+            slot = self._slots.get(public_key)
+            if slot is None:
+                slot = self._allocate(public_key)
+                if slot is None:
+                    continue
+                # Erste Rate steht erst nach dem nächsten Durchlauf fest
+                self._since[slot] = tick + 1
+                delta_rx = delta_tx = 0
+            else:
+                # Nach einem Zähler-Reset beginnt der Zähler wieder bei 0
+                delta_rx = rx - last_rx[slot] if rx >= last_rx[slot] else rx
+                delta_tx = tx - last_tx[slot] if tx >= last_tx[slot] else tx
+
+            index = slot * window + pos
+            rx_col[index] = delta_rx
+            tx_col[index] = delta_tx
+            last_rx[slot] = rx
+            last_tx[slot] = tx
+            seen[slot] = tick
+            total_rx += delta_rx
+            total_tx += delta_tx
+            recorded += 1
+
+        self._total_rx[pos] = total_rx
+        self._total_tx[pos] = total_tx
+
+        # Peers, die in diesem Durchlauf fehlen, freigeben
+        if recorded < len(self._slots):
+            for public_key, slot in list(self._slots.items()):
+                if seen[slot] != tick:
+                    del self._slots[public_key]
+                    self._free.append(slot)
+
+    def _positions(self, first_tick: int, limit: Optional[int]) -> List[int]:
+        """Ticks im Fenster, für die eine Rate berechnet werden kann (ältester zuerst)."""
+        first = max(first_tick, self._tick - self.window + 2, 2)
+        if limit is not None:
+            first = max(first, self._tick - limit + 1)
+        return list(range(first, self._tick + 1))
+
+    def _series(self, ticks: List[int], rx_values, tx_values, offset: int) -> List[RateSample]:
+        samples = []
+        window = self.window
+        for tick in ticks:
+            pos = tick % window
+            elapsed = self._times[pos] - self._times[(tick - 1) % window]
+            if elapsed <= 0:
+                continue
+            samples.append((
+                self._times[pos],
+                rx_values[offset + pos] / elapsed,
+                tx_values[offset + pos] / elapsed
+            ))
+        return samples
+
+    def peer_series(self, public_key: str, limit: Optional[int] = None) -> Optional[List[RateSample]]:
+        """
+        Liefert die Ratenreihe eines Peers.
+
+        Returns:
+            Liste von (Zeitstempel, rx-Bytes/s, tx-Bytes/s) oder None für unbekannte Peers
+        """
+        slot = self._slots.get(public_key)
+        if slot is None:
+            return None
+        ticks = self._positions(self._since[slot], limit)
+        return self._series(ticks, self._rx, self._tx, slot * self.window)
+
+    def interface_series(self, limit: Optional[int] = None) -> List[RateSample]:
+        """Liefert die Ratenreihe des gesamten Interfaces."""
+        return self._series(self._positions(0, limit), self._total_rx, self._total_tx, 0)
+
+    def current_rates(self) -> Dict[str, Tuple[float, float]]:
+        """Liefert die Raten aller Peers aus dem letzten Durchlauf."""
+        tick = self._tick
+        if tick < 2:
+            return {}
+        pos = tick % self.window
+        elapsed = self._times[pos] - self._times[(tick - 1) % self.window]
+        if elapsed <= 0:
+            return {}
+        window = self.window
+        return {
+            public_key: (self._rx[slot * window + pos] / elapsed, self._tx[slot * window + pos] / elapsed)
+            for public_key, slot in self._slots.items()
+            if self._since[slot] <= tick
+        }
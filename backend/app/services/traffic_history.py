@@ -0,0 +1,275 @@
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from array import array
+from dataclasses import dataclass
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, List, Optional, Tuple
+
+from app.services.history_segments import (
+    RECORD,
+    HistorySample,
+    pack_sample,
+    read_log,
+    read_sealed,
+    read_sealed_peer,
+    remove_segment,
+    unpack_samples,
+    write_sealed
+)
+
+# Logger konfigurieren
+logger = logging.getLogger(__name__)
+
+# (öffentlicher Schlüssel, transfer_rx, transfer_tx, latest_handshake, endpoint)
+PeerValues = Tuple[str, int, int, int, Optional[str]]
+
+@dataclass(frozen=True)
+class HistoryLevel:
+    """Auflösungsstufe des Verlaufsspeichers."""
+    name: str
+    resolution: int
+    segment_seconds: int
+    retention_seconds: int
+
+class TrafficHistoryStore:
+    """
+    Dauerhafter, segmentbasierter Verlaufsspeicher für Peer-Messpunkte im lokalen Dateisystem.
+
+    - Neue Messpunkte werden nur bei Änderungen an das offene Stundensegment angehängt
+    - Abgeschlossene Segmente werden nach (Peer, Zeit) sortiert und mit Index versiegelt,
+      sodass Abfragen für einen Peer nur dessen Datensätze lesen
+    - Nach Ablauf der Aufbewahrungszeit werden Segmente in die nächstgröbere Stufe
+      (5 Minuten, 1 Stunde) verdichtet und danach gelöscht
+    """
+
+    def __init__(
+        self,
+        root_dir: str = "app/data/wireguard_history",
+        raw_retention: int = 2 * 86400,
+        medium_retention: int = 30 * 86400,
+        coarse_retention: int = 365 * 86400
+    ):
+        """
+        Args:
+            root_dir: Verzeichnis für die Segmente
+            raw_retention: Aufbewahrung der Messpunkte in voller Auflösung (Sekunden)
+            medium_retention: Aufbewahrung der 5-Minuten-Stufe (Sekunden)
+            coarse_retention: Aufbewahrung der 1-Stunden-Stufe (Sekunden)
+        """
+        self.root_dir = Path(root_dir)
+        self.levels = [
+            HistoryLevel("raw", 0, 3600, raw_retention),
+            HistoryLevel("5m", 300, 86400, medium_retention),
+            HistoryLevel("1h", 3600, 30 * 86400, coarse_retention)
+        ]
+        for level in self.levels:
+            os.makedirs(self.root_dir / level.name, exist_ok=True)
+
+        self.running = False
+        self._lock = threading.Lock()
+        self._peers_file = self.root_dir / "peers.json"
+        self._peer_ids: Dict[str, int] = self._load_peer_ids()
+        self._last_values: Dict[str, Tuple[int, int, int, Optional[str]]] = {}
+
+        # Offenes Rohsegment und Positionen der Datensätze je Peer
+        self._open_start: Optional[int] = None
+        self._open_file: Optional[BinaryIO] = None
+        self._open_index: Dict[int, array] = {}
+        self._open_count = 0
+
+    def _load_peer_ids(self) -> Dict[str, int]:
+        try:
+            with open(self._peers_file, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
+
+    def _save_peer_ids(self):
+        temp_file = self._peers_file.with_suffix('.tmp')
+        with open(temp_file, 'w') as f:
+            json.dump(self._peer_ids, f)
+        os.replace(temp_file, self._peers_file)
+
+    def _segment_path(self, level: HistoryLevel, start: int) -> Path:
+        return self.root_dir / level.name / str(start)
+
+    def _segments(self, level: HistoryLevel, suffix: str) -> List[int]:
+        return sorted(int(path.stem) for path in (self.root_dir / level.name).glob(f"*{suffix}"))
+
+    def _open_segment(self, start: int):
+        if self._open_file is not None:
+            self._open_file.close()
+        path = self._segment_path(self.levels[0], start).with_suffix('.log')
+        self._open_index = {}
+        self._open_count = 0
+        if path.exists():
+            for sample in read_log(path):
+                self._index_record(sample.peer_id)
+            # Unvollständige Datensätze nach einem Absturz abschneiden
+            os.truncate(path, self._open_count * RECORD.size)
+        self._open_file = open(path, 'a+b')
+        self._open_start = start
+
+    def _index_record(self, peer_id: int):
+        self._open_index.setdefault(peer_id, array('I')).append(self._open_count)
+        self._open_count += 1
+
+    def append(self, timestamp: float, peers: Iterable[PeerValues]):
+        """
+        Hängt die Messpunkte eines Durchlaufs an. Peers, deren Werte sich seit dem
+        letzten gespeicherten Messpunkt nicht geändert haben, werden übersprungen.
+        Die letzten Werte werden nur für die Peers dieses Durchlaufs behalten,
+        entfernte Peers belegen also keinen Speicher mehr.
+        """
+        with self._lock:
+            start = int(timestamp) // self.levels[0].segment_seconds * self.levels[0].segment_seconds
+            if start != self._open_start:
+                self._open_segment(start)
+
+            records = []
+            new_peers = False
+            last_values = self._last_values
+            current: Dict[str, Tuple[int, int, int, Optional[str]]] = {}
+            for public_key, rx, tx, handshake, endpoint in peers:
+                values = current[public_key] = (rx, tx, handshake, endpoint)
+                if last_values.get(public_key) == values:
+                    continue
+
+                peer_id = self._peer_ids.get(public_key)
+                if peer_id is None:
+                    peer_id = self._peer_ids[public_key] = len(self._peer_ids)
+                    new_peers = True
+                records.append(pack_sample(HistorySample(peer_id, timestamp, rx, tx, handshake, endpoint)))
+                self._index_record(peer_id)
+            self._last_values = current
+
+            if new_peers:
+                self._save_peer_ids()
+            if records:
+                self._open_file.write(b"".join(records))
+                self._open_file.flush()
+
+    def query(self, public_key: str, start: float, end: float) -> List[HistorySample]:
+        """
+        Liefert die Messpunkte eines Peers im Zeitraum [start, end], ältester zuerst.
+        Für jeden Zeitabschnitt wird die feinste noch vorhandene Auflösung verwendet.
+        """
+        peer_id = self._peer_ids.get(public_key)
+        if peer_id is None:
+            return []
+
+        samples: List[HistorySample] = []
+        covered_from = float("inf")
+        for level in self.levels:
+            level_start = covered_from
+            for suffix in ('.seg', '.log'):
+                for segment_start in self._segments(level, suffix):
+                    if segment_start + level.segment_seconds < start or segment_start > end:
+                        continue
+                    level_start = min(level_start, segment_start)
+                    for sample in self._read_peer(level, segment_start, suffix, peer_id):
+                        if start <= sample.timestamp <= end and sample.timestamp < covered_from:
+                            samples.append(sample)
+            covered_from = level_start
+
+        samples.sort(key=lambda sample: sample.timestamp)
+        return samples
+
+    def _read_peer(self, level: HistoryLevel, segment_start: int, suffix: str, peer_id: int) -> List[HistorySample]:
+        path = self._segment_path(level, segment_start)
+        try:
+            if suffix == '.seg':
+                return read_sealed_peer(path, peer_id)
+            with self._lock:
+                if segment_start == self._open_start:
+                    return self._read_open(peer_id)
+            return [sample for sample in read_log(path.with_suffix('.log')) if sample.peer_id == peer_id]
+        except FileNotFoundError:
+            # Segment wurde zwischenzeitlich verdichtet
+            return []
+
+    def _read_open(self, peer_id: int) -> List[HistorySample]:
+        fd = self._open_file.fileno()
+        return [
+            unpack_samples(os.pread(fd, RECORD.size, position * RECORD.size))[0]
+            for position in self._open_index.get(peer_id, ())
+        ]
+
+    def compact(self, now: Optional[float] = None):
+        """Versiegelt abgeschlossene Rohsegmente, verdichtet abgelaufene Stufen und löscht alte Daten."""
+        now = now or time.time()
+        raw = self.levels[0]
+
+        for segment_start in self._segments(raw, '.log'):
+            if segment_start + raw.segment_seconds > now:
+                continue
+            path = self._segment_path(raw, segment_start)
+            with self._lock:
+                if segment_start == self._open_start:
+                    self._open_file.close()
+                    self._open_file, self._open_start = None, None
+                samples = read_log(path.with_suffix('.log'))
+                # Verspätete Messpunkte eines bereits versiegelten Segments zusammenführen
+                if path.with_suffix('.seg').exists():
+                    samples.extend(read_sealed(path))
+                write_sealed(path, samples)
+                path.with_suffix('.log').unlink()
+
+        for source, target in zip(self.levels, self.levels[1:]):
+            self._downsample(source, target, now - source.retention_seconds)
+
+        last = self.levels[-1]
+        for segment_start in self._segments(last, '.seg'):
+            if segment_start + last.segment_seconds <= now - last.retention_seconds:
+                remove_segment(self._segment_path(last, segment_start))
+
+    def _downsample(self, source: HistoryLevel, target: HistoryLevel, cutoff: float):
+        """Fasst abgelaufene Segmente einer Stufe zu vollständigen Segmenten der nächsten Stufe zusammen."""
+        groups: Dict[int, List[int]] = {}
+        for segment_start in self._segments(source, '.seg'):
+            if segment_start + source.segment_seconds <= cutoff:
+                groups.setdefault(segment_start // target.segment_seconds * target.segment_seconds, []).append(segment_start)
+
+        for target_start, source_starts in groups.items():
+            if target_start + target.segment_seconds > cutoff:
+                continue
+            target_path = self._segment_path(target, target_start)
+            buckets: Dict[Tuple[int, int], HistorySample] = {}
+            if target_path.with_suffix('.seg').exists():
+                for sample in read_sealed(target_path):
+                    buckets[(sample.peer_id, int(sample.timestamp) // target.resolution)] = sample
+            for segment_start in source_starts:
+                for sample in read_sealed(self._segment_path(source, segment_start)):
+                    # Zähler sind kumulativ: der letzte Messpunkt je Intervall genügt
+                    key = (sample.peer_id, int(sample.timestamp) // target.resolution)
+                    if key not in buckets or buckets[key].timestamp < sample.timestamp:
+                        buckets[key] = sample
+            write_sealed(target_path, buckets.values())
+            for segment_start in source_starts:
+                remove_segment(self._segment_path(source, segment_start))
+            logger.info(f"{len(source_starts)} Verlaufssegmente in Stufe {target.name} verdichtet.")
+
+    async def start(self, interval: int = 300):
+        """Startet die periodische Verdichtung im Hintergrund."""
+        self.running = True
+        try:
+            while self.running:
+                try:
+                    await asyncio.to_thread(self.compact)
+                except Exception as e:
+                    logger.error(f"Fehler bei der Verdichtung des Verlaufsspeichers: {e}")
+                await asyncio.sleep(interval)
+        except asyncio.CancelledError:
+            self.running = False
+
+    def stop(self):
+        """Stoppt die Verdichtung und schließt das offene Segment."""
+        self.running = False
+        with self._lock:
+            if self._open_file is not None:
+                self._open_file.close()
+                self._open_file, self._open_start = None, None
@@ -0,0 +1,199 @@
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from typing import Dict, Iterable, List, Optional
+
+from app.wireguard.dump import DumpStreamParser, InterfaceDump, PeerDump, parse_dump
+from app.wireguard.netlink import WireGuardNetlink
+from app.wireguard.simulator import FleetSimulator
+
+# Logger konfigurieren
+logger = logging.getLogger(__name__)
+
+class CollectorError(Exception):
+    """Fehler beim Auslesen der Peer-Statistiken eines Interfaces."""
+
+class PeerCollector(ABC):
+    """
+    Schnittstelle für Quellen von WireGuard-Peer-Statistiken.
+    Ein Collector liefert pro Aufruf den vollständigen Zustand eines Interfaces.
+    """
+
+    name: str = "abstract"
+
+    @abstractmethod
+    async def collect(self, interface: str) -> InterfaceDump:
+        """
+        Liest den aktuellen Zustand eines Interfaces.
+
+        Raises:
+            CollectorError: Wenn das Interface nicht gelesen werden kann
+        """
+
+    def close(self):
+        """Gibt vom Collector gehaltene Ressourcen frei."""
+
+class WgCommandCollector(PeerCollector):
+    """
+    Collector auf Basis von `wg show <interface> dump` (ein Prozess pro Abfrage).
+    Die Ausgabe wird blockweise direkt aus der Pipe geparst.
+    """
+
+    name = "wg"
+
+    def __init__(self, wg_path: str = "wg", chunk_size: int = 64 * 1024):
+        self.wg_path = wg_path
+        self.chunk_size = chunk_size
+
+    async def collect(self, interface: str) -> InterfaceDump:
+        try:
+            process = await asyncio.create_subprocess_exec(
+                self.wg_path, "show", interface, "dump",
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE
+            )
+        except OSError as e:
+            raise CollectorError(f"'{self.wg_path}' konnte nicht gestartet werden: {e}") from e
+
+        parser = DumpStreamParser(interface)
+        stderr_task = asyncio.create_task(process.stderr.read())
+        try:
+            while True:
+                chunk = await process.stdout.read(self.chunk_size)
+                if not chunk:
+                    break
+                parser.feed(chunk)
+            stderr = await stderr_task
+            await process.wait()
+        finally:
+            if process.returncode is None:
+                process.kill()
+                stderr_task.cancel()
+
+        if process.returncode != 0:
+            raise CollectorError(f"Fehler bei der Ausführung von 'wg show': {stderr.decode().strip()}")
+
+        return parser.finish()
+
+class NetlinkCollector(PeerCollector):
+    """
+    Collector, der die Peers direkt über die WireGuard-Generic-Netlink-Familie
+    aus dem Kernel liest. Benötigt CAP_NET_ADMIN, startet aber keinen Prozess.
+    """
+
+    name = "netlink"
+
+    def __init__(self, client: Optional[WireGuardNetlink] = None):
+        self.client = client or WireGuardNetlink()
+
+    async def collect(self, interface: str) -> InterfaceDump:
+        try:
+            # Der Socket blockiert, daher außerhalb der Event-Loop ausführen
+            return await asyncio.to_thread(self.client.get_device, interface)
+        except OSError as e:
+            raise CollectorError(f"Netlink-Abfrage für {interface} fehlgeschlagen: {e}") from e
+
+    def close(self):
+        self.client.close()
+
+class FakeCollector(PeerCollector):
+    """
+    In-Process-Collector mit vorgegebenen Daten.
+    Dient zum Testen des Monitors ohne WireGuard-Kernelmodul.
+    """
+
+    name = "fake"
+
+    def __init__(self, dumps: Optional[Dict[str, InterfaceDump]] = None):
+        self.dumps: Dict[str, InterfaceDump] = dict(dumps or {})
+
+    @classmethod
+    def from_dump_output(cls, interface: str, dump_output: str) -> "FakeCollector":
+        """Erstellt einen Collector aus der Textausgabe von `wg show <interface> dump`."""
+        return cls({interface: parse_dump(interface, dump_output)})
+
+    def set_peers(self, interface: str, peers: Iterable[PeerDump], public_key: Optional[str] = None, listen_port: Optional[str] = None):
+        """Ersetzt die Peers, die für ein Interface geliefert werden."""
+        self.dumps[interface] = InterfaceDump(interface, public_key, listen_port, list(peers))
+
+    async def collect(self, interface: str) -> InterfaceDump:
+        dump = self.dumps.get(interface)
+        if dump is None:
+            raise CollectorError(f"Keine Daten für Interface {interface} hinterlegt")
+        return InterfaceDump(dump.interface, dump.public_key, dump.listen_port, list(dump.peers))
+
+class SimulatorCollector(PeerCollector):
+    """
+    In-Process-Collector mit simulierten Peers (siehe `FleetSimulator`).
+    Ermöglicht Lasttests mit beliebig vielen Peers ohne WireGuard.
+    """
+
+    name = "sim"
+
+    def __init__(self, peers: int = 1000, seed: int = 0):
+        self.peers = peers
+        self.seed = seed
+        self.simulators: Dict[str, FleetSimulator] = {}
+
+    async def collect(self, interface: str) -> InterfaceDump:
+        simulator = self.simulators.get(interface)
+        if simulator is None:
+            simulator = self.simulators[interface] = FleetSimulator(interface, self.peers, self.seed)
+        return simulator.interface_dump()
+
+class FallbackCollector(PeerCollector):
+    """
+    Probiert mehrere Collectors der Reihe nach und bleibt beim ersten,
+    der erfolgreich Daten liefert (z.B. Netlink mit `wg` als Rückfall).
+    """
+
+    name = "auto"
+
+    def __init__(self, collectors: List[PeerCollector]):
+        if not collectors:
+            raise ValueError("Mindestens ein Collector erforderlich")
+        self.collectors = collectors
+        self.active: Optional[PeerCollector] = None
+
+    async def collect(self, interface: str) -> InterfaceDump:
+        if self.active is not None:
+            return await self.active.collect(interface)
+
+        errors = []
+        for collector in self.collectors:
+            try:
+                dump = await collector.collect(interface)
+            except CollectorError as e:
+                errors.append(f"{collector.name}: {e}")
+                continue
+            logger.info(f"Verwende Collector '{collector.name}' für WireGuard-Statistiken.")
+            self.active = collector
+            return dump
+
+        raise CollectorError("; ".join(errors))
+
+    def close(self):
+        for collector in self.collectors:
+            collector.close()
+
+def create_collector(name: str = "auto", wg_path: str = "wg", sim_peers: int = 1000, sim_seed: int = 0) -> PeerCollector:
+    """
+    Erstellt einen Collector anhand seines Namens.
+
+    Args:
+        name: "netlink", "wg", "fake", "sim" oder "auto" (Netlink mit `wg` als Rückfall)
+        wg_path: Pfad zum `wg`-Programm
+        sim_peers: Anzahl der simulierten Peers pro Interface (nur "sim")
+        sim_seed: Seed der Simulation (nur "sim")
+    """
+    if name == "netlink":
+        return NetlinkCollector()
+    if name == "wg":
+        return WgCommandCollector(wg_path)
+    if name == "fake":
+        return FakeCollector()
+    if name == "sim":
+        return SimulatorCollector(sim_peers, sim_seed)
+    if name == "auto":
+        return FallbackCollector([NetlinkCollector(), WgCommandCollector(wg_path)])
+    raise ValueError(f"Unbekannter Collector: {name}")
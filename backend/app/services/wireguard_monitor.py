@@ -1,16 +1,38 @@
 import asyncio
-import json
 import logging
 import os
-import subprocess
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any
+
+from app.services.client_sync import ClientStatsSync
+from app.services.monitor_phases import MonitorPhases
+from app.services.peer_accounting import PeerAccounting
+from app.services.peer_records import PeerRecord, build_status, status_to_dict
+from app.services.peer_rankings import PeerRankings
+from app.services.peer_roles import RoleClassifier
+from app.services.peer_sessions import PeerSessionLog
+from app.services.peer_events import EventHandler, PeerEvent, PeerEventBus, PeerEventType, PeerIndex, diff_peers
+from app.services.status_file import StatusFile
+from app.services.status_snapshot import SnapshotStore, StatusSnapshot
+from app.services.tick_scheduler import AdaptiveInterval, PhaseTimer, TickScheduler
+from app.services.traffic_buffer import TrafficRingBuffer
+from app.services.traffic_history import TrafficHistoryStore
+from app.services.wireguard_collectors import CollectorError, PeerCollector, create_collector
+from app.wireguard.dump import InterfaceDump, parse_dump
 
 # Logger konfigurieren
 logger = logging.getLogger(__name__)
 
+# Ereignisse, die das adaptive Intervall auf das Minimum setzen
+ACTIVITY_EVENTS = frozenset({
+    PeerEventType.PEER_ADDED,
+    PeerEventType.PEER_REMOVED,
+    PeerEventType.CAME_ONLINE,
+    PeerEventType.WENT_OFFLINE
+})
+
 class WireGuardMonitor:
     """
     Service zur Überwachung des WireGuard-Status.
@@ -28,7 +50,17 @@ class WireGuardMonitor:
         status_dir: str = "app/data/wireguard_status",
         check_interval: int = 15,
         admin_subnet: str = "10.10.10.0/24",
-        user_subnet: str = "10.10.11.0/24"
+        user_subnet: str = "10.10.11.0/24",
+        collector: Optional[PeerCollector] = None,
+        traffic_window: int = 240,
+        max_peers: int = 20000,
+        history: Optional[TrafficHistoryStore] = None,
+        adaptive: Optional[AdaptiveInterval] = None,
+        activity_threshold: float = 1024.0,
+        client_sync: Optional[ClientStatsSync] = None,
+        accounting: Optional[PeerAccounting] = None,
+        sessions: Optional[PeerSessionLog] = None,
+        roles: Optional[Dict[str, List[str]]] = None
     ):
         """
         Initialisiert den WireGuard-Monitor.
@@ -37,22 +69,66 @@ class WireGuardMonitor:
             interface: Name des WireGuard-Interfaces (Standard: wg0)
             status_dir: Verzeichnis für die Speicherung der Statusdaten
             check_interval: Intervall für die Statusabfrage in Sekunden
-            admin_subnet: Subnetz für Administratoren
-            user_subnet: Subnetz für normale Benutzer
+            admin_subnet: Subnetz für Administratoren (nur ohne `roles`)
+            user_subnet: Subnetz für normale Benutzer (nur ohne `roles`)
+            collector: Quelle der Peer-Statistiken (Standard: Netlink mit `wg` als Rückfall)
+            traffic_window: Anzahl der Durchläufe im Ratenpuffer
+            max_peers: Maximale Anzahl der Peers im Ratenpuffer
+            history: Optionaler dauerhafter Verlaufsspeicher für Peer-Messpunkte
+            adaptive: Optionale Anpassung des Intervalls an die Aktivität (ohne Angabe fest)
+            activity_threshold: Gesamtrate in Bytes/s, ab der das Interface als aktiv gilt
+            client_sync: Optionale Übernahme der Peer-Statistiken in die Tabelle `clients`
+            accounting: Optionale monotone Gesamtsummen pro Peer (robust gegen Zähler-Resets)
+            sessions: Optionale Erfassung der Verbindungssitzungen der Peers
+            roles: Rolle -> IPv4-/IPv6-Präfixe für den Peer-Typ (Standard: admin/user aus den Subnetzen)
         """
         self.interface = interface
         self.status_dir = Path(status_dir)
         self.check_interval = check_interval
         self.admin_subnet = admin_subnet
         self.user_subnet = user_subnet
+        self.roles = RoleClassifier(roles or {"admin": [admin_subnet], "user": [user_subnet]})
+        self.collector = collector or create_collector("auto")
         self.running = False
         self.last_status: Dict[str, Any] = {}
+        self.snapshots = SnapshotStore()
+        self.events = PeerEventBus()
+        self._peer_index: PeerIndex = {}
+        self.traffic = TrafficRingBuffer(window=traffic_window, max_peers=max_peers)
+        self.rankings = PeerRankings()
+        self.history = history
+        
+        # Zustand des letzten Durchlaufs für die Übersicht über alle Interfaces
+        self.last_error: Optional[str] = None
+        # Zeitpunkt des letzten erfolgreichen Durchlaufs, auch wenn sich nichts geändert hat
+        # (der Snapshot behält dann seinen Zeitstempel, damit das ETag gültig bleibt)
+        self.checked_at: Optional[float] = None
+        self.online_count = 0
+        self.collector_errors = 0
+        
+        # Ausführung im festen Raster und Dauer der einzelnen Phasen
+        self.scheduler = TickScheduler(check_interval)
+        self.timer = PhaseTimer()
+        
+        # Adaptives Intervall: schneller bei Aktivität oder Live-Verbindungen, langsamer im Leerlauf
+        self.adaptive = adaptive
+        self.activity_threshold = activity_threshold
+        self.next_interval: float = adaptive.current if adaptive else check_interval
+        self._watchers: List[Callable[[], int]] = []
+        
+        self.client_sync = client_sync
+        self.accounting = accounting
+        self.sessions = sessions
+        
+        # Sitzungen, Puffer, Gesamtsummen, Verlauf und Datenbankabgleich eines Durchlaufs
+        self.phases = MonitorPhases(
+            interface, self.timer, self.traffic, self.rankings,
+            history=history, accounting=accounting, sessions=sessions, client_sync=client_sync
+        )
         
         # Stelle sicher, dass das Statusverzeichnis existiert
         os.makedirs(self.status_dir, exist_ok=True)
-        
-        # Pfad zur Statusdatei
-        self.status_file = self.status_dir / f"{interface}_status.json"
+        self.status_file = StatusFile(self.status_dir, interface)
     
     async def start(self):
         """Startet den Monitoring-Service."""
@@ -64,51 +140,108 @@ class WireGuardMonitor:
         logger.info(f"WireGuard-Monitor für Interface {self.interface} gestartet.")
         
         try:
-            while self.running:
-                try:
-                    await self._check_status()
-                except Exception as e:
-                    logger.error(f"Fehler bei der Statusabfrage: {e}")
-                
-                await asyncio.sleep(self.check_interval)
+            await self.scheduler.run(self._tick)
         except asyncio.CancelledError:
             logger.info("WireGuard-Monitor wurde beendet.")
-            self.running = False
+        self.running = False
     
     def stop(self):
         """Stoppt den Monitoring-Service."""
         self.running = False
+        self.scheduler.stop()
+        self.collector.close()
+        self.phases.stop()
         logger.info("WireGuard-Monitor wird beendet.")
     
+    async def _tick(self):
+        """Ein Durchlauf im eigenen Scheduler (ohne Monitor-Gruppe)."""
+        await self._check_status()
+        self.scheduler.interval = self.next_interval
+    
+    def register_watcher(self, count: Callable[[], int]):
+        """
+        Registriert eine Quelle für die Anzahl der Live-Verbindungen (z.B. SSE).
+        Solange Verbindungen bestehen, wird mit dem minimalen Intervall abgefragt.
+        """
+        self._watchers.append(count)
+    
+    def watcher_count(self) -> int:
+        return sum(count() for count in self._watchers)
+    
+    def wake(self):
+        """Wechselt sofort auf das minimale Intervall (z.B. bei einer neuen Live-Verbindung)."""
+        if self.adaptive is None:
+            return
+        self.next_interval = self.adaptive.reset()
+        if self.next_interval < self.scheduler.interval:
+            self.scheduler.interval = self.next_interval
+            self.scheduler.wake()
+    
+    def _update_interval(self, events: List[PeerEvent]):
+        """
+        Bestimmt das nächste Abfrageintervall anhand der Aktivität des letzten Durchlaufs.
+        Neue Handshakes und Endpunktwechsel zählen nicht: Bei vielen Peers gibt es sie
+        in fast jedem Durchlauf, das Intervall bliebe sonst dauerhaft beim Minimum.
+        """
+        if self.adaptive is None:
+            return
+        active = any(event.type in ACTIVITY_EVENTS for event in events) or self.watcher_count() > 0
+        if not active:
+            rates = self.traffic.interface_series(limit=1)
+            active = bool(rates) and rates[-1][1] + rates[-1][2] >= self.activity_threshold
+        self.next_interval = self.adaptive.update(active)
+    
     async def _check_status(self):
-        """Führt eine Statusabfrage durch und aktualisiert die Statusdaten."""
+        """
+        Führt eine Statusabfrage durch und aktualisiert die Statusdaten.
+        Die Dauer der Phasen (collect, parse, diff, persist, sync) wird in `self.timer` erfasst.
+        """
         try:
-            # Führe 'wg show' aus, um den aktuellen Status zu erhalten
-            process = await asyncio.create_subprocess_exec(
-                "wg", "show", self.interface, "dump",
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            stdout, stderr = await process.communicate()
-            
-            if process.returncode != 0:
-                error_msg = stderr.decode().strip()
-                logger.error(f"Fehler bei der Ausführung von 'wg show': {error_msg}")
+            # Lese den aktuellen Zustand über den konfigurierten Collector
+            try:
+                with self.timer.phase("collect"):
+                    dump = await self.collector.collect(self.interface)
+            except CollectorError as e:
+                logger.error(f"Fehler beim Auslesen der Peer-Statistiken für {self.interface}: {e}")
+                self.last_error = str(e)
+                self.collector_errors += 1
                 return
             
-            # Verarbeite die Ausgabe
-            status_data = self._parse_wg_dump(stdout.decode())
+            # Verarbeite die Rohdaten und veröffentliche den neuen Stand für die API
+            # (eine Uhrzeit für den gesamten Durchlauf)
+            now = time.time()
+            # Unveränderte Daten werden weder neu serialisiert noch gespeichert (ETag bleibt gültig)
+            with self.timer.phase("parse"):
+                status_data = self._build_status(dump, now)
+                self.online_count = sum(1 for peer in status_data["peers"] if peer.online)
+                self.last_error = None
+                self.checked_at = now
+                changed = not self.snapshots.is_current(status_data)
+                if changed:
+                    self.snapshots.publish(status_data)
             
-            # Speichere die Statusdaten
-            await self._save_status(status_data)
+            # Prüfe auf Änderungen und benachrichtige die Abonnenten
+            with self.timer.phase("diff"):
+                events = self._diff_status(status_data)
+                self.phases.record_sessions(now, events)
+                if events or not self.last_status:
+                    logger.info(f"WireGuard-Status für {self.interface} hat sich geändert.")
+                    self.last_status = status_data
+                await self.events.publish(events)
+            
+            with self.timer.phase("persist"):
+                await self.phases.persist(now, status_data["peers"])
+                
+                # Speichere die bereits serialisierten Statusdaten
+                if changed:
+                    await self.status_file.save(self.snapshots.current.body)
             
-            # Prüfe auf Änderungen
-            if self._has_status_changed(status_data):
-                logger.info(f"WireGuard-Status für {self.interface} hat sich geändert.")
-                self.last_status = status_data
+            self.phases.start_client_sync(status_data["peers"])
+            self._update_interval(events)
         
         except Exception as e:
-            logger.error(f"Fehler bei der Statusabfrage: {e}")
+            logger.error(f"Fehler bei der Statusabfrage für {self.interface}: {e}")
+            self.last_error = str(e)
     
     def _parse_wg_dump(self, dump_output: str) -> Dict[str, Any]:
         """
@@ -121,114 +254,61 @@ class WireGuardMonitor:
         Returns:
             Dict mit den Statusdaten
         """
-        lines = dump_output.strip().split('\n')
-        status = {
-            "timestamp": datetime.now().isoformat(),
-            "interface": self.interface,
-            "peers": []
-        }
-        
-        # Erste Zeile enthält Interface-Informationen
-        if lines:
-            interface_parts = lines[0].split('\t')
-            if len(interface_parts) >= 3:
-                status["public_key"] = interface_parts[0]
-                status["listen_port"] = interface_parts[2]
-        
-        # Restliche Zeilen enthalten Peer-Informationen
-        for i in range(1, len(lines)):
-            peer_parts = lines[i].split('\t')
-            if len(peer_parts) >= 8:
-                peer = {
-                    "public_key": peer_parts[0],
-                    "endpoint": peer_parts[2] if peer_parts[2] else None,
-                    "allowed_ips": peer_parts[3].split(',') if peer_parts[3] else [],
-                    "latest_handshake": int(peer_parts[4]) if peer_parts[4] else 0,
-                    "transfer_rx": int(peer_parts[5]) if peer_parts[5] else 0,
-                    "transfer_tx": int(peer_parts[6]) if peer_parts[6] else 0,
-                    "persistent_keepalive": peer_parts[7] if peer_parts[7] else None
-                }
-                
-                # Berechne zusätzliche Informationen
-                peer["online"] = (time.time() - peer["latest_handshake"]) < 180 if peer["latest_handshake"] > 0 else False
-                peer["last_activity"] = datetime.fromtimestamp(peer["latest_handshake"]).isoformat() if peer["latest_handshake"] > 0 else None
-                
-                # Bestimme den Benutzertyp basierend auf dem Subnetz
-                peer["type"] = self._determine_peer_type(peer["allowed_ips"])
-                
-                status["peers"].append(peer)
-        
-        return status
+        return self._build_status(parse_dump(self.interface, dump_output))
     
-    def _determine_peer_type(self, allowed_ips: List[str]) -> str:
+    def _build_status(self, dump: InterfaceDump, now: Optional[float] = None) -> Dict[str, Any]:
+        """Erzeugt die Statusdaten aus den Rohdaten eines Collectors (siehe `build_status`)."""
+        return build_status(self.interface, dump, self.roles, time.time() if now is None else now)
+    
+    def _diff_status(self, new_status: Dict[str, Any]) -> List[PeerEvent]:
         """
-        Bestimmt den Typ des Peers basierend auf den erlaubten IP-Adressen.
+        Ermittelt die Peer-Ereignisse gegenüber dem letzten Durchlauf
+        und aktualisiert den Peer-Index.
         
         Args:
-            allowed_ips: Liste der erlaubten IP-Adressen
+            new_status: Neuer Status
             
         Returns:
-            "admin" für Administratoren, "user" für normale Benutzer, "unknown" sonst
+            Liste der Ereignisse (leer, wenn sich nichts geändert hat)
         """
-        for ip in allowed_ips:
-            if ip.startswith(self.admin_subnet.split('/')[0].rsplit('.', 1)[0]):
-                return "admin"
-            elif ip.startswith(self.user_subnet.split('/')[0].rsplit('.', 1)[0]):
-                return "user"
-        return "unknown"
+        events, self._peer_index = diff_peers(self.interface, self._peer_index, new_status.get("peers", []))
+        return events
     
-    async def _save_status(self, status: Dict[str, Any]):
+    def summary(self) -> Dict[str, Any]:
         """
-        Speichert die Statusdaten im JSON-Format.
+        Kurzübersicht über den Zustand des Interfaces.
         
-        Args:
-            status: Statusdaten
+        Returns:
+            Dict mit Interface-Name, Fehlerstatus, Zeitpunkten und Peer-Anzahlen des letzten Durchlaufs
         """
-        try:
-            # Schreibe die Daten in eine temporäre Datei und benenne sie dann um,
-            # um atomare Schreibvorgänge zu gewährleisten
-            temp_file = self.status_file.with_suffix('.tmp')
-            
-            with open(temp_file, 'w') as f:
-                json.dump(status, f, indent=2)
-            
-            # Atomares Umbenennen
-            os.replace(temp_file, self.status_file)
-            
-        except Exception as e:
-            logger.error(f"Fehler beim Speichern der Statusdaten: {e}")
+        snapshot = self.snapshots.current
+        checked_at = self.checked_at
+        return {
+            "interface": self.interface,
+            "healthy": self.last_error is None and snapshot is not None,
+            "last_error": self.last_error,
+            "timestamp": datetime.fromtimestamp(checked_at).isoformat() if checked_at is not None else None,
+            "changed_at": snapshot.status.get("timestamp") if snapshot else None,
+            "peers": len(snapshot.status.get("peers", [])) if snapshot else 0,
+            "online_peers": self.online_count,
+            "next_interval": self.next_interval,
+            "watchers": self.watcher_count(),
+            "phases": self.timer.stats()
+        }
+    
+    def get_peer(self, public_key: str) -> Optional[PeerRecord]:
+        """Gibt den Stand eines Peers aus dem letzten Durchlauf zurück."""
+        return self._peer_index.get(public_key)
     
-    def _has_status_changed(self, new_status: Dict[str, Any]) -> bool:
+    def subscribe(self, handler: EventHandler):
         """
-        Prüft, ob sich der Status geändert hat.
+        Registriert einen Abonnenten für Peer-Ereignisse.
+        Der Abonnent erhält nach jedem Durchlauf mit Änderungen die Liste der Ereignisse.
         
-        Args:
-            new_status: Neuer Status
-            
         Returns:
-            True, wenn sich der Status geändert hat, sonst False
-        """
-        if not self.last_status:
-            return True
-        
-        # Vergleiche die Anzahl der Peers
-        if len(new_status.get("peers", [])) != len(self.last_status.get("peers", [])):
-            return True
-        
-        # Vergleiche den Online-Status und die letzte Aktivität der Peers
-        for new_peer in new_status.get("peers", []):
-            found = False
-            for old_peer in self.last_status.get("peers", []):
-                if new_peer["public_key"] == old_peer["public_key"]:
-                    found = True
-                    if new_peer["online"] != old_peer["online"] or new_peer["latest_handshake"] != old_peer["latest_handshake"]:
-                        return True
-                    break
-            
-            if not found:
-                return True
-        
-        return False
+            Funktion zum Abmelden des Abonnenten
+        """
+        return self.events.subscribe(handler)
     
     async def get_current_status(self) -> Dict[str, Any]:
         """
@@ -237,11 +317,23 @@ class WireGuardMonitor:
         Returns:
             Aktueller Status oder leeres Dict, wenn keine Daten verfügbar sind
         """
+        snapshot = await self.get_snapshot()
+        return status_to_dict(snapshot.status) if snapshot else {}
+    
+    async def get_snapshot(self) -> Optional[StatusSnapshot]:
+        """
+        Gibt den neuesten Status-Snapshot aus dem Speicher zurück.
+        Vor dem ersten Durchlauf wird einmalig die gespeicherte Statusdatei geladen.
+        
+        Returns:
+            Aktueller Snapshot oder None, wenn keine Daten verfügbar sind
+        """
+        if self.snapshots.current is not None:
+            return self.snapshots.current
+        
         try:
-            if self.status_file.exists():
-                with open(self.status_file, 'r') as f:
-                    return json.load(f)
-            return {}
+            status = self.status_file.read()
+            return self.snapshots.publish(status) if status is not None else None
         except Exception as e:
             logger.error(f"Fehler beim Lesen der Statusdaten: {e}")
-            return {} 
\ No newline at end of file
+            return None
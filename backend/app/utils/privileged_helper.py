@@ -0,0 +1,270 @@
+"""
+Langlebiger, privilegierter Hilfsprozess für WireGuard-Operationen.
+
+Statt für jeden Aufruf von `wg` einen neuen `sudo`-Prozess zu starten, läuft der Helper
+dauerhaft als root und nimmt Aufträge über einen lokalen Unix-Socket entgegen. Der
+Webprozess bleibt unprivilegiert.
+
+Protokoll (eine JSON-Zeile pro Nachricht, UTF-8):
+    Anfrage:  {"id": 1, "command": ["wg", "genkey"], "stdin": null}
+    Antwort:  {"id": 1, "returncode": 0, "stdout": "...", "stderr": ""}
+
+Anfragen dürfen ohne Warten auf die Antwort hintereinander gesendet werden (Pipelining);
+der Helper bearbeitet sie parallel, die Zuordnung erfolgt über `id`.
+
+`wg genkey` und `wg genpsk` (reine Zufallswerte) werden im Prozess erzeugt, ohne Programmstart.
+Alle übrigen Befehle, auch `wg pubkey`, müssen auf der Positivliste stehen und werden direkt
+(ohne sudo) ausgeführt; Kryptografie mit privaten Schlüsseln bleibt damit bei `wg`.
+
+Start (als root):
+    python -m app.utils.privileged_helper --socket /run/wg-dashboard/helper.sock --group wgdash
+"""
+import argparse
+import asyncio
+import base64
+import grp
+import itertools
+import json
+import logging
+import os
+import re
+import secrets
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# Logger konfigurieren
+logger = logging.getLogger(__name__)
+
+# Maximale Länge einer Nachricht (Konfigurationen mit vielen Peers passen bequem hinein)
+MAX_MESSAGE_SIZE = 16 * 1024 * 1024
+INTERFACE_PATTERN = re.compile(r"^[a-zA-Z0-9_=+.-]{1,15}$")
+
+class PrivilegedHelperError(Exception):
+    """Der Helper-Aufruf ist fehlgeschlagen; der Befehl wurde möglicherweise bereits ausgeführt."""
+
+class PrivilegedHelperUnavailableError(PrivilegedHelperError):
+    """Der Helper ist nicht erreichbar; der Befehl wurde nicht gesendet."""
+
+def _generate_private_key() -> str:
+    key = bytearray(secrets.token_bytes(32))
+    key[0] &= 248
+    key[31] = (key[31] & 127) | 64
+    return base64.b64encode(bytes(key)).decode()
+
+class PrivilegedHelperServer:
+    """Nimmt Aufträge über den Unix-Socket entgegen und führt sie privilegiert aus."""
+
+    def __init__(
+        self,
+        socket_path: str,
+        config_dir: str = "/etc/wireguard",
+        wg_path: str = "wg",
+        wg_quick_path: str = "wg-quick",
+        socket_group: Optional[str] = None,
+        max_parallel: int = 16
+    ):
+        """
+        Args:
+            socket_path: Pfad des Unix-Sockets
+            config_dir: Nur Konfigurationsdateien unterhalb dieses Verzeichnisses werden angenommen
+            wg_path: Pfad zum `wg`-Programm
+            wg_quick_path: Pfad zum `wg-quick`-Programm
+            socket_group: Gruppe, die den Socket nutzen darf (Rechte 0660); ohne Gruppe nur root
+            max_parallel: Maximal gleichzeitig bearbeitete Anfragen pro Verbindung
+        """
+        self.socket_path = Path(socket_path)
+        self.config_dir = Path(config_dir).resolve()
+        self.wg_path = wg_path
+        self.wg_quick_path = wg_quick_path
+        self.socket_group = socket_group
+        self.max_parallel = max_parallel
+        self.requests = 0
+
+    async def serve(self):
+        os.makedirs(self.socket_path.parent, exist_ok=True)
+        if self.socket_path.exists():
+            self.socket_path.unlink()
+        server = await asyncio.start_unix_server(self._handle_connection, path=str(self.socket_path), limit=MAX_MESSAGE_SIZE)
+        if self.socket_group:
+            os.chown(self.socket_path, -1, grp.getgrnam(self.socket_group).gr_gid)
+            os.chmod(self.socket_path, 0o660)
+        else:
+            os.chmod(self.socket_path, 0o600)
+        logger.info(f"Privilegierter Helper lauscht auf {self.socket_path}")
+        async with server:
+            await server.serve_forever()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        slots = asyncio.Semaphore(self.max_parallel)
+        tasks = set()
+
+        async def respond(request: Dict):
+            try:
+                returncode, stdout, stderr = await self.execute(request.get("command") or [], request.get("stdin"))
+            except Exception as e:
+                logger.error(f"Fehler bei der Ausführung von {request.get('command')}: {e}")
+                returncode, stdout, stderr = 1, "", str(e)
+            finally:
+                slots.release()
+            writer.write(json.dumps({
+                "id": request.get("id"), "returncode": returncode, "stdout": stdout, "stderr": stderr
+            }).encode() + b"\n")
+            await writer.drain()
+
+        try:
+            while line := await reader.readline():
+                try:
+                    request = json.loads(line)
+                except ValueError:
+                    logger.warning("Ungültige Anfrage an den Helper verworfen.")
+                    continue
+                await slots.acquire()
+                self.requests += 1
+                task = asyncio.create_task(respond(request))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError) as e:
+            logger.warning(f"Verbindung zum Helper abgebrochen: {e}")
+        finally:
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            writer.close()
+
+    async def execute(self, command: List[str], stdin: Optional[str] = None) -> Tuple[int, str, str]:
+        """Führt einen Befehl aus; Zufallsschlüssel ohne Programmstart."""
+        if command == ["wg", "genkey"]:
+            return 0, _generate_private_key() + "\n", ""
+        if command == ["wg", "genpsk"]:
+            return 0, base64.b64encode(secrets.token_bytes(32)).decode() + "\n", ""
+
+        argv = self._allowed_command(command)
+        if argv is None:
+            logger.warning(f"Nicht erlaubter Befehl abgelehnt: {command}")
+            return 126, "", f"Befehl nicht erlaubt: {' '.join(map(str, command))}\n"
+
+        process = await asyncio.create_subprocess_exec(
+            *argv,
+            stdin=asyncio.subprocess.PIPE if stdin is not None else asyncio.subprocess.DEVNULL,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        stdout, stderr = await process.communicate(stdin.encode() if stdin is not None else None)
+        return process.returncode, stdout.decode(), stderr.decode()
+
+    def _allowed_command(self, command: List[str]) -> Optional[List[str]]:
+        """Prüft den Befehl gegen die Positivliste und liefert die auszuführende Kommandozeile."""
+        if not all(isinstance(part, str) for part in command) or len(command) < 2:
+            return None
+        program, args = command[0], command[1:]
+        if program == "wg":
+            if args == ["pubkey"]:
+                return [self.wg_path, *args]
+            if args[0] == "show" and len(args) in (2, 3) and self._valid_interface(args[1], allow_all=True):
+                if len(args) == 2 or args[2] in ("dump", "peers", "endpoints", "transfer", "latest-handshakes"):
+                    return [self.wg_path, *args]
+            if args[0] == "syncconf" and len(args) == 3 and self._valid_interface(args[1]) and self._in_config_dir(args[2]):
+                return [self.wg_path, *args]
+        if program == "wg-quick" and len(args) == 2 and args[0] in ("up", "down") and self._valid_interface(args[1]):
+            return [self.wg_quick_path, *args]
+        return None
+
+    @staticmethod
+    def _valid_interface(name: str, allow_all: bool = False) -> bool:
+        return (allow_all and name in ("all", "interfaces")) or bool(INTERFACE_PATTERN.match(name))
+
+    def _in_config_dir(self, path: str) -> bool:
+        return Path(path).resolve().is_relative_to(self.config_dir)
+
+class PrivilegedHelperClient:
+    """
+    Client für den privilegierten Helper. Hält eine einzige Verbindung offen; beliebig viele
+    Aufrufe können gleichzeitig laufen und teilen sie sich (Pipelining).
+    """
+
+    def __init__(self, socket_path: str, timeout: float = 30.0):
+        self.socket_path = socket_path
+        self.timeout = timeout
+        self._ids = itertools.count(1)
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._reader_task: Optional[asyncio.Task] = None
+        self._connect_lock: Optional[asyncio.Lock] = None
+
+    async def _connect(self) -> asyncio.StreamWriter:
+        if self._connect_lock is None:
+            self._connect_lock = asyncio.Lock()
+        async with self._connect_lock:
+            if self._writer is None or self._writer.is_closing():
+                try:
+                    reader, self._writer = await asyncio.open_unix_connection(self.socket_path, limit=MAX_MESSAGE_SIZE)
+                except OSError as e:
+                    raise PrivilegedHelperUnavailableError(f"Helper unter {self.socket_path} nicht erreichbar: {e}") from e
+                self._reader_task = asyncio.create_task(self._read_responses(reader, self._writer))
+            return self._writer
+
+    async def _read_responses(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        error = PrivilegedHelperError("Verbindung zum Helper geschlossen")
+        try:
+            while line := await reader.readline():
+                response = json.loads(line)
+                future = self._pending.pop(response.get("id"), None)
+                if future is not None and not future.done():
+                    future.set_result((response["returncode"], response["stdout"], response["stderr"]))
+        except (OSError, ValueError, asyncio.LimitOverrunError) as e:
+            error = PrivilegedHelperError(f"Verbindung zum Helper unterbrochen: {e}")
+        finally:
+            # Offene Aufrufe nicht hängen lassen; beim nächsten Aufruf wird neu verbunden
+            writer.close()
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(error)
+            self._pending.clear()
+
+    async def run(self, command: List[str], stdin: Optional[bytes] = None) -> Tuple[int, str, str]:
+        """
+        Führt einen Befehl über den Helper aus (gleiche Rückgabe wie `_run_with_sudo`).
+
+        Raises:
+            PrivilegedHelperUnavailableError: Keine Verbindung; der Befehl wurde nicht gesendet
+            PrivilegedHelperError: Fehler oder Zeitüberschreitung nach dem Senden
+        """
+        writer = await self._connect()
+        request_id = next(self._ids)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        message = {"id": request_id, "command": command, "stdin": stdin.decode() if stdin is not None else None}
+        try:
+            writer.write(json.dumps(message).encode() + b"\n")
+            await writer.drain()
+            return await asyncio.wait_for(future, self.timeout)
+        except (OSError, asyncio.TimeoutError) as e:
+            raise PrivilegedHelperError(f"Helper-Aufruf {command} fehlgeschlagen: {e!r}") from e
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+        if self._reader_task is not None:
+            await asyncio.gather(self._reader_task, return_exceptions=True)
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Privilegierter Helper für das WireGuard-Dashboard")
+    parser.add_argument("--socket", default="/run/wg-dashboard/helper.sock")
+    parser.add_argument("--group", help="Gruppe des Webprozesses (Zugriff auf den Socket)")
+    parser.add_argument("--config-dir", default="/etc/wireguard")
+    parser.add_argument("--wg-path", default="wg")
+    parser.add_argument("--wg-quick-path", default="wg-quick")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    server = PrivilegedHelperServer(args.socket, args.config_dir, args.wg_path, args.wg_quick_path, args.group)
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
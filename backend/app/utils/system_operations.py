@@ -12,8 +12,13 @@ import asyncio
 import json
 import stat
 import pwd
+import re
 import grp
 
+from app.utils.privileged_helper import (
+    INTERFACE_PATTERN, PrivilegedHelperClient, PrivilegedHelperError, PrivilegedHelperUnavailableError
+)
+
 # Logger konfigurieren
 logger = logging.getLogger(__name__)
 
@@ -29,7 +34,8 @@ class SecureSystemOperations:
         backup_dir: str = "/var/backups/wireguard",
         wireguard_user: str = "root",
         wireguard_group: str = "root",
-        sudo_path: str = "/usr/bin/sudo"
+        sudo_path: str = "/usr/bin/sudo",
+        helper_socket: Optional[str] = None
     ):
         """
         Initialisiert die sicheren Systemoperationen.
@@ -40,12 +46,16 @@ class SecureSystemOperations:
             wireguard_user: Benutzer für WireGuard-Dateien
             wireguard_group: Gruppe für WireGuard-Dateien
             sudo_path: Pfad zum sudo-Befehl
+            helper_socket: Unix-Socket des privilegierten Helpers; ohne Angabe wird sudo verwendet
         """
         self.wireguard_dir = Path(wireguard_dir)
         self.backup_dir = Path(backup_dir)
         self.wireguard_user = wireguard_user
         self.wireguard_group = wireguard_group
         self.sudo_path = sudo_path
+        self.helper = PrivilegedHelperClient(helper_socket) if helper_socket else None
+        # Ein Lock pro Interface für Lesen, Ändern und Schreiben der Konfiguration
+        self._config_locks: Dict[str, asyncio.Lock] = {}
         
         # Stelle sicher, dass die Verzeichnisse existieren
         self._ensure_dirs_exist()
@@ -90,17 +100,32 @@ class SecureSystemOperations:
         
         self._set_ownership(file_path)
     
-    async def _run_with_sudo(self, command: List[str]) -> Tuple[int, str, str]:
-        """Führt einen Befehl mit sudo aus."""
+    async def _run_with_sudo(self, command: List[str], stdin: Optional[bytes] = None) -> Tuple[int, str, str]:
+        """
+        Führt einen Befehl privilegiert aus: über den Helper, falls konfiguriert,
+        sonst (oder wenn der Helper nicht erreichbar ist) mit sudo.
+        Nach dem Senden an den Helper wird nie mit sudo wiederholt, da Befehle wie
+        `wg-quick up` nicht mehrfach ausgeführt werden dürfen.
+        """
+        if self.helper is not None:
+            try:
+                return await self.helper.run(command, stdin)
+            except PrivilegedHelperUnavailableError as e:
+                logger.warning(f"{e}. Verwende sudo.")
+            except PrivilegedHelperError as e:
+                logger.error(str(e))
+                return 1, "", str(e)
+
         full_command = [self.sudo_path] + command
         
         process = await asyncio.create_subprocess_exec(
             *full_command,
+            stdin=asyncio.subprocess.PIPE if stdin is not None else None,
             stdout=asyncio.subprocess.PIPE,
             stderr=asyncio.subprocess.PIPE
         )
         
-        stdout, stderr = await process.communicate()
+        stdout, stderr = await process.communicate(stdin)
         return process.returncode, stdout.decode(), stderr.decode()
     
     # Schlüsselgenerierung
@@ -396,13 +421,14 @@ class SecureSystemOperations:
             logger.error(f"Fehler beim Neustart von WireGuard: {e}")
             return False
     
-    async def update_wireguard_config(self, interface: str, config_path: Path) -> bool:
+    async def update_wireguard_config(self, interface: str, config_path: Path, backup: bool = True) -> bool:
         """
         Aktualisiert die Konfiguration eines laufenden WireGuard-Interfaces.
         
         Args:
             interface: Name des WireGuard-Interfaces (z.B. wg0).
             config_path: Pfad zur neuen Konfigurationsdatei.
+            backup: Ob die aktuelle Konfiguration vorher gesichert wird (False, wenn der Aufrufer bereits gesichert hat).
             
         Returns:
             True, wenn das Update erfolgreich war, sonst False.
@@ -427,7 +453,8 @@ class SecureSystemOperations:
             logger.info(f"Aktualisiere Konfiguration für Interface {interface}...")
             
             # Sichere die aktuelle Konfiguration
-            await self.backup_config(interface)
+            if backup:
+                await self.backup_config(interface)
             
             # Aktualisiere die Konfiguration
             returncode, stdout, stderr = await self._run_with_sudo(
@@ -444,7 +471,62 @@ class SecureSystemOperations:
         except Exception as e:
             logger.error(f"Fehler beim Aktualisieren der WireGuard-Konfiguration: {e}")
             return False
-    
+
+    async def add_peers(self, interface: str, peers: List[Dict[str, Any]]) -> bool:
+        """
+        Hängt Peers an die Konfiguration eines Interfaces an und übernimmt sie mit einem
+        einzigen Update (unabhängig von der Anzahl der Peers).
+
+        Args:
+            interface: Name des WireGuard-Interfaces (z.B. wg0).
+            peers: Liste der Peers (public_key, allowed_ips); bereits konfigurierte Peers werden übersprungen.
+
+        Returns:
+            True, wenn das Update erfolgreich war, sonst False.
+        """
+        # Der Name wird Teil des Dateipfads; nur gültige Interface-Namen (ohne Pfadanteile)
+        if not INTERFACE_PATTERN.match(interface):
+            logger.error(f"Ungültiger Interface-Name: {interface!r}")
+            return False
+        # Gleichzeitige Importe dürfen ihre [Peer]-Abschnitte nicht gegenseitig überschreiben
+        lock = self._config_locks.setdefault(interface, asyncio.Lock())
+        async with lock:
+            return await self._add_peers(interface, peers)
+
+    async def _add_peers(self, interface: str, peers: List[Dict[str, Any]]) -> bool:
+        config_path = self.wireguard_dir / f"{interface}.conf"
+        try:
+            if not config_path.exists():
+                logger.error(f"Konfigurationsdatei {config_path} existiert nicht.")
+                return False
+
+            content = config_path.read_text()
+            configured = set(re.findall(r"^\s*PublicKey\s*=\s*(\S+)", content, re.MULTILINE))
+            sections = [
+                f"[Peer]\nPublicKey = {peer['public_key']}\nAllowedIPs = {', '.join(peer['allowed_ips'])}\n"
+                for peer in peers
+                if peer['public_key'] not in configured
+            ]
+            if not sections:
+                return True
+
+            # Sichere die bisherige Konfiguration, bevor sie ersetzt wird (nur hier, nicht erneut beim Update)
+            await self.backup_config(interface)
+
+            # Schreibe die neue Konfiguration atomar (temporäre Datei im selben Verzeichnis)
+            with tempfile.NamedTemporaryFile(mode='w', dir=self.wireguard_dir, delete=False) as temp_file:
+                temp_path = Path(temp_file.name)
+                temp_file.write(content.rstrip("\n") + "\n\n" + "\n".join(sections))
+            self._secure_file_permissions(temp_path, is_private=True)
+            os.replace(temp_path, config_path)
+
+            logger.info(f"{len(sections)} Peers zu {config_path} hinzugefügt.")
+            return await self.update_wireguard_config(interface, config_path, backup=False)
+
+        except Exception as e:
+            logger.error(f"Fehler beim Hinzufügen der Peers zu {interface}: {e}")
+            return False
+
     # Backup-Funktionalität
     
     async def backup_config(self, interface: str) -> Optional[Path]:
@@ -1,6 +1,8 @@
 from .config_parser import WireGuardConfig, WireGuardPeer, WireGuardConfigParser
 from .key_manager import KeyPair, WireGuardKeyManager
 from .config_validator import ValidationError, WireGuardConfigValidator
+from .dump import PeerDump, InterfaceDump, DumpStreamParser, parse_dump
+from .netlink import NetlinkError, WireGuardNetlink
 
 __all__ = [
     'WireGuardConfig',
@@ -9,5 +11,11 @@ __all__ = [
     'KeyPair',
     'WireGuardKeyManager',
     'ValidationError',
-    'WireGuardConfigValidator'
+    'WireGuardConfigValidator',
+    'PeerDump',
+    'InterfaceDump',
+    'DumpStreamParser',
+    'parse_dump',
+    'NetlinkError',
+    'WireGuardNetlink'
 ] 
\ No newline at end of file
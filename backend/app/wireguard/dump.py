@@ -0,0 +1,108 @@
+from dataclasses import dataclass, field
+from typing import List, NamedTuple, Optional, Tuple
+
+class PeerDump(NamedTuple):
+    """Rohdaten eines Peers, wie sie `wg show <interface> dump` bzw. der Kernel liefert."""
+    public_key: str
+    endpoint: Optional[str]
+    allowed_ips: Tuple[str, ...]
+    latest_handshake: int
+    transfer_rx: int
+    transfer_tx: int
+    persistent_keepalive: Optional[str]
+
+@dataclass
+class InterfaceDump:
+    """Rohdaten eines WireGuard-Interfaces inklusive aller Peers."""
+    interface: str
+    public_key: Optional[str] = None
+    listen_port: Optional[str] = None
+    peers: List[PeerDump] = field(default_factory=list)
+
+def _none_if_empty(value: str) -> Optional[str]:
+    return value if value and value != "(none)" else None
+
+def parse_peer_line(line: str) -> Optional[PeerDump]:
+    """
+    Parst eine Peer-Zeile aus `wg show <interface> dump`.
+
+    Format:
+    <public_key> <preshared_key> <endpoint> <allowed_ips> <latest_handshake> <transfer_rx> <transfer_tx> <persistent_keepalive>
+
+    Returns:
+        PeerDump oder None, wenn die Zeile unvollständig ist
+    """
+    parts = line.split('\t')
+    if len(parts) < 8:
+        return None
+
+    allowed_ips = _none_if_empty(parts[3])
+    return PeerDump(
+        public_key=parts[0],
+        endpoint=_none_if_empty(parts[2]),
+        allowed_ips=tuple(allowed_ips.split(',')) if allowed_ips else (),
+        latest_handshake=int(parts[4]) if parts[4] else 0,
+        transfer_rx=int(parts[5]) if parts[5] else 0,
+        transfer_tx=int(parts[6]) if parts[6] else 0,
+        persistent_keepalive=parts[7].strip() or None
+    )
+
+def parse_dump(interface: str, dump_output: str) -> InterfaceDump:
+    """
+    Parst die vollständige Ausgabe von `wg show <interface> dump`.
+
+    Die erste Zeile enthält die Interface-Informationen
+    (<private_key> <public_key> <listen_port> <fwmark>), alle weiteren Zeilen je einen Peer.
+    """
+    parser = DumpStreamParser(interface)
+    parser.feed_text(dump_output)
+    return parser.finish()
+
+class DumpStreamParser:
+    """
+    Inkrementeller Parser für `wg show <interface> dump`.
+    Verarbeitet die Ausgabe blockweise, sobald sie aus der Pipe eintrifft, sodass
+    nie die vollständige Ausgabe im Speicher gehalten werden muss.
+    """
+
+    def __init__(self, interface: str):
+        self.dump = InterfaceDump(interface=interface)
+        self._pending = b""
+        self._header = True
+
+    def feed(self, chunk: bytes):
+        """Verarbeitet einen Block; eine unvollständige letzte Zeile wird bis zum nächsten Block aufgehoben."""
+        data = self._pending + chunk if self._pending else chunk
+        end = data.rfind(b"\n")
+        if end < 0:
+            self._pending = data
+            return
+        self._pending = data[end + 1:]
+        self.feed_text(data[:end].decode())
+
+    def feed_text(self, text: str):
+        """Verarbeitet vollständige Zeilen."""
+        peers = self.dump.peers
+        for line in text.split('\n'):
+            if self._header:
+                self._parse_header(line)
+                continue
+            peer = parse_peer_line(line)
+            if peer is not None:
+                peers.append(peer)
+
+    def _parse_header(self, line: str):
+        if not line.strip():
+            return
+        self._header = False
+        parts = line.split('\t')
+        if len(parts) >= 3:
+            self.dump.public_key = parts[1]
+            self.dump.listen_port = parts[2]
+
+    def finish(self) -> InterfaceDump:
+        """Verarbeitet den Rest der Ausgabe und liefert das Ergebnis."""
+        if self._pending:
+            self.feed_text(self._pending.decode())
+            self._pending = b""
+        return self.dump
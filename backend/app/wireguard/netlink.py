@@ -0,0 +1,270 @@
+import base64
+import errno
+import os
+import socket
+import struct
+import threading
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .dump import InterfaceDump, PeerDump
+
+# Netlink-Konstanten (linux/netlink.h, linux/genetlink.h)
+NETLINK_GENERIC = 16
+NLM_F_REQUEST = 0x01
+NLM_F_MULTI = 0x02
+NLM_F_ACK = 0x04
+NLM_F_DUMP_INTR = 0x10
+NLM_F_DUMP = 0x300
+NLMSG_ERROR = 2
+NLMSG_DONE = 3
+NLA_F_NESTED = 0x8000
+NLA_F_NET_BYTEORDER = 0x4000
+NLA_TYPE_MASK = ~(NLA_F_NESTED | NLA_F_NET_BYTEORDER) & 0xFFFF
+
+GENL_ID_CTRL = 0x10
+CTRL_CMD_GETFAMILY = 3
+CTRL_ATTR_FAMILY_ID = 1
+CTRL_ATTR_FAMILY_NAME = 2
+
+# WireGuard-Konstanten (linux/wireguard.h)
+WG_GENL_NAME = "wireguard"
+WG_GENL_VERSION = 1
+WG_CMD_GET_DEVICE = 0
+
+WGDEVICE_A_IFNAME = 2
+WGDEVICE_A_PUBLIC_KEY = 4
+WGDEVICE_A_LISTEN_PORT = 6
+WGDEVICE_A_PEERS = 8
+
+WGPEER_A_PUBLIC_KEY = 1
+WGPEER_A_ENDPOINT = 4
+WGPEER_A_PERSISTENT_KEEPALIVE_INTERVAL = 5
+WGPEER_A_LAST_HANDSHAKE_TIME = 6
+WGPEER_A_RX_BYTES = 7
+WGPEER_A_TX_BYTES = 8
+WGPEER_A_ALLOWEDIPS = 9
+
+WGALLOWEDIP_A_FAMILY = 1
+WGALLOWEDIP_A_IPADDR = 2
+WGALLOWEDIP_A_CIDR_MASK = 3
+
+_NLMSGHDR = struct.Struct("=IHHII")
+_GENLMSGHDR = struct.Struct("=BBH")
+_NLATTR = struct.Struct("=HH")
+_U16 = struct.Struct("=H")
+_U64 = struct.Struct("=Q")
+_I32 = struct.Struct("=i")
+_TIMESPEC = struct.Struct("=qq")
+_NET_PORT = struct.Struct("!H")
+
+# Anzahl der Wiederholungen, wenn sich die Peer-Liste während eines Dumps ändert
+_DUMP_RETRIES = 3
+
+class NetlinkError(OSError):
+    """Fehler bei der Kommunikation mit dem Kernel über Generic Netlink."""
+
+def _align(length: int) -> int:
+    return (length + 3) & ~3
+
+def _pack_attr(attr_type: int, payload: bytes) -> bytes:
+    length = _NLATTR.size + len(payload)
+    return _NLATTR.pack(length, attr_type) + payload + b"\0" * (_align(length) - length)
+
+def _iter_attrs(data: bytes, offset: int = 0) -> Iterator[Tuple[int, bytes]]:
+    """Iteriert über eine Folge von Netlink-Attributen (Typ, Nutzdaten)."""
+    end = len(data)
+    while offset + _NLATTR.size <= end:
+        length, attr_type = _NLATTR.unpack_from(data, offset)
+        if length < _NLATTR.size:
+            break
+        yield attr_type & NLA_TYPE_MASK, data[offset + _NLATTR.size:offset + length]
+        offset += _align(length)
+
+def _format_endpoint(payload: bytes) -> Optional[str]:
+    """Wandelt eine sockaddr_in/sockaddr_in6-Struktur in die `wg`-Darstellung um."""
+    if len(payload) < 2:
+        return None
+    family = _U16.unpack_from(payload)[0]
+    if family == socket.AF_INET and len(payload) >= 8:
+        port = _NET_PORT.unpack_from(payload, 2)[0]
+        return f"{socket.inet_ntop(socket.AF_INET, payload[4:8])}:{port}"
+    if family == socket.AF_INET6 and len(payload) >= 24:
+        port = _NET_PORT.unpack_from(payload, 2)[0]
+        return f"[{socket.inet_ntop(socket.AF_INET6, payload[8:24])}]:{port}"
+    return None
+
+def _parse_allowed_ip(payload: bytes) -> Optional[str]:
+    family = address = cidr = None
+    for attr_type, value in _iter_attrs(payload):
+        if attr_type == WGALLOWEDIP_A_FAMILY:
+            family = _U16.unpack_from(value)[0]
+        elif attr_type == WGALLOWEDIP_A_IPADDR:
+            address = value
+        elif attr_type == WGALLOWEDIP_A_CIDR_MASK:
+            cidr = value[0]
+    if family is None or address is None or cidr is None:
+        return None
+    return f"{socket.inet_ntop(family, address)}/{cidr}"
+
+class WireGuardNetlink:
+    """
+    Minimaler Generic-Netlink-Client für die WireGuard-Familie.
+    Liest Interface- und Peer-Daten direkt aus dem Kernel, ohne `wg` zu starten.
+    Mehrteilige Antworten (NLM_F_MULTI) werden zusammengeführt, auch wenn die
+    erlaubten IPs eines Peers auf mehrere Nachrichten verteilt sind.
+    """
+
+    def __init__(self, recv_bufsize: int = 1 << 16):
+        self.recv_bufsize = recv_bufsize
+        self._sock: Optional[socket.socket] = None
+        self._family_id: Optional[int] = None
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def close(self):
+        """Schließt den Netlink-Socket."""
+        with self._lock:
+            if self._sock is not None:
+                self._sock.close()
+                self._sock = None
+            self._family_id = None
+
+    def _socket(self) -> socket.socket:
+        if self._sock is None:
+            sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_GENERIC)
+            sock.bind((0, 0))
+            self._sock = sock
+        return self._sock
+
+    def _send(self, msg_type: int, flags: int, cmd: int, version: int, attrs: bytes) -> int:
+        self._seq += 1
+        payload = _GENLMSGHDR.pack(cmd, version, 0) + attrs
+        header = _NLMSGHDR.pack(_NLMSGHDR.size + len(payload), msg_type, flags, self._seq, 0)
+        self._socket().send(header + payload)
+        return self._seq
+
+    def _receive(self, seq: int) -> Iterator[Tuple[int, bytes]]:
+        """
+        Liefert die Antwortnachrichten (Flags, genl-Nutzdaten) zu einer Anfrage,
+        bis der Kernel NLMSG_DONE oder eine einzelne Nachricht ohne NLM_F_MULTI sendet.
+        """
+        sock = self._socket()
+        while True:
+            data = sock.recv(self.recv_bufsize)
+            offset = 0
+            while offset + _NLMSGHDR.size <= len(data):
+                length, msg_type, flags, msg_seq, _ = _NLMSGHDR.unpack_from(data, offset)
+                if length < _NLMSGHDR.size:
+                    raise NetlinkError(errno.EBADMSG, "Ungültige Netlink-Nachricht")
+                body = data[offset + _NLMSGHDR.size:offset + length]
+                offset += _align(length)
+
+                if msg_seq != seq:
+                    continue
+                if msg_type == NLMSG_DONE:
+                    return
+                if msg_type == NLMSG_ERROR:
+                    error = -_I32.unpack_from(body)[0]
+                    if error == 0:
+                        return
+                    raise NetlinkError(error, os.strerror(error))
+
+                yield flags, body[_GENLMSGHDR.size:]
+                if not flags & NLM_F_MULTI:
+                    return
+
+    def _resolve_family(self) -> int:
+        if self._family_id is None:
+            name = _pack_attr(CTRL_ATTR_FAMILY_NAME, WG_GENL_NAME.encode() + b"\0")
+            seq = self._send(GENL_ID_CTRL, NLM_F_REQUEST, CTRL_CMD_GETFAMILY, 1, name)
+            for _, body in self._receive(seq):
+                for attr_type, value in _iter_attrs(body):
+                    if attr_type == CTRL_ATTR_FAMILY_ID:
+                        self._family_id = _U16.unpack_from(value)[0]
+            if self._family_id is None:
+                raise NetlinkError(errno.ENOENT, "WireGuard-Netlink-Familie nicht gefunden")
+        return self._family_id
+
+    def get_device(self, interface: str) -> InterfaceDump:
+        """
+        Fragt den Zustand eines WireGuard-Interfaces per WG_CMD_GET_DEVICE ab.
+
+        Raises:
+            NetlinkError: Wenn das Interface nicht existiert oder der Zugriff fehlschlägt
+        """
+        with self._lock:
+            try:
+                for _ in range(_DUMP_RETRIES):
+                    dump = self._dump_device(interface)
+                    if dump is not None:
+                        return dump
+                raise NetlinkError(errno.EINTR, "Peer-Liste hat sich während des Dumps wiederholt geändert")
+            except OSError:
+                # Socket nach Fehlern verwerfen, damit keine Restnachrichten gelesen werden
+                if self._sock is not None:
+                    self._sock.close()
+                    self._sock = None
+                raise
+
+    def _dump_device(self, interface: str) -> Optional[InterfaceDump]:
+        family_id = self._resolve_family()
+        ifname = _pack_attr(WGDEVICE_A_IFNAME, interface.encode() + b"\0")
+        seq = self._send(family_id, NLM_F_REQUEST | NLM_F_ACK | NLM_F_DUMP, WG_CMD_GET_DEVICE, WG_GENL_VERSION, ifname)
+
+        dump = InterfaceDump(interface=interface)
+        peers: Dict[str, List] = {}
+        interrupted = False
+
+        for flags, body in self._receive(seq):
+            if flags & NLM_F_DUMP_INTR:
+                interrupted = True
+            for attr_type, value in _iter_attrs(body):
+                if attr_type == WGDEVICE_A_PUBLIC_KEY:
+                    dump.public_key = base64.b64encode(value).decode()
+                elif attr_type == WGDEVICE_A_LISTEN_PORT:
+                    dump.listen_port = str(_U16.unpack_from(value)[0])
+                elif attr_type == WGDEVICE_A_PEERS:
+                    for _, peer_payload in _iter_attrs(value):
+                        self._merge_peer(peers, peer_payload)
+
+        if interrupted:
+            return None
+
+        dump.peers = [
+            PeerDump(key, endpoint, tuple(allowed_ips), handshake, rx, tx, keepalive)
+            for key, (endpoint, allowed_ips, handshake, rx, tx, keepalive) in peers.items()
+        ]
+        return dump
+
+    @staticmethod
+    def _merge_peer(peers: Dict[str, List], payload: bytes):
+        """
+        Übernimmt einen Peer aus einer Teilantwort. Der Kernel wiederholt einen Peer
+        am Anfang der nächsten Nachricht, wenn dessen erlaubte IPs nicht mehr passten.
+        """
+        attrs: Dict[int, bytes] = {}
+        allowed_ips: List[str] = []
+        for attr_type, value in _iter_attrs(payload):
+            if attr_type == WGPEER_A_ALLOWEDIPS:
+                for _, allowed_ip_payload in _iter_attrs(value):
+                    allowed_ip = _parse_allowed_ip(allowed_ip_payload)
+                    if allowed_ip:
+                        allowed_ips.append(allowed_ip)
+            else:
+                attrs[attr_type] = value
+
+        if WGPEER_A_PUBLIC_KEY not in attrs:
+            return
+        key = base64.b64encode(attrs[WGPEER_A_PUBLIC_KEY]).decode()
+
+        existing = peers.get(key)
+        if existing is not None:
+            existing[1].extend(allowed_ips)
+            return
+
+        endpoint = _format_endpoint(attrs[WGPEER_A_ENDPOINT]) if WGPEER_A_ENDPOINT in attrs else None
+        handshake = _TIMESPEC.unpack_from(attrs[WGPEER_A_LAST_HANDSHAKE_TIME])[0] if WGPEER_A_LAST_HANDSHAKE_TIME in attrs else 0
+        rx = _U64.unpack_from(attrs[WGPEER_A_RX_BYTES])[0] if WGPEER_A_RX_BYTES in attrs else 0
+        tx = _U64.unpack_from(attrs[WGPEER_A_TX_BYTES])[0] if WGPEER_A_TX_BYTES in attrs else 0
+        keepalive = _U16.unpack_from(attrs[WGPEER_A_PERSISTENT_KEEPALIVE_INTERVAL])[0] if WGPEER_A_PERSISTENT_KEEPALIVE_INTERVAL in attrs else 0
+        peers[key] = [endpoint, allowed_ips, handshake, rx, tx, str(keepalive) if keepalive else "off"]
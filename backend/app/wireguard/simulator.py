@@ -0,0 +1,204 @@
+"""
+Deterministischer Simulator für WireGuard-Interfaces mit beliebig vielen Peers.
+
+Erzeugt realistische Ausgaben von `wg show <interface> dump` und passende
+`<interface>.conf`-Dateien. Der Zustand hängt nur von Seed, Interface-Name und Uhrzeit
+ab: Zähler steigen monoton, Handshakes erneuern sich alle zwei Minuten, Peers gehen
+stundenweise offline und wechseln täglich den Endpoint-Port. Dadurch liefern auch
+getrennte Aufrufe (z.B. als Ersatz für das `wg`-Programm) einen fortlaufenden Verlauf.
+
+Verwendung als `wg`-Ersatz:
+    python -m app.wireguard.simulator show wg0 dump
+    python -m app.wireguard.simulator show interfaces
+
+Fixtures erzeugen:
+    python -m app.wireguard.simulator --peers 10000 fixtures /tmp/wg-fleet --interfaces wg0 wg1
+"""
+import argparse
+import base64
+import hashlib
+import ipaddress
+import os
+import sys
+import time
+from pathlib import Path
+from typing import List, Optional
+
+from app.wireguard.dump import InterfaceDump, PeerDump
+
+# Fester Bezugszeitpunkt der Zähler, damit getrennte Aufrufe denselben Verlauf liefern
+EPOCH = 1_700_000_000
+HANDSHAKE_INTERVAL = 120
+
+def _key(seed: int, *parts) -> bytes:
+    return hashlib.blake2b(":".join(str(part) for part in (seed, *parts)).encode(), digest_size=32).digest()
+
+def _mix(*values: int) -> int:
+    """Schneller, deterministischer Hash für zeitabhängige Zustände."""
+    h = 0x9E3779B9
+    for value in values:
+        h = ((h ^ value) * 0x01000193) & 0xFFFFFFFF
+        h ^= h >> 15
+    return h
+
+class FleetSimulator:
+    """Simuliert ein WireGuard-Interface mit `peers` Peers."""
+
+    def __init__(
+        self,
+        interface: str = "wg0",
+        peers: int = 1000,
+        seed: int = 0,
+        online_ratio: float = 0.6,
+        admin_ratio: float = 0.05,
+        admin_subnet: str = "10.10.10.0/24",
+        user_subnet: str = "10.10.11.0/24",
+        listen_port: int = 51820
+    ):
+        """
+        Args:
+            interface: Name des Interfaces (geht in die Schlüssel ein)
+            peers: Anzahl der Peers
+            seed: Startwert für alle Zufallsgrößen
+            online_ratio: Anteil der Peers, die in einer Stunde online sind
+            admin_ratio: Anteil der Administratoren (höchstens so viele, wie ins Admin-Subnetz passen)
+            admin_subnet: Subnetz der Administratoren
+            user_subnet: Erstes Subnetz der Benutzer; weitere Adressen schließen direkt daran an
+            listen_port: Port des Interfaces
+        """
+        self.interface = interface
+        self.seed = seed
+        self.online_ratio = online_ratio
+        self.listen_port = listen_port
+
+        server_key = _key(seed, interface, "server")
+        self.private_key = base64.b64encode(hashlib.blake2b(server_key, digest_size=32).digest()).decode()
+        self.public_key = base64.b64encode(server_key).decode()
+        admin_net = ipaddress.ip_network(admin_subnet)
+        self.address = f"{admin_net.network_address + 1}/{admin_net.prefixlen}"
+
+        # Unveränderliche Eigenschaften je Peer einmalig berechnen
+        admin_hosts = admin_net.num_addresses - 3
+        admins = min(int(peers * admin_ratio), admin_hosts)
+        admin_base = admin_net.network_address + 2
+        user_base = ipaddress.ip_network(user_subnet).network_address + 2
+        self.peer_keys: List[str] = []
+        self.allowed_ips: List[str] = []
+        self._rates: List[tuple] = []
+        # Wie in `wg show <interface> dump`: Sekunden als Text oder "off"
+        self._keepalive: List[str] = []
+        for index in range(peers):
+            digest = _key(seed, interface, index)
+            self.peer_keys.append(base64.b64encode(digest).decode())
+            address = admin_base + index if index < admins else user_base + (index - admins)
+            self.allowed_ips.append(f"{address}/32")
+            # Raten in Bytes/s: wenige Vielnutzer, viele Wenignutzer
+            self._rates.append((
+                1 + digest[0] * digest[1] // 16,
+                1 + digest[2] * digest[3] // 64,
+                digest[4] % HANDSHAKE_INTERVAL
+            ))
+            self._keepalive.append("25" if digest[5] % 4 == 0 else "off")
+
+    def _online(self, index: int, hour: int) -> bool:
+        return _mix(self.seed, index, hour) % 1000 < self.online_ratio * 1000
+
+    def peers(self, now: Optional[float] = None) -> List[PeerDump]:
+        """Zustand aller Peers zum Zeitpunkt `now`."""
+        now = int(now if now is not None else time.time())
+        hour = now // 3600
+        hour_start = hour * 3600
+        day = now // 86400
+        result = []
+        for index, public_key in enumerate(self.peer_keys):
+            rate_rx, rate_tx, phase = self._rates[index]
+            if self._online(index, hour):
+                elapsed = now - EPOCH
+                handshake = now - (now + phase) % HANDSHAKE_INTERVAL
+            else:
+                # Offline: Zähler und Handshake bleiben auf dem Stand vom Beginn der Stunde
+                elapsed = hour_start - EPOCH
+                handshake = hour_start - phase if self._online(index, hour - 1) else 0
+            port = 1024 + _mix(self.seed, index, day) % 64000
+            endpoint = f"198.51.{index // 254 % 256}.{index % 254 + 1}:{port}" if handshake else None
+            result.append(PeerDump(
+                public_key=public_key,
+                endpoint=endpoint,
+                allowed_ips=(self.allowed_ips[index],),
+                latest_handshake=handshake,
+                transfer_rx=rate_rx * elapsed,
+                transfer_tx=rate_tx * elapsed,
+                persistent_keepalive=self._keepalive[index]
+            ))
+        return result
+
+    def interface_dump(self, now: Optional[float] = None) -> InterfaceDump:
+        return InterfaceDump(self.interface, self.public_key, str(self.listen_port), self.peers(now))
+
+    def dump(self, now: Optional[float] = None) -> str:
+        """Ausgabe im Format von `wg show <interface> dump`."""
+        lines = [f"{self.private_key}\t{self.public_key}\t{self.listen_port}\toff"]
+        for peer in self.peers(now):
+            lines.append("\t".join((
+                peer.public_key,
+                "(none)",
+                peer.endpoint or "(none)",
+                ",".join(peer.allowed_ips),
+                str(peer.latest_handshake),
+                str(peer.transfer_rx),
+                str(peer.transfer_tx),
+                peer.persistent_keepalive or "off"
+            )))
+        return "\n".join(lines) + "\n"
+
+    def config(self) -> str:
+        """Passende Konfigurationsdatei `<interface>.conf`."""
+        parts = [
+            "[Interface]\n"
+            f"PrivateKey = {self.private_key}\n"
+            f"Address = {self.address}\n"
+            f"ListenPort = {self.listen_port}\n"
+        ]
+        for index, public_key in enumerate(self.peer_keys):
+            peer = f"\n[Peer]\nPublicKey = {public_key}\nAllowedIPs = {self.allowed_ips[index]}\n"
+            if self._keepalive[index] != "off":
+                peer += f"PersistentKeepalive = {self._keepalive[index]}\n"
+            parts.append(peer)
+        return "".join(parts)
+
+def write_fixtures(directory: str, interfaces: List[str], peers: int, seed: int = 0, now: Optional[float] = None):
+    """Schreibt für jedes Interface `<interface>.conf` und `<interface>.dump` in `directory`."""
+    target = Path(directory)
+    os.makedirs(target, exist_ok=True)
+    for interface in interfaces:
+        simulator = FleetSimulator(interface, peers, seed)
+        (target / f"{interface}.conf").write_text(simulator.config())
+        (target / f"{interface}.dump").write_text(simulator.dump(now))
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Simulierte WireGuard-Interfaces")
+    parser.add_argument("--peers", type=int, default=int(os.environ.get("WG_SIM_PEERS", 1000)))
+    parser.add_argument("--seed", type=int, default=int(os.environ.get("WG_SIM_SEED", 0)))
+    commands = parser.add_subparsers(dest="command", required=True)
+    show = commands.add_parser("show", help="Ersatz für `wg show`")
+    show.add_argument("interface")
+    show.add_argument("mode", nargs="?", default="dump")
+    fixtures = commands.add_parser("fixtures", help="Konfigurationen und Dumps schreiben")
+    fixtures.add_argument("directory")
+    fixtures.add_argument("--interfaces", nargs="+", default=["wg0"])
+    args = parser.parse_args(argv)
+
+    if args.command == "fixtures":
+        write_fixtures(args.directory, args.interfaces, args.peers, args.seed)
+        return 0
+    if args.interface == "interfaces":
+        print(os.environ.get("WG_SIM_INTERFACES", "wg0"))
+        return 0
+    if args.mode != "dump":
+        print(f"Nicht unterstützt: wg show {args.interface} {args.mode}", file=sys.stderr)
+        return 1
+    sys.stdout.write(FleetSimulator(args.interface, args.peers, args.seed).dump())
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+"""Benchmarks der Backend-Hot-Paths (siehe `python -m benchmarks.run --help`)."""
@@ -0,0 +1,173 @@
+"""
+Benchmark-Fälle für die Hot Paths des Backends.
+
+Jeder Fall erhält die Anzahl der Peers und ein temporäres Verzeichnis und liefert
+eine Funktion, die genau einen Durchlauf ausführt. Vorbereitung (Simulation, Fixtures)
+wird nicht mitgemessen.
+"""
+import asyncio
+import os
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from app.services.peer_events import diff_peers
+from app.services.wireguard_monitor import WireGuardMonitor
+from app.services.wireguard_collectors import FakeCollector
+from app.utils.system_operations import SecureSystemOperations
+from app.wireguard.config_parser import WireGuardConfigParser
+from app.wireguard.config_validator import WireGuardConfigValidator
+from app.wireguard.dump import DumpStreamParser
+from app.wireguard.simulator import FleetSimulator
+
+# Zeitpunkt der simulierten Dumps (fest, damit alle Läufe dieselben Daten verwenden)
+NOW = 1_800_000_000
+
+Case = Callable[[int, Path], Optional[Callable[[], object]]]
+
+def _monitor(directory: Path) -> WireGuardMonitor:
+    return WireGuardMonitor("wg0", status_dir=str(directory / "status"), collector=FakeCollector())
+
+def dump_parse(peers: int, directory: Path):
+    """`wg show dump` parsen und Statusdaten aufbauen (`_parse_wg_dump`)."""
+    text = FleetSimulator("wg0", peers).dump(NOW)
+    monitor = _monitor(directory)
+    return lambda: monitor._parse_wg_dump(text)
+
+def dump_stream(peers: int, directory: Path):
+    """`wg show dump` blockweise aus der Pipe parsen (`DumpStreamParser`) und Statusdaten aufbauen."""
+    data = FleetSimulator("wg0", peers).dump(NOW).encode()
+    chunks = [data[offset:offset + 65536] for offset in range(0, len(data), 65536)]
+    monitor = _monitor(directory)
+
+    def run():
+        parser = DumpStreamParser("wg0")
+        for chunk in chunks:
+            parser.feed(chunk)
+        return monitor._build_status(parser.finish(), NOW)
+    return run
+
+def change_detection(peers: int, directory: Path):
+    """Änderungserkennung zwischen zwei Durchläufen (`diff_peers`)."""
+    simulator = FleetSimulator("wg0", peers)
+    monitor = _monitor(directory)
+    previous = monitor._build_status(simulator.interface_dump(NOW), NOW)
+    monitor._diff_status(previous)
+    current = monitor._build_status(simulator.interface_dump(NOW + 15), NOW + 15)
+    return lambda: diff_peers("wg0", monitor._peer_index, current["peers"])
+
+def status_persist(peers: int, directory: Path):
+    """Status serialisieren und Statusdatei schreiben (`SnapshotStore.publish` + `StatusFile.save`)."""
+    monitor = _monitor(directory)
+    status = monitor._build_status(FleetSimulator("wg0", peers).interface_dump(NOW), NOW)
+    loop = asyncio.new_event_loop()
+    return lambda: loop.run_until_complete(monitor.status_file.save(monitor.snapshots.publish(status).body))
+
+def config_parse(peers: int, directory: Path):
+    """`wgN.conf` einlesen (`WireGuardConfigParser.parse_config`)."""
+    (directory / "wg0.conf").write_text(FleetSimulator("wg0", peers).config())
+    parser = WireGuardConfigParser(str(directory))
+    return lambda: parser.parse_config("wg0.conf")
+
+def config_render(peers: int, directory: Path):
+    """Serverkonfiguration erzeugen und schreiben (`create_server_config`)."""
+    simulator = FleetSimulator("wg0", peers)
+    user = os.getenv("USER") or "root"
+    operations = SecureSystemOperations(
+        wireguard_dir=str(directory / "wireguard"),
+        backup_dir=str(directory / "backups"),
+        wireguard_user=user,
+        wireguard_group=user
+    )
+    peer_configs = [
+        {"public_key": key, "allowed_ips": [ips], "persistent_keepalive": 25}
+        for key, ips in zip(simulator.peer_keys, simulator.allowed_ips)
+    ]
+    loop = asyncio.new_event_loop()
+    return lambda: loop.run_until_complete(operations.create_server_config(
+        "wg0", simulator.private_key, [simulator.address], simulator.listen_port, peer_configs
+    ))
+
+def config_validate(peers: int, directory: Path):
+    """Interface und alle Peers validieren (`WireGuardConfigValidator`)."""
+    simulator = FleetSimulator("wg0", peers)
+    validator = WireGuardConfigValidator()
+    interface = {"PrivateKey": simulator.private_key, "Address": simulator.address, "ListenPort": str(simulator.listen_port)}
+    peer_configs = [
+        {"PublicKey": key, "AllowedIPs": ips, "PersistentKeepalive": "25"}
+        for key, ips in zip(simulator.peer_keys, simulator.allowed_ips)
+    ]
+
+    def run():
+        errors = validator.validate_interface(interface)
+        for peer in peer_configs:
+            errors.extend(validator.validate_peer(peer))
+        return errors
+    return run
+
+def http_status(peers: int, directory: Path):
+    """GET /api/v1/wireguard/status über den vollständigen FastAPI-Stack."""
+    from fastapi.testclient import TestClient
+    from app.main import app
+    from app.api.v1.endpoints.wireguard import wireguard_monitor
+
+    status = wireguard_monitor._build_status(FleetSimulator(wireguard_monitor.interface, peers).interface_dump(NOW), NOW)
+    wireguard_monitor.snapshots.publish(status)
+    client = TestClient(app)
+    return lambda: client.get("/api/v1/wireguard/status").raise_for_status()
+
+def http_clients(peers: int, directory: Path):
+    """
+    GET /api/clients gegen eine PostgreSQL-Datenbank aus `BENCHMARK_DATABASE_URL`.
+    Ohne Datenbank wird der Fall übersprungen.
+    """
+    database_url = os.getenv("BENCHMARK_DATABASE_URL")
+    if not database_url:
+        return None
+    from fastapi.testclient import TestClient
+    from sqlalchemy import create_engine, delete, insert, text
+    from sqlalchemy.orm import sessionmaker
+    from app.api.deps import get_client_service
+    from app.db.base_class import Base
+    from app.main import app
+    from app.models.client import Client
+    from app.services.client import ThreadedClientService, client_summary
+
+    engine = create_engine(database_url)
+    with engine.begin() as connection:
+        # Für die Trigramm-Indizes der Suche
+        connection.execute(text("CREATE EXTENSION IF NOT EXISTS pg_trgm"))
+    Base.metadata.create_all(engine, tables=[Client.__table__])
+    simulator = FleetSimulator("wg0", peers)
+    with engine.begin() as connection:
+        connection.execute(delete(Client))
+        connection.execute(insert(Client), [
+            {"name": f"peer-{index}", "public_key": key, "allowed_ips": [ips], "is_active": True}
+            for index, (key, ips) in enumerate(zip(simulator.peer_keys, simulator.allowed_ips))
+        ])
+    Session = sessionmaker(bind=engine)
+
+    async def get_benchmark_service():
+        db = Session()
+        try:
+            yield ThreadedClientService(db)
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_client_service] = get_benchmark_service
+    client_summary.session_factory = Session
+    client = TestClient(app)
+    return lambda: client.get("/api/clients").raise_for_status()
+
+CASES: Dict[str, Case] = {
+    "dump_parse": dump_parse,
+    "dump_stream": dump_stream,
+    "change_detection": change_detection,
+    "status_persist": status_persist,
+    "config_parse": config_parse,
+    "config_render": config_render,
+    "config_validate": config_validate,
+    "http_status": http_status,
+    "http_clients": http_clients
+}
+
+SIZES: List[int] = [100, 1000, 10000, 100000]
@@ -0,0 +1,168 @@
+"""
+Führt die Benchmarks aus und vergleicht sie mit der gespeicherten Baseline.
+
+    python -m benchmarks.run                      # alle Fälle, 100/1k/10k/100k Peers
+    python -m benchmarks.run --sizes 100 1000 --cases dump_parse config_parse
+    python -m benchmarks.run --update-baseline    # Ergebnisse als neue Baseline speichern
+
+Der Exit-Code ist 1, wenn ein Fall langsamer als `--threshold` bzw. speicherhungriger
+als `--memory-threshold` (relativ zur Baseline) ist.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+# Der Monitor der API darf keine Daten schreiben oder den Kernel abfragen
+os.environ.setdefault("WIREGUARD_COLLECTOR", "fake")
+os.environ.setdefault("WIREGUARD_HISTORY_ENABLED", "false")
+os.environ.setdefault("WIREGUARD_CLIENT_SYNC_ENABLED", "false")
+os.environ.setdefault("WIREGUARD_ACCOUNTING_DIR", tempfile.mkdtemp(prefix="wg-bench-acct-"))
+
+from benchmarks.cases import CASES, SIZES
+
+BASELINE_FILE = Path(__file__).with_name("baseline.json")
+
+# Zeitunterschiede unterhalb dieser Grenze gelten als Messrauschen
+MIN_TIME_DELTA = 0.002
+
+def measure(run: Callable[[], Any], min_time: float, max_repeats: int) -> Dict[str, float]:
+    """Misst Median-Laufzeit und Spitzen-Speicherbedarf eines Durchlaufs."""
+    run()  # Aufwärmen
+    durations: List[float] = []
+    total = 0.0
+    while len(durations) < 3 or (total < min_time and len(durations) < max_repeats):
+        gc.collect()
+        started = time.perf_counter()
+        run()
+        duration = time.perf_counter() - started
+        durations.append(duration)
+        total += duration
+
+    gc.collect()
+    tracemalloc.start()
+    run()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "seconds": statistics.median(durations),
+        "repeats": len(durations),
+        "peak_kb": peak / 1024
+    }
+
+def run_benchmarks(cases: List[str], sizes: List[int], min_time: float, max_repeats: int) -> Dict[str, Dict[str, Any]]:
+    results: Dict[str, Dict[str, Any]] = {}
+    for name in cases:
+        for size in sizes:
+            with tempfile.TemporaryDirectory(prefix="wg-bench-") as directory:
+                run = CASES[name](size, Path(directory))
+                if run is None:
+                    print(f"{name:<18} {size:>7}  übersprungen (Voraussetzung fehlt)")
+                    continue
+                result = measure(run, min_time, max_repeats)
+            result["peers_per_second"] = size / result["seconds"] if result["seconds"] > 0 else 0.0
+            results.setdefault(name, {})[str(size)] = result
+            print(
+                f"{name:<18} {size:>7}  {result['seconds'] * 1000:>10.2f} ms  "
+                f"{result['peers_per_second']:>12.0f} Peers/s  {result['peak_kb']:>10.0f} KiB"
+            )
+    return results
+
+def compare(
+    results: Dict[str, Dict[str, Any]],
+    baseline: Dict[str, Dict[str, Any]],
+    threshold: float,
+    memory_threshold: float
+) -> List[str]:
+    """Liefert die Regressionen gegenüber der Baseline."""
+    regressions = []
+    for name, sizes in results.items():
+        for size, result in sizes.items():
+            reference = baseline.get(name, {}).get(size)
+            if reference is None:
+                continue
+            slower = result["seconds"] / reference["seconds"] - 1 if reference["seconds"] > 0 else 0.0
+            if slower > threshold and result["seconds"] - reference["seconds"] > MIN_TIME_DELTA:
+                regressions.append(
+                    f"{name} @ {size}: {result['seconds'] * 1000:.2f} ms statt "
+                    f"{reference['seconds'] * 1000:.2f} ms (+{slower:.0%})"
+                )
+            larger = result["peak_kb"] / reference["peak_kb"] - 1 if reference["peak_kb"] > 0 else 0.0
+            if larger > memory_threshold and result["peak_kb"] - reference["peak_kb"] > 64:
+                regressions.append(
+                    f"{name} @ {size}: {result['peak_kb']:.0f} KiB statt "
+                    f"{reference['peak_kb']:.0f} KiB Spitzenspeicher (+{larger:.0%})"
+                )
+    return regressions
+
+def load_baseline() -> Optional[Dict[str, Any]]:
+    try:
+        with open(BASELINE_FILE, 'r') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def save_baseline(results: Dict[str, Dict[str, Any]]):
+    # Bestehende Einträge anderer Fälle/Größen behalten
+    baseline = load_baseline() or {"results": {}}
+    for name, sizes in results.items():
+        baseline["results"].setdefault(name, {}).update(sizes)
+    baseline["meta"] = {
+        "updated": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "processor": platform.processor() or platform.machine()
+    }
+    with open(BASELINE_FILE, 'w') as f:
+        json.dump(baseline, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks der Backend-Hot-Paths")
+    parser.add_argument("--cases", nargs="+", choices=sorted(CASES), default=list(CASES))
+    parser.add_argument("--sizes", nargs="+", type=int, default=SIZES)
+    parser.add_argument("--threshold", type=float, default=float(os.getenv("BENCHMARK_THRESHOLD", 0.5)),
+                        help="Erlaubte relative Verlangsamung (Standard: 0.5 = +50%%)")
+    parser.add_argument("--memory-threshold", type=float, default=float(os.getenv("BENCHMARK_MEMORY_THRESHOLD", 0.25)),
+                        help="Erlaubter relativer Mehrverbrauch an Speicher (Standard: 0.25 = +25%%)")
+    parser.add_argument("--min-time", type=float, default=0.5, help="Mindestmessdauer pro Fall in Sekunden")
+    parser.add_argument("--max-repeats", type=int, default=50)
+    parser.add_argument("--update-baseline", action="store_true", help="Ergebnisse als Baseline speichern")
+    parser.add_argument("--output", help="Ergebnisse zusätzlich als JSON schreiben")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.cases, args.sizes, args.min_time, args.max_repeats)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if args.update_baseline:
+        save_baseline(results)
+        print(f"Baseline in {BASELINE_FILE} aktualisiert.")
+        return 0
+
+    baseline = load_baseline()
+    if baseline is None:
+        print("Keine Baseline vorhanden; mit --update-baseline anlegen.")
+        return 0
+    regressions = compare(results, baseline["results"], args.threshold, args.memory_threshold)
+    if regressions:
+        print("\nRegressionen gegenüber der Baseline:")
+        for regression in regressions:
+            print(f"  - {regression}")
+        return 1
+    print("\nKeine Regressionen gegenüber der Baseline.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,66 @@
+import asyncio
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import wireguard_monitor
+from app.services.tick_scheduler import AdaptiveInterval
+from app.services.wireguard_collectors import FakeCollector
+from app.services.wireguard_monitor import WireGuardMonitor
+from app.wireguard.dump import PeerDump
+
+@pytest.fixture(autouse=True)
+def clock(monkeypatch):
+    """Durchläufe im Abstand von 15 Sekunden, damit die Raten realistisch sind."""
+    ticks = iter(range(int(time.time()), 2**40, 15))
+    monkeypatch.setattr(wireguard_monitor, "time", SimpleNamespace(time=lambda: next(ticks)))
+
+def peer(key: str, handshake: int, rx: int = 0) -> PeerDump:
+    return PeerDump(key, None, ("10.10.11.2/32",), handshake, rx, 0, None)
+
+def monitor_with(collector: FakeCollector, tmp_path) -> WireGuardMonitor:
+    return WireGuardMonitor(
+        status_dir=str(tmp_path),
+        collector=collector,
+        adaptive=AdaptiveInterval(initial=15, minimum=15, maximum=120),
+        activity_threshold=1024
+    )
+
+def test_handshakes_alone_let_the_interval_grow(tmp_path):
+    collector = FakeCollector()
+    monitor = monitor_with(collector, tmp_path)
+    now = int(time.time())
+    collector.set_peers("wg0", [peer(str(i), now) for i in range(50)])
+    asyncio.run(monitor._check_status())
+    assert monitor.next_interval == 15
+
+    intervals = []
+    for tick in range(1, 4):
+        # Jeder Durchlauf bringt neue Handshakes, aber kaum Verkehr
+        collector.set_peers("wg0", [peer(str(i), now + tick, rx=tick) for i in range(50)])
+        asyncio.run(monitor._check_status())
+        intervals.append(monitor.next_interval)
+    assert intervals == [30, 60, 120]
+
+def test_membership_and_online_changes_reset_to_minimum(tmp_path):
+    collector = FakeCollector()
+    monitor = monitor_with(collector, tmp_path)
+    now = int(time.time())
+    collector.set_peers("wg0", [peer("a", now)])
+    asyncio.run(monitor._check_status())
+    asyncio.run(monitor._check_status())
+    assert monitor.next_interval == 30
+
+    collector.set_peers("wg0", [peer("a", now), peer("b", 0)])
+    asyncio.run(monitor._check_status())
+    assert monitor.next_interval == 15
+
+def test_watchers_keep_the_minimum(tmp_path):
+    collector = FakeCollector()
+    monitor = monitor_with(collector, tmp_path)
+    collector.set_peers("wg0", [peer("a", 0)])
+    monitor.register_watcher(lambda: 1)
+    for _ in range(3):
+        asyncio.run(monitor._check_status())
+    assert monitor.next_interval == 15
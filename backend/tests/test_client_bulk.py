@@ -0,0 +1,85 @@
+import asyncio
+import base64
+
+import pytest
+
+from app.services.client_bulk import ImportTooLargeError, parse_import, read_limited, validate_import
+
+KEY_A = base64.b64encode(bytes(range(32))).decode()
+KEY_B = base64.b64encode(bytes(range(32, 64))).decode()
+
+def row(public_key: str = KEY_A, allowed_ips=("10.10.10.2/32",), **extra):
+    return {"name": "laptop", "public_key": public_key, "allowed_ips": list(allowed_ips), **extra}
+
+def test_valid_rows_are_normalized():
+    plan = validate_import([row(allowed_ips=["10.10.10.7/24", "fd00::1"])])
+    assert plan.errors == []
+    ((number, client),) = plan.clients
+    assert number == 1
+    assert client.allowed_ips == ["10.10.10.0/24", "fd00::1/128"]
+
+def test_errors_are_reported_per_row():
+    plan = validate_import([
+        row(),
+        {"name": "ohne Schlüssel", "allowed_ips": ["10.0.0.1/32"]},
+        row(public_key="kein-schluessel"),
+        row(public_key=KEY_B, allowed_ips=["10.0.0.300/32"]),
+        row(),
+        "keine Zeile"
+    ])
+    assert [client.public_key for _, client in plan.clients] == [KEY_A]
+    errors = {error.row: error for error in plan.errors}
+    assert sorted(errors) == [2, 3, 4, 5, 6]
+    assert errors[2].public_key is None and any("public_key" in message for message in errors[2].errors)
+    assert errors[3].public_key == "kein-schluessel"
+    assert errors[4].errors == ["Ungültige erlaubte IP: '10.0.0.300/32'"]
+    assert errors[5].errors == ["public_key bereits in Zeile 1 enthalten"]
+
+def test_existing_keys_and_empty_allowed_ips():
+    plan = validate_import([row(), row(public_key=KEY_B, allowed_ips=[])], existing_keys={KEY_A})
+    assert plan.clients == []
+    assert [error.errors for error in plan.errors] == [["public_key existiert bereits"], ["allowed_ips darf nicht leer sein"]]
+
+def test_csv_import_splits_allowed_ips():
+    body = f"name,public_key,allowed_ips,email\nlaptop,{KEY_A},\"10.10.10.2/32, fd00::2/128\",\n".encode()
+    assert parse_import(body, "text/csv; charset=utf-8") == [row(allowed_ips=["10.10.10.2/32", "fd00::2/128"])]
+    with pytest.raises(ValueError):
+        parse_import(b"name,public_key\nx,y\n", "text/csv")
+
+async def chunks(*parts: bytes):
+    for part in parts:
+        yield part
+
+def test_read_limited_stops_at_the_limit():
+    assert asyncio.run(read_limited(chunks(b"abc", b"def"), 6)) == b"abcdef"
+    with pytest.raises(ImportTooLargeError):
+        asyncio.run(read_limited(chunks(b"abc", b"defg", b"never read"), 6))
+
+@pytest.fixture
+def api(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from app.api.deps import get_client_service
+    from app.core.config import settings
+    from app.main import app
+
+    monkeypatch.setattr(settings, "CLIENT_IMPORT_MAX_BYTES", 64)
+    app.dependency_overrides[get_client_service] = lambda: None
+    yield TestClient(app)
+    app.dependency_overrides.pop(get_client_service)
+
+def test_import_rejects_large_bodies(api):
+    response = api.post("/api/clients/import", content=b"[" + b" " * 100 + b"]")
+    assert response.status_code == 413
+
+    def body():
+        yield b"[" + b" " * 40
+        yield b" " * 40 + b"]"
+
+    # Ohne Content-Length (chunked) greift die Begrenzung beim Lesen
+    response = api.post("/api/clients/import", content=body())
+    assert response.status_code == 413
+
+def test_import_rejects_unmonitored_interfaces(api):
+    response = api.post("/api/clients/import?interface=../../etc/x", json=[])
+    assert response.status_code == 400
@@ -0,0 +1,45 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy.dialects import postgresql
+
+from app.models.client import Client
+from app.services.client_pagination import (
+    InvalidCursorError, clients_page_statement, clients_statement, decode_cursor, encode_cursor, split_page
+)
+
+def sql(statement) -> str:
+    return str(statement.compile(dialect=postgresql.dialect()))
+
+def client(client_id: int, name: str = "peer", created_at: datetime = datetime(2024, 10, 4, 12, 30, 15, 123456)) -> Client:
+    return Client(id=client_id, name=name, created_at=created_at)
+
+@pytest.mark.parametrize("order, expected", [
+    ("created", datetime(2024, 10, 4, 12, 30, 15, 123456)),
+    ("name", "laptop-ä")
+])
+def test_cursor_roundtrip(order, expected):
+    cursor = encode_cursor(order, client(42, name="laptop-ä"))
+    assert "=" not in cursor
+    assert decode_cursor(order, cursor) == (expected, 42)
+
+@pytest.mark.parametrize("cursor", ["", "kein-cursor", encode_cursor("name", client(1))])
+def test_invalid_or_foreign_cursor_is_rejected(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor("created", cursor)
+
+def test_split_page_returns_cursor_only_when_more_rows_exist():
+    clients = [client(i) for i in range(1, 5)]
+    page, cursor = split_page(clients, 3, "created")
+    assert [c.id for c in page] == [1, 2, 3]
+    assert decode_cursor("created", cursor)[1] == 3
+    assert split_page(clients, 4, "created") == (clients, None)
+
+def test_offset_and_keyset_use_the_same_ordering():
+    offset = sql(clients_statement(skip=10, limit=5, order="name"))
+    keyset = sql(clients_page_statement(5, encode_cursor("name", client(7)), "name"))
+    first_page = sql(clients_page_statement(5, None, "name", skip=10))
+    for statement in (offset, keyset, first_page):
+        assert "ORDER BY clients.name, clients.id" in statement
+    assert "(clients.name, clients.id) >" in keyset
+    assert "OFFSET" in first_page and "OFFSET" not in keyset
@@ -0,0 +1,51 @@
+import pytest
+from sqlalchemy import select
+from sqlalchemy.dialects import postgresql
+
+from app.models.client import Client
+from app.services.client_search import containing_networks, escape_like, search_filters
+
+def sql(filters) -> str:
+    return str(select(Client.id).where(*filters).compile(dialect=postgresql.dialect()))
+
+def params(filters) -> dict:
+    return select(Client.id).where(*filters).compile(dialect=postgresql.dialect()).params
+
+def test_containing_networks_for_address():
+    networks = containing_networks(" 10.10.11.7 ")
+    assert networks[0] == "10.10.11.7/32"
+    assert "10.10.11.0/24" in networks and "0.0.0.0/0" in networks
+    assert networks[-1] == "10.10.11.7"
+    assert len(containing_networks("fd00::1")) == 130
+
+def test_containing_networks_normalizes_cidr():
+    assert containing_networks("10.10.11.7/24")[:2] == ["10.10.11.0/24", "10.10.10.0/23"]
+    with pytest.raises(ValueError):
+        containing_networks("10.10.11.300")
+
+def test_text_and_key_filters_escape_wildcards():
+    assert escape_like("50%_a\\b") == "50\\%\\_a\\\\b"
+    filters = search_filters(q="100%", public_key="ab_")
+    statement = sql(filters)
+    assert "clients.name ILIKE" in statement and "clients.email ILIKE" in statement
+    assert "clients.public_key LIKE" in statement
+    assert set(params(filters).values()) >= {"%100\\%%", "ab\\_%"}
+
+def test_address_search_uses_only_the_array_index():
+    filters = search_filters(ip="10.10.11.7")
+    assert "clients.allowed_ips && " in sql(filters)
+    assert "unnest" not in sql(filters)
+
+def test_subnet_search_also_finds_contained_entries():
+    filters = search_filters(ip="10.10.11.0/24")
+    statement = sql(filters)
+    assert "clients.allowed_ips && " in statement
+    assert "FROM unnest(clients.allowed_ips) AS entries(allowed_ip)" in statement
+    assert "CAST(entries.allowed_ip AS INET) <<= CAST(" in statement
+    assert "10.10.11.0/24" in params(filters).values()
+
+def test_status_filters():
+    statement = sql(search_filters(active=True, online=False, now=1_728_000_000))
+    assert "clients.is_active IS true" in statement
+    assert "clients.last_handshake IS NULL OR clients.last_handshake <" in statement
+    assert search_filters() == []
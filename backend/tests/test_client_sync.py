@@ -0,0 +1,79 @@
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import sessionmaker
+
+from app.services.client_summary import ClientSummary, ClientSummaryCache
+from app.services.client_sync import ClientStatsSync, transfer_column_error
+
+def session_factory(column_type: str):
+    engine = create_engine("sqlite://")
+    with engine.begin() as connection:
+        connection.execute(text(
+            f"CREATE TABLE clients (id INTEGER PRIMARY KEY, public_key VARCHAR, last_handshake TIMESTAMP, "
+            f"transfer_rx {column_type}, transfer_tx {column_type})"
+        ))
+    return sessionmaker(bind=engine)
+
+def test_integer_transfer_columns_are_reported():
+    factory = session_factory("INTEGER")
+    with factory() as db:
+        error = transfer_column_error(db)
+    assert "transfer_rx, transfer_tx" in error
+    assert "ALTER TABLE clients" in error
+
+def test_bigint_transfer_columns_pass():
+    with session_factory("BIGINT")() as db:
+        assert transfer_column_error(db) is None
+
+def test_sync_refuses_to_write_into_integer_columns(caplog):
+    sync = ClientStatsSync(session_factory("INTEGER"))
+    assert sync.sync([("a", 0, 2**33, 0)]) == 0
+    assert sync.schema_error is not None
+    assert "BIGINT" in caplog.text
+    # Weitere Durchläufe greifen nicht mehr auf die Datenbank zu
+    sync.session_factory = None
+    assert sync.sync([("a", 0, 2**34, 0)]) == 0
+
+def test_unchanged_peers_are_not_sent():
+    sync = ClientStatsSync(session_factory("BIGINT"))
+    sync._written["a"] = (10, 1, 2)
+    assert sync.changed([("a", 10, 1, 2), ("b", 0, 0, 0), ("a", 11, 1, 2)]) == [("b", 0, 0, 0), ("a", 11, 1, 2)]
+
+class ReturningSession:
+    """Nimmt das UPDATE entgegen und liefert vorbereitete RETURNING-Zeilen (Differenzen rx, tx)."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.statements = []
+
+    def execute(self, statement):
+        self.statements.append(statement)
+        return self
+
+    def all(self):
+        return self.rows
+
+    def commit(self):
+        pass
+
+    def close(self):
+        pass
+
+def test_transfer_deltas_adjust_the_summary_without_reloading():
+    summary = ClientSummaryCache(lambda: None, max_age=3600)
+    summary._summary = ClientSummary(2, 2, 100, 50, datetime.utcnow())
+    summary._loaded_at = time.monotonic()
+    db = ReturningSession([(30, -10), (5, 5)])
+    sync = ClientStatsSync(lambda: db, on_change=summary.transfer_changed)
+    sync._schema_checked = True
+
+    assert sync.sync([("a", 0, 130, 40), ("b", 0, 5, 5)]) == 2
+    assert summary.get()[:4] == (2, 2, 135, 45)
+    assert summary.refreshes == 0
+
+    sql = str(db.statements[0].compile(dialect=postgresql.dialect()))
+    assert '"old".id = clients.id' in sql
+    assert 'RETURNING peer_stats.transfer_rx - coalesce("old".transfer_rx' in sql
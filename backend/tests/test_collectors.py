@@ -0,0 +1,58 @@
+import asyncio
+import time
+
+import pytest
+
+from app.services.peer_events import PeerEventType
+from app.services.wireguard_collectors import CollectorError, FakeCollector
+from app.services.wireguard_monitor import WireGuardMonitor
+from app.wireguard.dump import PeerDump
+
+DUMP = (
+    "cHJpdmF0ZQ==\tcHVibGlj\t51820\toff\n"
+    "peerA=\t(none)\t192.0.2.1:51820\t10.10.10.2/32\t{handshake}\t100\t200\t25\n"
+    "peerB=\t(none)\t(none)\t10.10.11.3/32,fd00::3/128\t0\t0\t0\toff\n"
+)
+
+def test_fake_collector_from_dump_output():
+    collector = FakeCollector.from_dump_output("wg0", DUMP.format(handshake=1700000000))
+    dump = asyncio.run(collector.collect("wg0"))
+
+    assert (dump.public_key, dump.listen_port) == ("cHVibGlj", "51820")
+    assert [peer.public_key for peer in dump.peers] == ["peerA=", "peerB="]
+    assert dump.peers[0].endpoint == "192.0.2.1:51820"
+    assert dump.peers[1].allowed_ips == ("10.10.11.3/32", "fd00::3/128")
+
+def test_fake_collector_returns_copies_and_unknown_interface_fails():
+    collector = FakeCollector.from_dump_output("wg0", DUMP.format(handshake=0))
+    asyncio.run(collector.collect("wg0")).peers.clear()
+    assert len(asyncio.run(collector.collect("wg0")).peers) == 2
+    with pytest.raises(CollectorError):
+        asyncio.run(collector.collect("wg1"))
+
+def test_monitor_tick_with_fake_collector(tmp_path):
+    collector = FakeCollector()
+    monitor = WireGuardMonitor(status_dir=str(tmp_path), collector=collector)
+    received = []
+    monitor.subscribe(received.extend)
+    now = int(time.time())
+
+    collector.set_peers("wg0", [PeerDump("peerA=", None, ("10.10.10.2/32",), now, 10, 20, None)])
+    asyncio.run(monitor._check_status())
+    assert monitor.last_error is None
+    assert monitor.online_count == 1
+    assert monitor.get_peer("peerA=").type == "admin"
+    assert [event.type for event in received] == [PeerEventType.PEER_ADDED]
+    assert (tmp_path / "wg0_status.json").exists() or (tmp_path / "wg0_status.json.gz").exists()
+
+    received.clear()
+    collector.set_peers("wg0", [])
+    asyncio.run(monitor._check_status())
+    assert [event.type for event in received] == [PeerEventType.PEER_REMOVED]
+    assert monitor.snapshots.current.status["peers"] == []
+
+def test_monitor_records_collector_errors(tmp_path):
+    monitor = WireGuardMonitor(status_dir=str(tmp_path), collector=FakeCollector())
+    asyncio.run(monitor._check_status())
+    assert monitor.collector_errors == 1
+    assert "wg0" in monitor.last_error
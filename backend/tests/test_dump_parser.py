@@ -0,0 +1,47 @@
+import pytest
+
+from app.wireguard.dump import DumpStreamParser, parse_dump, parse_peer_line
+
+DUMP = (
+    "cHJpdmF0ZQ==\tcHVibGlj\t51820\toff\n"
+    "peerA=\t(none)\t192.0.2.1:51820\t10.10.10.2/32\t1700000000\t100\t200\t25\n"
+    "peerB=\t(none)\t(none)\t10.10.11.3/32,fd00::3/128\t0\t0\t0\toff\n"
+    "peerC=\t(none)\t[2001:db8::7]:4500\t(none)\t1700000100\t18446744073709551615\t1\toff\n"
+)
+
+def test_parse_dump():
+    dump = parse_dump("wg0", DUMP)
+    assert (dump.interface, dump.public_key, dump.listen_port) == ("wg0", "cHVibGlj", "51820")
+    assert [peer.public_key for peer in dump.peers] == ["peerA=", "peerB=", "peerC="]
+    a, b, c = dump.peers
+    assert (a.endpoint, a.latest_handshake, a.transfer_rx, a.transfer_tx, a.persistent_keepalive) == (
+        "192.0.2.1:51820", 1700000000, 100, 200, "25"
+    )
+    assert b.endpoint is None and b.allowed_ips == ("10.10.11.3/32", "fd00::3/128")
+    assert c.allowed_ips == () and c.transfer_rx == 2**64 - 1
+
+def test_incomplete_lines_are_skipped():
+    assert parse_peer_line("peerA=\t(none)\t(none)") is None
+    assert parse_dump("wg0", DUMP.splitlines()[0] + "\nkaputt\n").peers == []
+
+@pytest.mark.parametrize("size", [1, 2, 7, 13, 64, 1000])
+def test_stream_parser_across_chunk_boundaries(size):
+    data = DUMP.encode()
+    parser = DumpStreamParser("wg0")
+    for offset in range(0, len(data), size):
+        parser.feed(data[offset:offset + size])
+    assert parser.finish() == parse_dump("wg0", DUMP)
+
+def test_stream_parser_handles_missing_trailing_newline_and_multibyte_split():
+    text = DUMP.rstrip("\n").replace("peerB=", "peerÄ=")
+    data = text.encode()
+    split = data.index("Ä".encode()) + 1
+    parser = DumpStreamParser("wg0")
+    parser.feed(data[:split])
+    parser.feed(data[split:])
+    dump = parser.finish()
+    assert [peer.public_key for peer in dump.peers] == ["peerA=", "peerÄ=", "peerC="]
+
+def test_empty_output_has_no_header():
+    dump = parse_dump("wg0", "")
+    assert dump.public_key is None and dump.peers == []
@@ -0,0 +1,51 @@
+import importlib.util
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+import sqlalchemy as sa
+
+MIGRATION = Path(__file__).resolve().parents[1] / "alembic" / "versions" / "0001_clients.py"
+
+class RecordingOps:
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        if name == "get_bind":
+            return lambda: None
+        return lambda *args, **kwargs: self.calls.append((name, args, kwargs))
+
+@pytest.fixture
+def migration(monkeypatch):
+    spec = importlib.util.spec_from_file_location("migration_0001", MIGRATION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    ops = RecordingOps()
+    monkeypatch.setattr(module, "op", ops)
+    monkeypatch.setattr(module.context, "is_offline_mode", lambda: False)
+    return module, ops
+
+def existing_table(column_type):
+    columns = [{"name": "id", "type": sa.Integer()}, {"name": "transfer_rx", "type": column_type}, {"name": "transfer_tx", "type": column_type}]
+    return lambda bind: SimpleNamespace(has_table=lambda name: True, get_columns=lambda name: columns)
+
+def test_existing_integer_columns_are_widened(migration, monkeypatch):
+    module, ops = migration
+    monkeypatch.setattr(module.sa, "inspect", existing_table(sa.Integer()))
+    module.upgrade()
+    altered = [(args[1], kwargs["type_"]) for name, args, kwargs in ops.calls if name == "alter_column"]
+    assert [column for column, _ in altered] == ["transfer_rx", "transfer_tx"]
+    assert all(isinstance(type_, sa.BigInteger) for _, type_ in altered)
+    assert "create_table" not in [name for name, _, _ in ops.calls]
+
+def test_existing_bigint_columns_are_left_alone(migration, monkeypatch):
+    module, ops = migration
+    monkeypatch.setattr(module.sa, "inspect", existing_table(sa.BigInteger()))
+    module.upgrade()
+    assert [name for name, _, _ in ops.calls] == ["create_index"] * 3
+
+def test_downgrade_only_drops_indexes(migration):
+    module, ops = migration
+    module.downgrade()
+    assert [(name, args[0]) for name, args, _ in ops.calls] == [("drop_index", index) for index in module.INDEXES]
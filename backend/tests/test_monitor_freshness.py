@@ -0,0 +1,33 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.services import wireguard_monitor
+from app.services.metrics_exporter import render_monitor
+from app.services.monitor_group import WireGuardMonitorGroup
+from app.services.wireguard_collectors import FakeCollector
+from app.services.wireguard_monitor import WireGuardMonitor
+from app.wireguard.dump import PeerDump
+
+T0 = 1_728_000_000
+
+def test_unchanged_ticks_advance_checked_at_but_keep_the_snapshot(tmp_path, monkeypatch):
+    clock = SimpleNamespace(now=T0)
+    monkeypatch.setattr(wireguard_monitor, "time", SimpleNamespace(time=lambda: clock.now))
+    collector = FakeCollector()
+    collector.set_peers("wg0", [PeerDump("peerA=", None, ("10.10.10.2/32",), 0, 10, 20, "off")])
+    group = WireGuardMonitorGroup(["wg0"], lambda interface: WireGuardMonitor(status_dir=str(tmp_path), collector=collector))
+    monitor = group.monitors["wg0"]
+
+    asyncio.run(monitor._check_status())
+    snapshot = monitor.snapshots.current
+    clock.now = T0 + 600
+    asyncio.run(monitor._check_status())
+
+    # Gleicher Inhalt: kein neuer Snapshot, das ETag bleibt gültig
+    assert monitor.snapshots.current is snapshot
+    assert monitor.checked_at == T0 + 600
+    summary = monitor.summary()
+    assert summary["timestamp"] > summary["changed_at"]
+
+    metrics = render_monitor(group, T0 + 605).decode()
+    assert 'wireguard_snapshot_age_seconds{interface="wg0"} 5.000' in metrics
@@ -0,0 +1,19 @@
+from app.core.config import settings
+from app.services import monitor_setup
+
+def test_optional_parts_follow_settings(monkeypatch, tmp_path):
+    monkeypatch.setattr(settings, "WIREGUARD_COLLECTOR", "fake")
+    monkeypatch.setattr(settings, "WIREGUARD_ACCOUNTING_DIR", str(tmp_path / "acct"))
+    monkeypatch.setattr(settings, "WIREGUARD_SESSIONS_DIR", str(tmp_path / "sessions"))
+    monkeypatch.setattr(settings, "WIREGUARD_HISTORY_ENABLED", False)
+    monkeypatch.setattr(settings, "WIREGUARD_CLIENT_SYNC_ENABLED", False)
+
+    monitor = monitor_setup.create_monitor("wg7")
+    assert monitor.accounting is not None and monitor.phases.accounting is monitor.accounting
+    assert monitor.history is None and monitor.client_sync is None
+
+    monkeypatch.setattr(settings, "WIREGUARD_ACCOUNTING_ENABLED", False)
+    monkeypatch.setattr(settings, "WIREGUARD_SESSIONS_ENABLED", False)
+    monitor = monitor_setup.create_monitor("wg7")
+    assert monitor.accounting is None and monitor.phases.accounting is None
+    assert monitor.sessions is None
@@ -0,0 +1,128 @@
+import base64
+import socket
+import struct
+
+import pytest
+
+from app.wireguard import netlink
+from app.wireguard.netlink import (
+    NLM_F_DUMP_INTR, NLM_F_MULTI, NLMSG_DONE, NLMSG_ERROR, NetlinkError, WireGuardNetlink,
+    _format_endpoint, _iter_attrs, _pack_attr, _parse_allowed_ip
+)
+
+KEY_A = bytes(range(32))
+KEY_B = bytes(range(32, 64))
+FAMILY_ID = 0x1a
+
+def allowed_ip(address: str, cidr: int) -> bytes:
+    family = socket.AF_INET6 if ":" in address else socket.AF_INET
+    return _pack_attr(0, (
+        _pack_attr(netlink.WGALLOWEDIP_A_FAMILY, struct.pack("=H", family))
+        + _pack_attr(netlink.WGALLOWEDIP_A_IPADDR, socket.inet_pton(family, address))
+        + _pack_attr(netlink.WGALLOWEDIP_A_CIDR_MASK, bytes([cidr]))
+    ))
+
+def peer(key: bytes, allowed_ips=(), rx: int = 0, tx: int = 0, handshake: int = 0, endpoint: bytes = b"") -> bytes:
+    attrs = _pack_attr(netlink.WGPEER_A_PUBLIC_KEY, key)
+    if endpoint:
+        attrs += _pack_attr(netlink.WGPEER_A_ENDPOINT, endpoint)
+    attrs += _pack_attr(netlink.WGPEER_A_LAST_HANDSHAKE_TIME, struct.pack("=qq", handshake, 0))
+    attrs += _pack_attr(netlink.WGPEER_A_RX_BYTES, struct.pack("=Q", rx))
+    attrs += _pack_attr(netlink.WGPEER_A_TX_BYTES, struct.pack("=Q", tx))
+    attrs += _pack_attr(netlink.WGPEER_A_ALLOWEDIPS, b"".join(allowed_ip(*ip) for ip in allowed_ips))
+    return _pack_attr(0, attrs)
+
+def message(seq: int, body: bytes, msg_type: int = FAMILY_ID, flags: int = NLM_F_MULTI) -> bytes:
+    payload = struct.pack("=BBH", netlink.WG_CMD_GET_DEVICE, netlink.WG_GENL_VERSION, 0) + body
+    length = 16 + len(payload)
+    return struct.pack("=IHHII", length, msg_type, flags, seq, 0) + payload + b"\0" * (netlink._align(length) - length)
+
+def done(seq: int) -> bytes:
+    return struct.pack("=IHHII", 20, NLMSG_DONE, NLM_F_MULTI, seq, 0) + b"\0" * 4
+
+class FakeSocket:
+    """Liefert vorbereitete Antworten; `responses` erhält die Sequenznummer der Anfrage."""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.pending = []
+        self.closed = False
+
+    def send(self, data: bytes):
+        seq = struct.unpack_from("=IHHII", data)[3]
+        self.pending.extend(self.responses.pop(0)(seq))
+
+    def recv(self, bufsize: int) -> bytes:
+        return self.pending.pop(0)
+
+    def close(self):
+        self.closed = True
+
+def client(*responses) -> WireGuardNetlink:
+    wg = WireGuardNetlink()
+    wg._sock = FakeSocket(*responses)
+    wg._family_id = FAMILY_ID
+    return wg
+
+def test_attrs_are_padded_and_roundtrip():
+    data = _pack_attr(1, b"abc") + _pack_attr(2 | netlink.NLA_F_NESTED, b"12345")
+    assert len(data) % 4 == 0
+    assert list(_iter_attrs(data)) == [(1, b"abc"), (2, b"12345")]
+
+def test_iter_attrs_stops_on_truncated_attribute():
+    data = _pack_attr(1, b"abcd") + struct.pack("=HH", 2, 7)
+    assert list(_iter_attrs(data)) == [(1, b"abcd")]
+
+def test_format_endpoint():
+    ipv4 = struct.pack("=H", socket.AF_INET) + struct.pack("!H", 51820) + socket.inet_aton("192.0.2.1") + b"\0" * 8
+    ipv6 = struct.pack("=H", socket.AF_INET6) + struct.pack("!H", 443) + b"\0" * 4 + socket.inet_pton(socket.AF_INET6, "2001:db8::1") + b"\0" * 4
+    assert _format_endpoint(ipv4) == "192.0.2.1:51820"
+    assert _format_endpoint(ipv6) == "[2001:db8::1]:443"
+    assert _format_endpoint(b"\0") is None
+
+def test_parse_allowed_ip():
+    assert _parse_allowed_ip(allowed_ip("10.10.11.2", 32)[4:]) == "10.10.11.2/32"
+    assert _parse_allowed_ip(allowed_ip("fd00::", 64)[4:]) == "fd00::/64"
+    assert _parse_allowed_ip(_pack_attr(netlink.WGALLOWEDIP_A_CIDR_MASK, b"\x18")) is None
+
+def test_peer_split_across_multipart_messages_is_merged():
+    device = _pack_attr(netlink.WGDEVICE_A_PUBLIC_KEY, KEY_B) + _pack_attr(netlink.WGDEVICE_A_LISTEN_PORT, struct.pack("=H", 51820))
+    first = device + _pack_attr(netlink.WGDEVICE_A_PEERS, peer(KEY_A, [("10.10.10.2", 32)], rx=2**40, tx=5, handshake=1700000000))
+    # Der Kernel wiederholt den Peer (nur Schlüssel und restliche IPs) in der nächsten Nachricht
+    second = _pack_attr(netlink.WGDEVICE_A_PEERS, _pack_attr(0,
+        _pack_attr(netlink.WGPEER_A_PUBLIC_KEY, KEY_A)
+        + _pack_attr(netlink.WGPEER_A_ALLOWEDIPS, allowed_ip("fd00::2", 128))
+    ) + peer(KEY_B, [("10.10.11.3", 32)]))
+    # Beide Nachrichten und das Ende in einem einzigen recv-Block bzw. getrennt
+    wg = client(lambda seq: [message(seq, first) + message(seq, second), done(seq)])
+
+    dump = wg.get_device("wg0")
+
+    assert dump.public_key == base64.b64encode(KEY_B).decode()
+    assert dump.listen_port == "51820"
+    assert [p.public_key for p in dump.peers] == [base64.b64encode(KEY_A).decode(), base64.b64encode(KEY_B).decode()]
+    first_peer = dump.peers[0]
+    assert first_peer.allowed_ips == ("10.10.10.2/32", "fd00::2/128")
+    assert (first_peer.transfer_rx, first_peer.transfer_tx, first_peer.latest_handshake) == (2**40, 5, 1700000000)
+    assert first_peer.persistent_keepalive == "off"
+
+def test_interrupted_dump_is_repeated():
+    body = _pack_attr(netlink.WGDEVICE_A_PEERS, peer(KEY_A, [("10.10.10.2", 32)]))
+    wg = client(
+        lambda seq: [message(seq, body, flags=NLM_F_MULTI | NLM_F_DUMP_INTR), done(seq)],
+        lambda seq: [message(seq, body), done(seq)]
+    )
+    assert len(wg.get_device("wg0").peers) == 1
+
+def test_messages_of_other_requests_are_skipped():
+    body = _pack_attr(netlink.WGDEVICE_A_PEERS, peer(KEY_A))
+    wg = client(lambda seq: [message(seq - 1, body) + message(seq, body), done(seq)])
+    assert len(wg.get_device("wg0").peers) == 1
+
+def test_kernel_error_raises_and_drops_socket():
+    wg = client(lambda seq: [struct.pack("=IHHII", 36, NLMSG_ERROR, 0, seq, 0) + struct.pack("=i", -19) + b"\0" * 16])
+    sock = wg._sock
+    with pytest.raises(NetlinkError) as exc:
+        wg.get_device("wg9")
+    assert exc.value.errno == 19
+    assert sock.closed and wg._sock is None
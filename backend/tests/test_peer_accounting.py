@@ -0,0 +1,67 @@
+import os
+
+from app.services.peer_accounting import ACCOUNT_RECORD, PeerAccounting
+
+KEY_A = "A" * 43 + "="
+KEY_B = "B" * 43 + "="
+
+def journal_records(path) -> int:
+    return os.path.getsize(path) // ACCOUNT_RECORD.size
+
+def test_counter_reset_continues_totals(tmp_path):
+    accounting = PeerAccounting(str(tmp_path / "wg0.acct"))
+    accounting.update([(KEY_A, 1000, 500)])
+    assert accounting.update([(KEY_A, 100, 50)]) == 1
+    accounting.update([(KEY_A, 300, 60)])
+    assert tuple(accounting.usage(KEY_A)) == (KEY_A, 1300, 560, 1)
+    assert accounting.usage(KEY_B) is None
+
+def test_journal_replay_uses_last_record_per_peer(tmp_path):
+    path = tmp_path / "wg0.acct"
+    accounting = PeerAccounting(str(path), flush_interval=3600)
+    accounting.update([(KEY_A, 10, 10), (KEY_B, 5, 5)])
+    assert accounting.flush(force=True) == 2
+    # Nur geänderte Peers werden angehängt
+    accounting.update([(KEY_A, 20, 10), (KEY_B, 5, 5)])
+    assert accounting.flush(force=True) == 1
+    accounting.update([(KEY_A, 3, 0)])
+    accounting.flush(force=True)
+    assert journal_records(path) == 4
+
+    replayed = PeerAccounting(str(path))
+    assert sorted(replayed.all_usage()) == sorted(accounting.all_usage())
+    assert tuple(replayed.usage(KEY_A)) == (KEY_A, 23, 10, 1)
+
+def test_reset_while_stopped_is_detected_after_replay(tmp_path):
+    path = tmp_path / "wg0.acct"
+    accounting = PeerAccounting(str(path))
+    accounting.update([(KEY_A, 5000, 7000)])
+    accounting.flush(force=True)
+
+    # Interface wurde neu gestartet, während der Dienst nicht lief
+    restarted = PeerAccounting(str(path))
+    assert restarted.update([(KEY_A, 10, 20)]) == 1
+    assert tuple(restarted.usage(KEY_A)) == (KEY_A, 5010, 7020, 1)
+
+def test_truncated_record_is_ignored(tmp_path):
+    path = tmp_path / "wg0.acct"
+    accounting = PeerAccounting(str(path))
+    accounting.update([(KEY_A, 1, 2)])
+    accounting.flush(force=True)
+    with open(path, "ab") as f:
+        f.write(b"\x01" * (ACCOUNT_RECORD.size - 3))
+    assert [usage.public_key for usage in PeerAccounting(str(path)).all_usage()] == [KEY_A]
+
+def test_flush_interval_and_journal_rewrite(tmp_path):
+    path = tmp_path / "wg0.acct"
+    accounting = PeerAccounting(str(path), flush_interval=3600)
+    accounting.update([(KEY_A, 1, 1)])
+    assert accounting.flush() == 0
+    assert accounting.flush(force=True) == 1
+
+    # Viele Sicherungen desselben Peers: das Journal wird auf den Bestand verdichtet
+    for value in range(2, 1100):
+        accounting.update([(KEY_A, value, value)])
+        accounting.flush(force=True)
+    assert journal_records(path) < 1100
+    assert tuple(PeerAccounting(str(path)).usage(KEY_A)) == (KEY_A, 1099, 1099, 0)
@@ -0,0 +1,64 @@
+import asyncio
+
+from app.services.peer_events import PeerEventBus, PeerEventType, diff_peers
+from app.services.peer_records import PeerRecord
+
+def record(key: str, online: bool = True, endpoint: str = "192.0.2.1:51820", handshake: int = 100, rx: int = 0) -> PeerRecord:
+    return PeerRecord(key, endpoint, ("10.10.11.2/32",), handshake, rx, 0, None, online, "user")
+
+def types(events):
+    return [(event.type, event.public_key) for event in events]
+
+def test_first_run_reports_all_peers_as_added():
+    events, index = diff_peers("wg0", {}, [record("a"), record("b")])
+    assert types(events) == [(PeerEventType.PEER_ADDED, "a"), (PeerEventType.PEER_ADDED, "b")]
+    assert set(index) == {"a", "b"}
+
+def test_unchanged_peers_produce_no_events():
+    _, index = diff_peers("wg0", {}, [record("a"), record("b")])
+    events, _ = diff_peers("wg0", index, [record("a", rx=500), record("b")])
+    assert events == []
+
+def test_state_changes():
+    _, index = diff_peers("wg0", {}, [record("a"), record("b"), record("c")])
+    events, _ = diff_peers("wg0", index, [
+        record("a", online=False),
+        record("b", endpoint="198.51.100.7:4500", handshake=160),
+        record("c")
+    ])
+    assert types(events) == [
+        (PeerEventType.WENT_OFFLINE, "a"),
+        (PeerEventType.ENDPOINT_CHANGED, "b"),
+        (PeerEventType.HANDSHAKE_ADVANCED, "b")
+    ]
+    assert events[1].previous.endpoint == "192.0.2.1:51820"
+    assert events[1].peer.endpoint == "198.51.100.7:4500"
+
+def test_removed_peers_are_found_even_when_others_were_added():
+    _, index = diff_peers("wg0", {}, [record("a"), record("b")])
+    # Gleich viele Peers wie vorher, aber "b" wurde durch "c" ersetzt
+    events, new_index = diff_peers("wg0", index, [record("a"), record("c")])
+    assert types(events) == [(PeerEventType.PEER_ADDED, "c"), (PeerEventType.PEER_REMOVED, "b")]
+    removed = events[1]
+    assert removed.peer is None and removed.previous.public_key == "b"
+    assert set(new_index) == {"a", "c"}
+
+def test_bus_isolates_failing_subscribers():
+    bus = PeerEventBus()
+    received = []
+
+    def broken(events):
+        raise RuntimeError("kaputt")
+
+    async def collect(events):
+        received.extend(events)
+
+    bus.subscribe(broken)
+    unsubscribe = bus.subscribe(collect)
+    events, _ = diff_peers("wg0", {}, [record("a")])
+    asyncio.run(bus.publish(events))
+    assert types(received) == [(PeerEventType.PEER_ADDED, "a")]
+
+    unsubscribe()
+    asyncio.run(bus.publish(events))
+    assert len(received) == 1
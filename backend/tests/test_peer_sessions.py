@@ -0,0 +1,59 @@
+import json
+
+from app.services.peer_events import PeerEvent, PeerEventType
+from app.services.peer_records import PeerRecord
+from app.services.peer_sessions import PeerSessionLog
+
+KEY = "A" * 43 + "="
+T0 = 1_728_000_000
+
+def record(handshake: int, rx: int = 0, endpoint: str = "192.0.2.1:51820", online: bool = True) -> PeerRecord:
+    return PeerRecord(KEY, endpoint, ("10.10.10.2/32",), handshake, rx, rx, None, online, "client")
+
+def event(kind: PeerEventType, peer, previous=None) -> PeerEvent:
+    return PeerEvent(kind, "wg0", KEY, peer, previous)
+
+def test_record_only_writes_on_flush(tmp_path):
+    log = PeerSessionLog(str(tmp_path), "wg0")
+    online = record(T0, rx=100)
+    log.record(T0, [event(PeerEventType.PEER_ADDED, online)])
+    assert log.record(T0 + 400, [event(PeerEventType.WENT_OFFLINE, record(T0, rx=300, online=False), online)]) == 1
+    assert log.log_file.stat().st_size == 0
+
+    assert log.flush() == 1
+    (session,) = log.sessions(KEY)
+    assert (session.start, session.end, session.transfer_rx) == (T0, T0 + 180, 200)
+    log.close()
+
+def test_open_sessions_are_checkpointed_periodically(tmp_path):
+    log = PeerSessionLog(str(tmp_path), "wg0", checkpoint_interval=0)
+    log.record(T0, [event(PeerEventType.PEER_ADDED, record(T0))])
+    log.flush()
+    # Ohne `close()` (Absturz) liegt die offene Sitzung bereits auf der Platte
+    assert KEY in json.loads(log.open_file.read_text())
+
+    restarted = PeerSessionLog(str(tmp_path), "wg0")
+    (session,) = restarted.sessions(KEY)
+    assert session.start == T0 and session.end is None
+
+def test_checkpoint_respects_interval(tmp_path):
+    log = PeerSessionLog(str(tmp_path), "wg0", checkpoint_interval=3600)
+    log.record(T0, [event(PeerEventType.PEER_ADDED, record(T0))])
+    log.flush()
+    assert not log.open_file.exists()
+    log.close()
+    assert KEY in json.loads(log.open_file.read_text())
+
+def test_sessions_closed_after_checkpoint_are_not_duplicated(tmp_path):
+    log = PeerSessionLog(str(tmp_path), "wg0", checkpoint_interval=0)
+    online = record(T0)
+    log.record(T0, [event(PeerEventType.PEER_ADDED, online)])
+    log.flush()
+    log.checkpoint_interval = 3600
+    log.record(T0 + 400, [event(PeerEventType.WENT_OFFLINE, record(T0, online=False), online)])
+    log.flush()
+
+    # Absturz: die Sicherung enthält die Sitzung noch als offen
+    restarted = PeerSessionLog(str(tmp_path), "wg0")
+    assert restarted.record(T0 + 500, [event(PeerEventType.PEER_ADDED, record(T0, online=False))]) == 0
+    assert [s.end for s in restarted.sessions(KEY)] == [T0 + 180]
@@ -0,0 +1,61 @@
+import asyncio
+import json
+import time
+
+from app.services.peer_stream import PeerStreamHub
+from app.services.wireguard_collectors import FakeCollector
+from app.services.wireguard_monitor import WireGuardMonitor
+from app.wireguard.dump import PeerDump
+
+def frames(data: bytes):
+    """Zerlegt SSE-Daten in (Event, JSON-Daten)."""
+    result = []
+    for frame in data.split(b"\n\n"):
+        lines = dict(line.split(b": ", 1) for line in frame.split(b"\n") if b": " in line)
+        if b"event" in lines:
+            result.append((lines[b"event"].decode(), json.loads(lines[b"data"])))
+    return result
+
+def test_delta_contains_transfer_changes_and_removed_peers(tmp_path):
+    collector = FakeCollector()
+    monitor = WireGuardMonitor(status_dir=str(tmp_path), collector=collector)
+    hub = PeerStreamHub(monitor.snapshots, keepalive=0.01)
+    handshake = int(time.time())
+    peer_a = PeerDump("a", "192.0.2.1:51820", ("10.10.11.2/32",), handshake, 100, 200, None)
+    peer_b = PeerDump("b", None, ("10.10.11.3/32",), 0, 0, 0, None)
+
+    async def run():
+        collector.set_peers("wg0", [peer_a, peer_b])
+        await monitor._check_status()
+        polls = 0
+
+        async def is_disconnected():
+            nonlocal polls
+            polls += 1
+            if polls == 1:
+                # Nur Transferzähler geändert: kein Peer-Ereignis, aber ein neuer Snapshot
+                collector.set_peers("wg0", [peer_a._replace(transfer_rx=5000), peer_b])
+                await monitor._check_status()
+            elif polls == 2:
+                collector.set_peers("wg0", [peer_a._replace(transfer_rx=5000)])
+                await monitor._check_status()
+            return polls > 3
+
+        return b"".join([chunk async for chunk in hub.stream(is_disconnected)])
+
+    result = frames(asyncio.run(run()))
+    assert [event for event, _ in result] == ["snapshot", "delta", "delta"]
+    first, second = result[1][1], result[2][1]
+    assert [peer["public_key"] for peer in first["peers"]] == ["a"]
+    assert first["peers"][0]["transfer_rx"] == 5000
+    assert first["removed"] == []
+    assert second == {"version": monitor.snapshots.current.version, "peers": [], "removed": ["b"]}
+    assert hub.subscriber_count == 0
+
+def test_no_work_without_subscribers(tmp_path):
+    collector = FakeCollector()
+    monitor = WireGuardMonitor(status_dir=str(tmp_path), collector=collector)
+    hub = PeerStreamHub(monitor.snapshots)
+    collector.set_peers("wg0", [PeerDump("a", None, (), 0, 1, 1, None)])
+    asyncio.run(monitor._check_status())
+    assert hub._index is None
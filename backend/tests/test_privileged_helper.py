@@ -0,0 +1,105 @@
+import asyncio
+
+import pytest
+
+from app.utils import system_operations
+from app.utils.privileged_helper import (
+    PrivilegedHelperClient, PrivilegedHelperError, PrivilegedHelperServer, PrivilegedHelperUnavailableError
+)
+from app.utils.system_operations import SecureSystemOperations
+
+def test_allow_list(tmp_path):
+    server = PrivilegedHelperServer(str(tmp_path / "helper.sock"), config_dir=str(tmp_path))
+    allowed = server._allowed_command
+
+    assert allowed(["wg", "pubkey"]) == ["wg", "pubkey"]
+    assert allowed(["wg", "show", "wg0", "dump"]) == ["wg", "show", "wg0", "dump"]
+    assert allowed(["wg", "syncconf", "wg0", str(tmp_path / "wg0.conf")]) is not None
+    assert allowed(["wg-quick", "down", "wg0"]) == ["wg-quick", "down", "wg0"]
+
+    assert allowed(["wg", "pubkey", "extra"]) is None
+    assert allowed(["wg", "set", "wg0", "peer", "x", "remove"]) is None
+    assert allowed(["wg", "syncconf", "wg0", "/tmp/../etc/shadow"]) is None
+    assert allowed(["wg-quick", "up", "wg0; rm -rf /"]) is None
+    assert allowed(["sh", "-c", "id"]) is None
+
+def test_random_keys_are_generated_in_process(tmp_path):
+    server = PrivilegedHelperServer(str(tmp_path / "helper.sock"), wg_path="/nonexistent/wg")
+    returncode, stdout, _ = asyncio.run(server.execute(["wg", "genkey"]))
+    assert returncode == 0 and len(stdout.strip()) == 44
+
+def test_client_raises_unavailable_without_socket(tmp_path):
+    client = PrivilegedHelperClient(str(tmp_path / "missing.sock"))
+    with pytest.raises(PrivilegedHelperUnavailableError):
+        asyncio.run(client.run(["wg", "show", "interfaces"]))
+
+class FailingHelper:
+    def __init__(self, error: Exception):
+        self.error = error
+        self.calls = 0
+
+    async def run(self, command, stdin=None):
+        self.calls += 1
+        raise self.error
+
+def run_with_helper(tmp_path, monkeypatch, error: Exception):
+    operations = SecureSystemOperations(wireguard_dir=str(tmp_path), backup_dir=str(tmp_path))
+    operations.helper = FailingHelper(error)
+    started = []
+
+    class Process:
+        returncode = 0
+
+        async def communicate(self, stdin=None):
+            return b"ok", b""
+
+    async def fake_exec(*argv, **kwargs):
+        started.append(argv)
+        return Process()
+
+    monkeypatch.setattr(system_operations.asyncio, "create_subprocess_exec", fake_exec)
+    result = asyncio.run(operations._run_with_sudo(["wg-quick", "up", "wg0"]))
+    return result, started
+
+def test_sudo_fallback_only_when_helper_unreachable(tmp_path, monkeypatch):
+    result, started = run_with_helper(tmp_path, monkeypatch, PrivilegedHelperUnavailableError("nicht erreichbar"))
+    assert result[0] == 0
+    assert started == [("/usr/bin/sudo", "wg-quick", "up", "wg0")]
+
+def test_no_sudo_retry_after_command_was_sent(tmp_path, monkeypatch):
+    result, started = run_with_helper(tmp_path, monkeypatch, PrivilegedHelperError("Zeitüberschreitung"))
+    assert result[0] != 0
+    assert started == []
+
+CONFIG = "[Interface]\nPrivateKey = x\n"
+
+def peer_config(index: int):
+    return {"public_key": f"{index:043d}=", "allowed_ips": [f"10.10.11.{index}/32"]}
+
+def test_add_peers_rejects_paths_as_interface(tmp_path):
+    operations = SecureSystemOperations(wireguard_dir=str(tmp_path / "wg"), backup_dir=str(tmp_path / "backup"))
+    target = tmp_path / "x.conf"
+    target.write_text(CONFIG)
+    assert asyncio.run(operations.add_peers("../x", [peer_config(1)])) is False
+    assert target.read_text() == CONFIG
+
+def test_concurrent_add_peers_keep_all_sections(tmp_path, monkeypatch):
+    operations = SecureSystemOperations(wireguard_dir=str(tmp_path), backup_dir=str(tmp_path / "backup"))
+    (tmp_path / "wg0.conf").write_text(CONFIG)
+
+    async def update(interface, config_path, backup=True):
+        # Wechsel zur Event-Loop zwischen Schreiben und Übernahme
+        await asyncio.sleep(0)
+        return True
+
+    async def no_backup(interface):
+        await asyncio.sleep(0)
+
+    monkeypatch.setattr(operations, "update_wireguard_config", update)
+    monkeypatch.setattr(operations, "backup_config", no_backup)
+
+    async def run():
+        return await asyncio.gather(*(operations.add_peers("wg0", [peer_config(i)]) for i in range(1, 6)))
+
+    assert asyncio.run(run()) == [True] * 5
+    assert (tmp_path / "wg0.conf").read_text().count("[Peer]") == 5
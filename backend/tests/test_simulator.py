@@ -0,0 +1,11 @@
+from app.wireguard.dump import parse_dump
+from app.wireguard.simulator import FleetSimulator
+
+def test_simulated_peers_match_the_wg_dump_shape():
+    simulator = FleetSimulator("wg0", 64)
+    peers = simulator.peers(1_728_000_000)
+    assert {peer.persistent_keepalive for peer in peers} == {"25", "off"}
+    # Die Textausgabe liefert nach dem Parsen dieselben Werte wie der direkte Weg
+    parsed = parse_dump("wg0", simulator.dump(1_728_000_000)).peers
+    assert [peer.persistent_keepalive for peer in parsed] == [peer.persistent_keepalive for peer in peers]
+    assert simulator.config().count("PersistentKeepalive = 25") == sum(peer.persistent_keepalive == "25" for peer in peers)
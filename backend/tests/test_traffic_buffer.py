@@ -0,0 +1,50 @@
+import pytest
+
+from app.services.traffic_buffer import TrafficRingBuffer
+
+def test_rates_from_counter_deltas():
+    buffer = TrafficRingBuffer(window=4)
+    buffer.record(0, [("a", 1000, 500)])
+    buffer.record(10, [("a", 3000, 1500)])
+    assert buffer.peer_series("a") == [(10, 200.0, 100.0)]
+    assert buffer.current_rates() == {"a": (200.0, 100.0)}
+    assert buffer.interface_series() == [(10, 200.0, 100.0)]
+
+def test_counter_reset_counts_from_zero():
+    buffer = TrafficRingBuffer(window=4)
+    buffer.record(0, [("a", 10_000, 10_000)])
+    # Interface neu gestartet: die Zähler beginnen wieder bei 0
+    buffer.record(10, [("a", 400, 0)])
+    buffer.record(20, [("a", 900, 100)])
+    assert buffer.peer_series("a") == [(10, 40.0, 0.0), (20, 50.0, 10.0)]
+
+def test_new_peer_has_no_rate_until_second_tick():
+    buffer = TrafficRingBuffer(window=4)
+    buffer.record(0, [("a", 0, 0)])
+    buffer.record(10, [("a", 100, 0), ("b", 5_000_000, 0)])
+    assert buffer.peer_series("b") == []
+    assert "b" not in buffer.current_rates()
+    # Der Zählerstand von "b" beim ersten Auftreten zählt nicht zur Interface-Rate
+    assert buffer.interface_series(limit=1) == [(10, 10.0, 0.0)]
+
+def test_window_keeps_only_latest_ticks():
+    buffer = TrafficRingBuffer(window=3)
+    for tick in range(6):
+        buffer.record(tick * 10, [("a", tick * 100, 0)])
+    assert [sample[0] for sample in buffer.peer_series("a")] == [40, 50]
+    assert buffer.peer_series("a", limit=1) == [(50, 10.0, 0.0)]
+
+def test_removed_peers_release_slots_and_capacity_is_capped():
+    buffer = TrafficRingBuffer(window=2, max_peers=2, block_size=1)
+    buffer.record(0, [("a", 0, 0), ("b", 0, 0), ("c", 0, 0)])
+    assert buffer.peer_series("c") is None
+    # Slots entfernter Peers werden am Ende des Durchlaufs frei und ab dem nächsten vergeben
+    buffer.record(10, [("c", 0, 0)])
+    assert buffer.peer_series("a") is None
+    buffer.record(20, [("c", 0, 0)])
+    assert buffer.peer_series("c") == []
+    assert buffer.memory_bytes == 2 * 8 * (2 * 2 + 4) + 8 * 3 * 2
+
+def test_window_must_cover_two_ticks():
+    with pytest.raises(ValueError):
+        TrafficRingBuffer(window=1)
@@ -0,0 +1,73 @@
+import os
+
+from app.services.history_segments import RECORD
+from app.services.traffic_history import TrafficHistoryStore
+
+# Beginn eines Tages (UTC), damit Segmentgrenzen vorhersehbar sind
+T0 = 1_728_000_000
+DAY = 86400
+
+def store(tmp_path, **retention) -> TrafficHistoryStore:
+    return TrafficHistoryStore(root_dir=str(tmp_path), **retention)
+
+def timestamps(samples):
+    return [sample.timestamp - T0 for sample in samples]
+
+def test_unchanged_values_are_skipped(tmp_path):
+    history = store(tmp_path)
+    history.append(T0, [("a", 1, 1, 0, "192.0.2.1:51820"), ("b", 0, 0, 0, None)])
+    history.append(T0 + 15, [("a", 1, 1, 0, "192.0.2.1:51820"), ("b", 5, 0, 0, None)])
+    assert timestamps(history.query("a", T0, T0 + 60)) == [0]
+    assert [s.transfer_rx for s in history.query("b", T0, T0 + 60)] == [0, 5]
+    assert history.query("a", T0, T0)[0].endpoint == "192.0.2.1:51820"
+    assert history.query("unknown", T0, T0 + 60) == []
+
+def test_last_values_of_removed_peers_are_dropped(tmp_path):
+    history = store(tmp_path)
+    history.append(T0, [("a", 1, 1, 0, None), ("b", 1, 1, 0, None)])
+    history.append(T0 + 15, [("a", 1, 1, 0, None)])
+    assert set(history._last_values) == {"a"}
+    # Kehrt ein Peer zurück, wird sein Messpunkt wieder geschrieben
+    history.append(T0 + 30, [("a", 1, 1, 0, None), ("b", 1, 1, 0, None)])
+    assert timestamps(history.query("b", T0, T0 + 60)) == [0, 30]
+
+def test_sealed_segments_stay_queryable(tmp_path):
+    history = store(tmp_path)
+    for second in range(0, 3600, 600):
+        history.append(T0 + second, [("a", second, 0, 0, None), ("b", 2 * second, 0, 0, None)])
+    history.compact(now=T0 + 3600)
+    assert not list((tmp_path / "raw").glob("*.log"))
+    assert timestamps(history.query("b", T0, T0 + 3600)) == [0, 600, 1200, 1800, 2400, 3000]
+
+def test_open_segment_is_truncated_after_crash(tmp_path):
+    history = store(tmp_path)
+    history.append(T0, [("a", 1, 0, 0, None)])
+    history.stop()
+    with open(tmp_path / "raw" / f"{T0}.log", "ab") as f:
+        f.write(b"\0" * (RECORD.size // 2))
+
+    reopened = store(tmp_path)
+    reopened.append(T0 + 15, [("a", 2, 0, 0, None)])
+    assert os.path.getsize(tmp_path / "raw" / f"{T0}.log") == 2 * RECORD.size
+    assert timestamps(reopened.query("a", T0, T0 + 60)) == [0, 15]
+
+def test_expired_raw_segments_are_downsampled(tmp_path):
+    history = store(tmp_path, raw_retention=3600, medium_retention=DAY)
+    for second in range(0, 660, 60):
+        history.append(T0 + second, [("a", second, 0, 0, None)])
+    history.compact(now=T0 + DAY + 3600)
+
+    assert not list((tmp_path / "raw").iterdir())
+    assert [path.name for path in (tmp_path / "5m").glob("*.seg")] == [f"{T0}.seg"]
+    # Letzter Messpunkt je 5-Minuten-Intervall
+    samples = history.query("a", T0, T0 + 3600)
+    assert timestamps(samples) == [240, 540, 600]
+    assert [s.transfer_rx for s in samples] == [240, 540, 600]
+
+def test_segments_are_deleted_after_retention(tmp_path):
+    history = store(tmp_path, raw_retention=3600, medium_retention=DAY, coarse_retention=DAY)
+    history.append(T0, [("a", 1, 0, 0, None)])
+    history.compact(now=T0 + 400 * DAY)
+    for level in ("raw", "5m", "1h"):
+        assert not list((tmp_path / level).iterdir())
+    assert history.query("a", T0, T0 + 3600) == []